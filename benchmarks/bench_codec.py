@@ -0,0 +1,55 @@
+"""
+Compares encode/decode throughput and size of `skyjo.codec` against `json.dumps(state, cls=NumpyEncoder)`.
+
+Run with `python benchmarks/bench_codec.py [n_players] [number]`.
+"""
+import json
+import sys
+import timeit
+
+from skyjo.actions import ActionCreator
+from skyjo.codec import encode_state, decode_state, state_to_json, state_from_json
+from skyjo.NumpyEncoder import NumpyEncoder
+from skyjo.reducer import reducer
+
+
+def opened_state(n_players=4, seed=0):
+    state = reducer({}, ActionCreator.reset_game(seed))
+    for ix in range(n_players):
+        state = reducer(state, ActionCreator.add_player('Player {}'.format(ix)))
+    return reducer(state, ActionCreator.open_game())
+
+
+def formats(state):
+    """
+    Returns the name, encode and decode function of every format.
+    """
+    return [
+        ('numpy_encoder', lambda: json.dumps(state, cls=NumpyEncoder), state_from_json),
+        ('json', lambda: state_to_json(state), state_from_json),
+        ('binary', lambda: encode_state(state), decode_state),
+    ]
+
+
+def bench(state, number=2000):
+    """
+    Returns the size, encodes/sec and decodes/sec of every format.
+    """
+    results = {}
+    for name, encode, decode in formats(state):
+        data = encode()
+        results[name] = (
+            len(data),
+            number / min(timeit.repeat(encode, number=number, repeat=5)),
+            number / min(timeit.repeat(lambda: decode(data), number=number, repeat=5)),
+        )
+    return results
+
+
+def main(n_players=4, number=2000):
+    for name, (size, encodes, decodes) in bench(opened_state(n_players), number).items():
+        print('{:<14} {:>6} bytes {:>10,.0f} encodes/s {:>10,.0f} decodes/s'.format(name, size, encodes, decodes))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
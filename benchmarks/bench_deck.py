@@ -0,0 +1,59 @@
+"""
+Microbenchmark of card draws: the former dict deck with `np.random.choice` against `skyjo.deck.Deck`.
+
+Run with `python benchmarks/bench_deck.py`.
+"""
+import timeit
+import numpy as np
+
+from skyjo.deck import Deck
+
+
+def _dict_deck():
+    deck = {c: (5 if c == -2 else 15 if c == 0 else 10) for c in range(-2, 13)}
+    deck['_size'] = 150
+    return deck
+
+
+def _dict_give_card(deck):
+    cards = list(deck.keys())[:15]
+    p = np.array(list(deck.values())[:15]) / deck['_size']
+    card = np.random.choice(cards, p=p)
+    deck['_size'] -= 1
+    deck[card] -= 1
+    return card
+
+
+def _rate(func, setup, n):
+    times = timeit.repeat(func, setup=setup, number=1, repeat=5)
+    return n / min(times)
+
+
+def main(n=100):
+    rng = np.random.default_rng(0)
+    state = {}
+
+    def reset_dict():
+        state['deck'] = _dict_deck()
+
+    def reset_deck():
+        state['deck'] = Deck()
+
+    results = [
+        ('dict deck, np.random.choice', _rate(
+            lambda: [_dict_give_card(state['deck']) for _ in range(n)], reset_dict, n)),
+        ('Deck.draw, global np.random', _rate(
+            lambda: [state['deck'].draw() for _ in range(n)], reset_deck, n)),
+        ('Deck.draw, Generator', _rate(
+            lambda: [state['deck'].draw(rng) for _ in range(n)], reset_deck, n)),
+        ('Deck.deal(12), Generator', _rate(
+            lambda: [state['deck'].deal(12, rng) for _ in range(n // 12)], reset_deck, n // 12 * 12)),
+        ('dict deck copy', _rate(lambda: [dict(state['deck']) for _ in range(n)], reset_dict, n)),
+        ('Deck.copy', _rate(lambda: [state['deck'].copy() for _ in range(n)], reset_deck, n)),
+    ]
+    for name, rate in results:
+        print('{:<32} {:>12,.0f} /s'.format(name, rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+"""
+Measures the throughput of `skyjo.env.VectorEnv` in env-steps/sec for several batch sizes.
+Every env-step is one agent action plus all opponent turns until the agent has to act again.
+
+Run with `python benchmarks/bench_env.py [n_steps]`.
+"""
+import sys
+import time
+import numpy as np
+
+from skyjo.env import VectorEnv
+
+
+def bench(n_envs, n_steps, n_players=2):
+    env = VectorEnv(n_envs, n_players)
+    _, legal = env.reset(seed=0)
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for _ in range(n_steps):
+        actions = np.where(legal, rng.random(legal.shape), -1).argmax(axis=1)
+        _, _, _, legal = env.step(actions)
+    return n_envs * n_steps / (time.perf_counter() - start)
+
+
+def main(n_steps=200):
+    for n_envs in (1, 64, 1024, 8192):
+        print('{:>6} envs {:>12,.0f} env-steps/s'.format(n_envs, bench(n_envs, n_steps)))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
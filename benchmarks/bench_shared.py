@@ -0,0 +1,60 @@
+"""
+Compares the throughput of collecting game results from a process pool:
+
+- `pickle`: workers return one dict per game, which is pickled and sent through a pipe
+- `chunks`: `run_tournament`, workers return one structured array per chunk
+- `shared`: `run_shared_tournament`, workers write records into a shared memory block
+
+Run with `python benchmarks/bench_shared.py [n_games] [workers] [chunk_size]`.
+"""
+import os
+import sys
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from skyjo.game import iter_results
+from skyjo.solver import simple_solver
+from skyjo.tournament import _chunks, run_tournament, run_shared_tournament
+
+SOLVERS = (simple_solver, simple_solver)
+
+
+def _play_dicts(seed_seq, start, count):
+    rng = np.random.default_rng(seed_seq)
+    return [{'game': int(r['game']), 'winner': int(r['winner']), 'scores': r['scores'].tolist()}
+            for r in iter_results(SOLVERS, count, rng, start)]
+
+
+def bench_pickle(n_games, workers, chunk_size):
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_play_dicts, *chunk) for chunk in _chunks(n_games, workers, 0, chunk_size)]
+        results = [result for future in futures for result in future.result()]
+    wins = np.bincount([r['winner'] for r in results], minlength=2)
+    return n_games / (time.perf_counter() - start), wins
+
+
+def bench_chunks(n_games, workers, chunk_size):
+    start = time.perf_counter()
+    results = np.concatenate(list(run_tournament(n_games, SOLVERS, workers, 0, chunk_size)))
+    wins = np.bincount(results['winner'], minlength=2)
+    return n_games / (time.perf_counter() - start), wins
+
+
+def bench_shared(n_games, workers, chunk_size):
+    start = time.perf_counter()
+    with run_shared_tournament(n_games, SOLVERS, workers, 0, chunk_size) as shared:
+        wins = np.bincount(shared.records['winner'], minlength=2)
+    return n_games / (time.perf_counter() - start), wins
+
+
+def main(n_games=2000, workers=None, chunk_size=10):
+    workers = workers or max(2, os.cpu_count())
+    for name, bench in (('pickle', bench_pickle), ('chunks', bench_chunks), ('shared', bench_shared)):
+        rate, wins = bench(n_games, workers, chunk_size)
+        print('{:<8} {:>8,.0f} games/s  wins {}'.format(name, rate, wins.tolist()))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,59 @@
+"""
+Compares the bytes and the encoding time per action of serializing the full state with `NumpyEncoder`, as
+`logger_middleware` does, against the deltas of `skyjo.middleware.SpectatorFeed`.
+
+Run with `python benchmarks/bench_spectator.py [n_games] [n_players]`.
+"""
+import json
+import sys
+import time
+import numpy as np
+
+from skyjo.game import play_game
+from skyjo.middleware import SpectatorFeed, spectator_middleware
+from skyjo.NumpyEncoder import NumpyEncoder
+from skyjo.solver import simple_solver
+
+
+def _full_state_middleware(sizes):
+    def middleware(dispatch, state_func):
+        def next_func(next_handler):
+            def action_func(action):
+                val = next_handler(action)
+                sizes.append(len(json.dumps(state_func(), cls=NumpyEncoder).encode()))
+                return val
+            return action_func
+        return next_func
+    return middleware
+
+
+def _measure(middleware_func, n_games, n_players):
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for game in range(n_games):
+        play_game([simple_solver] * n_players, rng, seed=game, middlewares=[middleware_func()])
+    return time.perf_counter() - start
+
+
+def main(n_games=200, n_players=4):
+    baseline = _measure(lambda: (lambda dispatch, state_func: lambda next_handler: next_handler), n_games, n_players)
+
+    sizes = []
+    full = _measure(lambda: _full_state_middleware(sizes), n_games, n_players)
+    actions = len(sizes)
+    print('{:<8} {:>8,.0f} bytes/action {:>8.1f}us/action'.format(
+        'full', sum(sizes) / actions, (full - baseline) / actions * 1e6))
+
+    feeds = []
+
+    def delta_middleware():
+        feeds.append(SpectatorFeed())
+        return spectator_middleware(feeds[-1])
+
+    delta = _measure(delta_middleware, n_games, n_players)
+    print('{:<8} {:>8,.0f} bytes/action {:>8.1f}us/action'.format(
+        'delta', sum(feed.bytes_encoded for feed in feeds) / actions, (delta - baseline) / actions * 1e6))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,68 @@
+"""
+Compares games/sec of the aioredux store against the synchronous store of `skyjo.game.play_game`.
+
+Run with `python benchmarks/bench_store.py [n_games]`.
+"""
+import asyncio
+import sys
+import time
+import aioredux
+import numpy as np
+
+from skyjo.actions import ActionCreator, ActionType
+from skyjo.exceptions import GameFinishException
+from skyjo.game import play_game
+from skyjo.reducer import reducer
+from skyjo.solver import simple_solver
+
+
+async def play_aioredux(rng, n_players=2):
+    """
+    The game loop of `skyjo.sample_game.go` without logging.
+    """
+    store = await aioredux.create_store(reducer, {})
+    await store.dispatch(ActionCreator.reset_game(int(rng.integers(2 ** 63))))
+    for ix in range(n_players):
+        await store.dispatch(ActionCreator.add_player('Player {}'.format(ix)))
+    await store.dispatch(ActionCreator.open_game())
+    try:
+        while True:
+            state = store.state
+            action = simple_solver(
+                state['players'], state['current_player_ix'], state['play_card'], state['deck_locked'], rng=rng)
+            await store.dispatch(action)
+            if action['type'] in (ActionType.PLAY_TAKE, ActionType.PLAY_REJECT):
+                await store.dispatch(ActionCreator.next_player())
+    except GameFinishException:
+        return store.state
+
+
+def bench_aioredux(n_games):
+    rng = np.random.default_rng(0)
+
+    async def run():
+        for _ in range(n_games):
+            await play_aioredux(rng)
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    return n_games / (time.perf_counter() - start)
+
+
+def bench_sync(n_games):
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for _ in range(n_games):
+        play_game([simple_solver, simple_solver], rng)
+    return n_games / (time.perf_counter() - start)
+
+
+def main(n_games=200):
+    aio = bench_aioredux(n_games)
+    sync = bench_sync(n_games)
+    print('{:<12} {:>8,.0f} games/s'.format('aioredux', aio))
+    print('{:<12} {:>8,.0f} games/s ({:.2f}x)'.format('sync store', sync, sync / aio))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
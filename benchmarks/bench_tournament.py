@@ -0,0 +1,24 @@
+"""
+Measures games/sec of `skyjo.tournament.run_tournament` for an increasing number of worker processes.
+
+Run with `python benchmarks/bench_tournament.py [n_games]`.
+"""
+import os
+import sys
+import time
+
+from skyjo.tournament import run_tournament
+
+
+def main(n_games=2000):
+    base = None
+    for workers in range(1, (os.cpu_count() or 1) + 1):
+        start = time.perf_counter()
+        n = sum(len(chunk) for chunk in run_tournament(n_games, workers=workers, chunk_size=250))
+        rate = n / (time.perf_counter() - start)
+        base = base or rate
+        print('{:>2} workers: {:>10,.0f} games/s ({:.2f}x)'.format(workers, rate, rate / base))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
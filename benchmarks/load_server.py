@@ -0,0 +1,94 @@
+"""
+Load generator for `skyjo.server`. Starts the server on a Unix socket in a subprocess and lets `clients` simulated
+clients play `tables` tables each, one after the other. Every client sends random legal actions and waits `think`
+seconds between its actions.
+
+Reports the p50/p99 latency of ACTION requests and the CPU time the server needed per action, which includes
+its start-up and the CREATE and CLOSE requests. Tables per core is the number of tables a single core can serve if
+every table sends an action every `think` seconds.
+
+Run with `python benchmarks/load_server.py [clients] [tables] [think]`.
+"""
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+from skyjo.actions import EncodedActionCreator, GIVE_INDEX, REJECT_INDEX
+
+
+def _code(ix):
+    if ix == GIVE_INDEX:
+        return EncodedActionCreator.play_give()
+    if ix < REJECT_INDEX:
+        return EncodedActionCreator.play_take(ix - GIVE_INDEX - 1)
+    return EncodedActionCreator.play_reject(ix - REJECT_INDEX)
+
+
+def _legal(reply):
+    bits = int(reply.split()[2], 16)
+    return [ix for ix in range(25) if bits >> ix & 1]
+
+
+async def _client(path, client_ix, tables, think, latencies):
+    rng = np.random.default_rng(client_ix)
+    reader, writer = await asyncio.open_unix_connection(path)
+    for table_ix in range(tables):
+        name = 'c{}t{}'.format(client_ix, table_ix)
+        writer.write('CREATE {} 2 {}\n'.format(name, client_ix * tables + table_ix).encode())
+        legal = _legal((await reader.readline()).decode())
+        while legal:
+            await asyncio.sleep(think)
+            line = 'ACTION {} {}\n'.format(name, _code(rng.choice(legal))).encode()
+            start = time.perf_counter()
+            writer.write(line)
+            reply = (await reader.readline()).decode()
+            latencies.append(time.perf_counter() - start)
+            legal = _legal(reply)
+        writer.write('CLOSE {}\n'.format(name).encode())
+        await reader.readline()
+    writer.close()
+
+
+async def _wait_for(path, process):
+    while not os.path.exists(path):
+        if process.poll() is not None:
+            raise RuntimeError('The server exited with code {}.'.format(process.returncode))
+        await asyncio.sleep(.05)
+
+
+async def _run(path, process, clients, tables, think):
+    await _wait_for(path, process)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(path, ix, tables, think, latencies) for ix in range(clients)))
+    return np.array(latencies), time.perf_counter() - start
+
+
+def main(clients=200, tables=5, think=.01):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'skyjo.sock')
+        process = subprocess.Popen([sys.executable, '-m', 'skyjo.server', '--unix', path])
+        try:
+            latencies, duration = asyncio.run(_run(path, process, clients, tables, think))
+        finally:
+            process.terminate()
+            process.wait()
+
+    # the server is the only child process, so its CPU time is the CPU time of all children
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu_per_action = (usage.ru_utime + usage.ru_stime) / len(latencies)
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print('{} clients, {} tables, {:,} actions in {:.1f}s ({:,.0f} actions/s)'.format(
+        clients, clients * tables, len(latencies), duration, len(latencies) / duration))
+    print('latency p50 {:.2f}ms  p99 {:.2f}ms'.format(p50, p99))
+    print('server cpu {:.0f}us/action, {:,.0f} tables/core at {}s think time'.format(
+        cpu_per_action * 1e6, think / cpu_per_action, think))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:3]), *map(float, sys.argv[3:4]))
@@ -0,0 +1,251 @@
+"""
+Benchmark suite for reducer actions, deck draws, solvers, full games, the vectorized environment and the state codec.
+
+Every benchmark reports operations per second. Results can be saved as a JSON baseline tagged with the machine
+they were measured on, and later runs on the same machine are compared against it:
+
+    python benchmarks/suite.py --save               # measure and store the baseline of this machine
+    python benchmarks/suite.py --threshold 0.15     # measure and fail if anything got more than 15% slower
+
+Use `--filter` to run a subset of the benchmarks, e.g. `--filter reducer` or `--filter reducer.PLAY_GIVE`. Only the
+groups that can contain a matching name are run; a filter that names no group runs all of them.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import timeit
+
+import numpy as np
+
+from skyjo.actions import ActionCreator, ActionType
+from skyjo.game import play_game
+from skyjo.reducer import reducer, _give_card, _generate_deck
+from skyjo.solver import simple_solver
+
+from bench_codec import bench as _bench_codec, opened_state as _codec_state
+from bench_env import bench as _bench_env
+from bench_store import play_aioredux
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+
+def machine_tag():
+    """
+    Identifies the machine and interpreter a baseline was measured with.
+    """
+    return '{}-{}-{}-py{}'.format(
+        platform.node(), platform.system(), platform.machine(), '.'.join(platform.python_version_tuple()[:2])
+    ).lower()
+
+
+def _rate(func, number, setup=None, repeat=5):
+    """
+    Returns the best rate of `number` calls of `func` in operations per second.
+    `setup` is called before every repetition and its result passed to `func`.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = timeit.default_timer()
+        for _ in range(number):
+            func(arg)
+        best = min(best, timeit.default_timer() - start)
+    return number / best
+
+
+def _opened_state(n_players=2, seed=0):
+    state = reducer({}, ActionCreator.reset_game(seed))
+    for ix in range(n_players):
+        state = reducer(state, ActionCreator.add_player('Player {}'.format(ix)))
+    return reducer(state, ActionCreator.open_game())
+
+
+def _hidden_pos(state):
+    player = state['players'][state['current_player_ix']]
+    return tuple(np.argwhere(np.isnan(player['mask']))[0])
+
+
+def bench_reducer(number):
+    """
+    Latency of `reducer` per action type.
+    """
+    opened = _opened_state()
+    initial = reducer({}, ActionCreator.reset_game(0))
+    pos = _hidden_pos(opened)
+    cases = {
+        ActionType.RESET_GAME: (initial, ActionCreator.reset_game()),
+        ActionType.LOCK_DECK: (opened, ActionCreator.lock_deck(True)),
+        ActionType.NEXT_PLAYER: (opened, ActionCreator.next_player()),
+        ActionType.PLAY_GIVE: (opened, ActionCreator.play_give()),
+        ActionType.PLAY_TAKE: (opened, ActionCreator.play_take(pos)),
+        ActionType.PLAY_REJECT: (opened, ActionCreator.play_reject(pos)),
+        ActionType.ADD_PLAYER: (initial, ActionCreator.add_player('Foo')),
+        ActionType.OPEN_GAME: (reducer(reducer(initial, ActionCreator.add_player('Foo')),
+                                       ActionCreator.add_player('Bar')), ActionCreator.open_game()),
+    }
+    return {
+        'reducer.{}'.format(action_type): _rate(lambda _, s=state, a=action: reducer(s, a), number)
+        for action_type, (state, action) in cases.items()
+    }
+
+
+def bench_deck(number):
+    """
+    Card draws per second of `_give_card`.
+    """
+    number = min(number, 150)
+    return {'deck.give_card': _rate(lambda deck: _give_card(deck), number, setup=_generate_deck)}
+
+
+def bench_solver(number, player_counts=(2, 4, 6, 8)):
+    """
+    Decisions per second of `simple_solver` by number of players.
+    """
+    results = {}
+    for n_players in player_counts:
+        state = _opened_state(n_players)
+        rng = np.random.default_rng(0)
+        args = (state['players'], state['current_player_ix'], state['play_card'], True)
+        results['simple_solver.players_{}'.format(n_players)] = _rate(
+            lambda _: simple_solver(*args, rng=rng), number)
+    return results
+
+
+def bench_games(number):
+    """
+    Full games per second through the aioredux store and through the synchronous game loop.
+    """
+    number = max(1, number // 200)
+    rng = np.random.default_rng(0)
+
+    def aioredux_games(_):
+        asyncio.run(play_aioredux(rng))
+
+    return {
+        'games.aioredux': _rate(aioredux_games, number, repeat=3),
+        'games.sync': _rate(lambda _: play_game([simple_solver, simple_solver], rng), number, repeat=3),
+    }
+
+
+def bench_env(number):
+    """
+    Env-steps per second of `skyjo.env.VectorEnv` with 1024 parallel games.
+    """
+    return {'env.steps_1024': _bench_env(1024, max(1, number // 40))}
+
+
+def bench_codec(number):
+    """
+    Encodes and decodes per second of a 4 player state, binary and JSON.
+    """
+    results = {}
+    for name, (_, encodes, decodes) in _bench_codec(_codec_state(4), number).items():
+        results['codec.{}.encode'.format(name)] = encodes
+        results['codec.{}.decode'.format(name)] = decodes
+    return results
+
+
+# benchmarks by the prefix of their result names
+BENCHMARKS = {
+    'reducer': bench_reducer,
+    'deck': bench_deck,
+    'simple_solver': bench_solver,
+    'games': bench_games,
+    'env': bench_env,
+    'codec': bench_codec,
+}
+
+
+def _selected(group, name_filter):
+    """
+    Returns whether the results of `group` can contain a name that matches `name_filter`.
+    """
+    return name_filter is None or name_filter in group or name_filter.startswith(group + '.')
+
+
+def run(number=2000, name_filter=None):
+    # a filter that does not select a group, e.g. `PLAY_GIVE`, is matched against the names of all results
+    groups = [group for group in BENCHMARKS if _selected(group, name_filter)] or list(BENCHMARKS)
+    results = {}
+    for group in groups:
+        for name, rate in BENCHMARKS[group](number).items():
+            if name_filter is None or name_filter in name:
+                results[name] = rate
+    return results
+
+
+def baseline_path(tag=None):
+    return os.path.join(BASELINE_DIR, '{}.json'.format(tag or machine_tag()))
+
+
+def save_baseline(results, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({
+            'machine': machine_tag(),
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'results': results,
+        }, f, indent=2, sort_keys=True)
+
+
+def compare(results, baseline, threshold):
+    """
+    Compares results against a baseline. Returns the names of all benchmarks whose throughput dropped by more than
+    `threshold` (a fraction of the baseline).
+    """
+    regressions = []
+    for name, rate in sorted(results.items()):
+        base = baseline.get(name)
+        if base is None:
+            print('{:<36} {:>14,.0f} /s  (no baseline)'.format(name, rate))
+            continue
+        change = rate / base - 1
+        regressed = change < -threshold
+        if regressed:
+            regressions.append(name)
+        print('{:<36} {:>14,.0f} /s  {:>+7.1%}{}'.format(name, rate, change, '  REGRESSION' if regressed else ''))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--save', action='store_true', help='store the results as baseline of this machine')
+    parser.add_argument('--baseline', help='baseline file to compare against (default: baseline of this machine)')
+    parser.add_argument('--threshold', type=float, default=.1, help='allowed relative slowdown (default: 0.1)')
+    parser.add_argument('--number', type=int, default=2000, help='calls per measurement (default: 2000)')
+    parser.add_argument('--filter', help='only run benchmarks whose group or name contains this string')
+    args = parser.parse_args(argv)
+
+    results = run(args.number, args.filter)
+    path = args.baseline or baseline_path()
+
+    if args.save:
+        save_baseline(results, path)
+        for name, rate in sorted(results.items()):
+            print('{:<36} {:>14,.0f} /s'.format(name, rate))
+        print('Saved baseline to {}'.format(path))
+        return 0
+
+    if not os.path.exists(path):
+        for name, rate in sorted(results.items()):
+            print('{:<36} {:>14,.0f} /s'.format(name, rate))
+        print('No baseline found at {}, run with --save to create one.'.format(path))
+        return 0
+
+    with open(path) as f:
+        baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print('{} benchmark(s) regressed by more than {:.0%}: {}'.format(
+            len(regressions), args.threshold, ', '.join(regressions)))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,24 +1,22 @@
 import json
 import numpy as np
+from skyjo.deck import Deck, DrawStream
 
 
 class NumpyEncoder(json.JSONEncoder):
-    int_types = (
-        np.int_, np.intc, np.intp, np.int8, np.int16, np.int32, np.int64, np.uint8, np.uint16, np.uint32, np.uint64
-    )
-    float_types = (
-        np.float_, np.float16, np.float32, np.float64, np.float128
-    )
-    bool_types = (np.bool_,)
-    tolist_types = (np.ndarray,)
+    """
+    JSON encoder for states and actions. For a faster JSON serialization of states, or a compact binary one,
+    see `skyjo.codec`.
+    """
 
     def default(self, obj):
-        if isinstance(obj, self.int_types):
-            return int(obj)
-        if isinstance(obj, self.float_types):
-            return float(obj)
-        if isinstance(obj, self.bool_types):
-            return bool(obj)
-        if isinstance(obj, self.tolist_types):
+        if isinstance(obj, np.ndarray):
             return obj.tolist()
+        # numpy scalars of any type, converted to the corresponding Python type
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if isinstance(obj, Deck):
+            return obj.to_dict()
+        if isinstance(obj, DrawStream):
+            return None
         return json.JSONEncoder.default(self, obj)
@@ -9,11 +9,45 @@ class ActionType:
     OPEN_GAME = 'OPEN_GAME'
 
 
+class Opcode:
+    NEXT_PLAYER = 0
+    PLAY_GIVE = 1
+    PLAY_TAKE = 2
+    PLAY_REJECT = 3
+    LOCK_DECK = 4
+    RESET_GAME = 5
+    ADD_PLAYER = 6
+    OPEN_GAME = 7
+
+
+OPCODES = {
+    ActionType.NEXT_PLAYER: Opcode.NEXT_PLAYER,
+    ActionType.PLAY_GIVE: Opcode.PLAY_GIVE,
+    ActionType.PLAY_TAKE: Opcode.PLAY_TAKE,
+    ActionType.PLAY_REJECT: Opcode.PLAY_REJECT,
+    ActionType.LOCK_DECK: Opcode.LOCK_DECK,
+    ActionType.RESET_GAME: Opcode.RESET_GAME,
+    ActionType.ADD_PLAYER: Opcode.ADD_PLAYER,
+    ActionType.OPEN_GAME: Opcode.OPEN_GAME,
+}
+ACTION_TYPES = {opcode: action_type for action_type, opcode in OPCODES.items()}
+
+# (row, col) of every flat card position 0-11
+POSITIONS = tuple(divmod(pos, 4) for pos in range(12))
+
+# Layout of the legal action mask: drawing from the deck, then taking the play card at and rejecting it
+# by revealing each flat card position
+GIVE_INDEX = 0
+TAKE_INDEX = 1
+REJECT_INDEX = 13
+N_ACTIONS = 25
+
+
 class ActionCreator:
 
     @staticmethod
-    def reset_game():
-        return {'type': ActionType.RESET_GAME}
+    def reset_game(seed=None):
+        return {'type': ActionType.RESET_GAME, 'seed': seed}
 
     @staticmethod
     def lock_deck(lock):
@@ -42,3 +76,98 @@ class ActionCreator:
     @staticmethod
     def open_game():
         return {'type': ActionType.OPEN_GAME}
+
+
+class EncodedActionCreator:
+    """
+    Counterpart of `ActionCreator` that creates actions encoded as a single int, see `encode_action`.
+    Positions are flat (`row * 4 + col`).
+    """
+
+    @staticmethod
+    def reset_game():
+        return Opcode.RESET_GAME << 4
+
+    @staticmethod
+    def lock_deck(lock):
+        return Opcode.LOCK_DECK << 4 | bool(lock)
+
+    @staticmethod
+    def next_player():
+        return Opcode.NEXT_PLAYER << 4
+
+    @staticmethod
+    def play_give():
+        return Opcode.PLAY_GIVE << 4
+
+    @staticmethod
+    def play_take(pos):
+        return Opcode.PLAY_TAKE << 4 | pos
+
+    @staticmethod
+    def play_reject(pos):
+        return Opcode.PLAY_REJECT << 4 | pos
+
+    @staticmethod
+    def add_player():
+        return Opcode.ADD_PLAYER << 4
+
+    @staticmethod
+    def open_game():
+        return Opcode.OPEN_GAME << 4
+
+
+def encode_action(action):
+    """
+    Encodes an action as an int that holds the opcode in the upper and the flat card position or the lock flag in
+    the lower four bits. The seed of `RESET_GAME` and the name of `ADD_PLAYER` are not encoded; decoded games are
+    unseeded and players get default names.
+    """
+    opcode = OPCODES[action['type']]
+    if opcode in (Opcode.PLAY_TAKE, Opcode.PLAY_REJECT):
+        row, col = action['pos']
+        return opcode << 4 | int(row) * 4 + int(col)
+    if opcode == Opcode.LOCK_DECK:
+        return opcode << 4 | bool(action['lock'])
+    return opcode << 4
+
+
+def decode_action(code):
+    """
+    Decodes an action encoded with `encode_action` into its dict form.
+    """
+    opcode, arg = divmod(int(code), 16)
+    if opcode not in ACTION_TYPES:
+        raise ValueError('Unknown opcode {}.'.format(opcode))
+    action_type = ACTION_TYPES[opcode]
+    if opcode in (Opcode.PLAY_TAKE, Opcode.PLAY_REJECT):
+        return {'type': action_type, 'pos': POSITIONS[arg]}
+    if opcode == Opcode.LOCK_DECK:
+        return ActionCreator.lock_deck(bool(arg))
+    if opcode == Opcode.RESET_GAME:
+        return ActionCreator.reset_game()
+    if opcode == Opcode.ADD_PLAYER:
+        return {'type': action_type, 'name': None}
+    return {'type': action_type}
+
+
+def action_index(action):
+    """
+    Returns the index of a PLAY_GIVE, PLAY_TAKE or PLAY_REJECT action in the legal action mask.
+    """
+    if action['type'] == ActionType.PLAY_GIVE:
+        return GIVE_INDEX
+    row, col = action['pos']
+    offset = TAKE_INDEX if action['type'] == ActionType.PLAY_TAKE else REJECT_INDEX
+    return offset + int(row) * 4 + int(col)
+
+
+def index_action(ix):
+    """
+    Returns the action at index `ix` of the legal action mask.
+    """
+    if ix == GIVE_INDEX:
+        return ActionCreator.play_give()
+    if ix < REJECT_INDEX:
+        return ActionCreator.play_take(POSITIONS[ix - TAKE_INDEX])
+    return ActionCreator.play_reject(POSITIONS[ix - REJECT_INDEX])
@@ -0,0 +1,384 @@
+import numpy as np
+from skyjo.actions import ActionType, GIVE_INDEX, TAKE_INDEX, REJECT_INDEX, N_ACTIONS
+from skyjo.deck import Deck, CARD_VALUES, DECK_COUNTS
+from skyjo.exceptions import DeckLockedException
+from skyjo.reducer import compute_totals
+
+NO_CARD = np.iinfo(np.int8).min
+NO_PLAYER = -1
+
+# Moves returned by batch policies
+GIVE, TAKE, REJECT = 0, 1, 2
+
+
+def _create_initial_batch_state(n_games, n_players, names):
+    return {
+        'names': list(names),
+        'cards': np.zeros((n_games, n_players, 3, 4), dtype=np.int8),
+        'mask': np.zeros((n_games, n_players, 3, 4), dtype=bool),
+        'deck': np.tile(DECK_COUNTS, (n_games, 1)),
+        'play_card': np.full(n_games, NO_CARD, dtype=np.int8),
+        'initial_player_ix': np.full(n_games, NO_PLAYER, dtype=np.int8),
+        'finish_player_ix': np.full(n_games, NO_PLAYER, dtype=np.int8),
+        'current_player_ix': np.full(n_games, NO_PLAYER, dtype=np.int8),
+        'deck_locked': np.zeros(n_games, dtype=bool),
+        'done': np.zeros(n_games, dtype=bool),
+    }
+
+
+def create_batch_state(n_games, n_players, rng=None, names=None):
+    """
+    Creates `n_games` fresh games with `n_players` players each and deals 12 cards to every player.
+    This is the batched equivalent of RESET_GAME followed by one ADD_PLAYER per player.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    if names is None:
+        names = ['Player {}'.format(i) for i in range(n_players)]
+    state = _create_initial_batch_state(n_games, n_players, names)
+    return reset_games(state, np.arange(n_games), rng)
+
+
+def reset_games(state, games, rng):
+    """
+    Replaces the games with indices `games` by fresh games and deals 12 cards to every player.
+    """
+    state = _copy(state, 'cards', 'mask', 'deck', 'play_card', 'initial_player_ix', 'finish_player_ix',
+                  'current_player_ix', 'deck_locked', 'done')
+    n_games, n_players = state['cards'].shape[:2]
+    state['mask'][games] = False
+    state['deck'][games] = DECK_COUNTS
+    state['play_card'][games] = NO_CARD
+    for key in ('initial_player_ix', 'finish_player_ix', 'current_player_ix'):
+        state[key][games] = NO_PLAYER
+    state['deck_locked'][games] = False
+    state['done'][games] = False
+    cards = state['cards'].reshape(n_games, n_players, 12)
+    for p in range(n_players):
+        for i in range(12):
+            cards[games, p, i] = _draw_cards(state['deck'], games, rng)
+    return state
+
+
+def _draw_cards(deck, games, rng, keys=None):
+    """
+    Draws one card for each game in `games` and removes it from the deck counts in place.
+    A uniform integer below the deck size is located in the cumulative counts, which yields
+    the same distribution as drawing with probabilities proportional to the counts.
+    If given, the uniform random numbers in [0, 1) of `keys` are used instead of `rng`.
+    """
+    cum = np.cumsum(deck[games], axis=1)
+    if keys is None:
+        u = rng.integers(0, cum[:, -1])
+    else:
+        u = (keys * cum[:, -1]).astype(int)
+    ix = (cum > u[:, None]).argmax(axis=1)
+    deck[games, ix] -= 1
+    return CARD_VALUES[ix]
+
+
+def _reshuffle_empty_decks(state, games):
+    """
+    Refills empty decks with their discard pile, i.e. all cards that are neither in a grid nor the play card.
+    """
+    empty = games[state['deck'][games].sum(axis=1) == 0]
+    if len(empty) == 0:
+        return
+    cards = state['cards'][empty].reshape(len(empty), -1)
+    in_play = (cards[:, :, None] == CARD_VALUES).sum(axis=1)
+    in_play[np.arange(len(empty)), state['play_card'][empty] + 2] += 1
+    state['deck'][empty] = DECK_COUNTS - in_play
+
+
+def _select(state, action):
+    """
+    Returns the indices of the games an action applies to. Finished games are never touched.
+    """
+    games = action.get('games')
+    active = ~state['done']
+    if games is not None:
+        active &= games
+    return np.flatnonzero(active)
+
+
+def _copy(state, *keys):
+    return {**state, **{key: state[key].copy() for key in keys if key in state}}
+
+
+def _draw_keys(state, games):
+    """
+    Returns the next pre-drawn random number of each game if the state holds `draw_keys` and `draw_count`.
+    Games that share their draw keys draw the same sequence of cards no matter which moves are played,
+    as long as their decks were equal to begin with (common random numbers).
+    """
+    if 'draw_keys' not in state:
+        return None
+    keys = state['draw_keys']
+    count = state['draw_count']
+    drawn = keys[games, count[games] % keys.shape[1]]
+    count[games] += 1
+    return drawn
+
+
+def _finish_check(state, games):
+    finish = state['finish_player_ix']
+    games = games[finish[games] == NO_PLAYER]
+    cur = state['current_player_ix'][games]
+    revealed = state['mask'][games, cur].reshape(len(games), 12).all(axis=1)
+    finish[games[revealed]] = cur[revealed]
+
+
+def _positions(action, games):
+    pos = np.asarray(action['pos'])
+    if pos.ndim == 0:
+        return np.full(len(games), pos)
+    return pos[games] if len(pos) != len(games) else pos
+
+
+def batch_reducer(state, action, rng=None):
+    """
+    Applies an action to a batch of games in one vectorized step.
+
+    Actions use the same types as `skyjo.reducer.reducer`. The optional boolean array `games`
+    restricts an action to a subset of the batch; finished games are always skipped.
+    Positions of PLAY_TAKE and PLAY_REJECT are given as flat indices `row * 4 + col`, either as
+    one array entry per batch game or one entry per selected game.
+    Instead of raising a GameFinishException, NEXT_PLAYER marks the affected games as done.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    games = _select(state, action)
+    n = len(games)
+
+    if action['type'] == ActionType.NEXT_PLAYER:
+        state = _copy(state, 'current_player_ix', 'done')
+        n_players = state['cards'].shape[1]
+        ix = (state['current_player_ix'][games] + 1) % n_players
+        finished = state['finish_player_ix'][games] == ix
+        state['done'][games[finished]] = True
+        state['current_player_ix'][games[~finished]] = ix[~finished]
+        return state
+    elif action['type'] == ActionType.PLAY_GIVE:
+        if np.any(state['deck_locked'][games]):
+            raise DeckLockedException()
+        state = _copy(state, 'deck', 'play_card', 'deck_locked', 'draw_count')
+        _reshuffle_empty_decks(state, games)
+        state['play_card'][games] = _draw_cards(state['deck'], games, rng, _draw_keys(state, games))
+        state['deck_locked'][games] = True
+        return state
+    elif action['type'] == ActionType.PLAY_TAKE:
+        state = _copy(state, 'cards', 'mask', 'play_card', 'deck_locked', 'finish_player_ix')
+        pos = _positions(action, games)
+        cur = state['current_player_ix'][games]
+        cards = state['cards'].reshape(len(state['done']), -1, 12)
+        mask = state['mask'].reshape(cards.shape)
+        old_card = cards[games, cur, pos]
+        cards[games, cur, pos] = state['play_card'][games]
+        mask[games, cur, pos] = True
+        state['play_card'][games] = old_card
+        state['deck_locked'][games] = False
+        _finish_check(state, games)
+        return state
+    elif action['type'] == ActionType.PLAY_REJECT:
+        state = _copy(state, 'mask', 'deck_locked', 'finish_player_ix')
+        pos = _positions(action, games)
+        cur = state['current_player_ix'][games]
+        mask = state['mask'].reshape(len(state['done']), -1, 12)
+        mask[games, cur, pos] = True
+        state['deck_locked'][games] = False
+        _finish_check(state, games)
+        return state
+    elif action['type'] == ActionType.OPEN_GAME:
+        state = _copy(state, 'mask', 'deck', 'play_card', 'initial_player_ix', 'current_player_ix', 'draw_count')
+        n_players = state['cards'].shape[1]
+        mask = state['mask'].reshape(len(state['done']), n_players, 12)
+
+        # reveal two random unrevealed cards per player by picking the two smallest random keys
+        keys = rng.random((n, n_players, 12))
+        keys[mask[games]] = np.inf
+        picks = np.argpartition(keys, 1, axis=2)[:, :, :2]
+        g = np.repeat(games, n_players * 2)
+        p = np.tile(np.repeat(np.arange(n_players), 2), n)
+        mask[g, p, picks.reshape(-1)] = True
+
+        scores = np.where(mask[games], state['cards'].reshape(mask.shape)[games], 0).sum(axis=2)
+        initial_player_ix = np.argmax(scores, axis=1)
+        state['initial_player_ix'][games] = initial_player_ix
+        state['current_player_ix'][games] = initial_player_ix
+        state['play_card'][games] = _draw_cards(state['deck'], games, rng, _draw_keys(state, games))
+        return state
+
+    return state
+
+
+def batch_legal_actions(state):
+    """
+    Batched equivalent of `skyjo.reducer.legal_actions`. Returns a boolean array of shape (games, N_ACTIONS),
+    in which no moves are legal for finished games and games that have not been opened.
+    """
+    n_games = len(state['done'])
+    legal = np.zeros((n_games, N_ACTIONS), dtype=bool)
+    active = ~state['done'] & (state['play_card'] != NO_CARD)
+    games = np.flatnonzero(active)
+    hidden = ~state['mask'][games, state['current_player_ix'][games]].reshape(len(games), 12)
+    legal[games, GIVE_INDEX] = ~state['deck_locked'][games]
+    legal[games, TAKE_INDEX:REJECT_INDEX] = True
+    legal[games, REJECT_INDEX:] = hidden
+    return legal
+
+
+def index_moves(indices):
+    """
+    Converts indices of the legal action mask into batch moves and flat positions for `apply_moves`.
+    """
+    indices = np.asarray(indices)
+    moves = np.where(indices == GIVE_INDEX, GIVE, np.where(indices < REJECT_INDEX, TAKE, REJECT))
+    pos = np.where(indices == GIVE_INDEX, 0, np.where(indices < REJECT_INDEX, indices - TAKE_INDEX,
+                                                      indices - REJECT_INDEX))
+    return moves, pos
+
+
+def batch_scores(state):
+    """
+    Calculates the final scores of all games, equivalent to `calculate_scores` of the sample game.
+    """
+    scores = state['cards'].sum(axis=(2, 3), dtype=np.int16)
+    finish = state['finish_player_ix'].astype(np.intp)
+    rows = np.flatnonzero(finish != NO_PLAYER)
+    double = np.argmin(scores[rows], axis=1) != finish[rows]
+    scores[rows[double], finish[rows[double]]] *= 2
+    return scores
+
+
+def _random_true(candidates, keys):
+    """
+    Returns the index of a random True entry per row, using uniform random `keys` of the same shape.
+    Rows without any True entry get an arbitrary index.
+    """
+    return np.where(candidates, keys, -1.).argmax(axis=1)
+
+
+def batch_simple_policy(state, games, rng):
+    """
+    Vectorized version of `skyjo.solver.simple_solver` for the current players of `games`.
+    Returns the move (GIVE, TAKE or REJECT) and the flat position for every game.
+    """
+    n = len(games)
+    n_games, n_players = state['cards'].shape[:2]
+    cur = state['current_player_ix'][games]
+    all_cards = state['cards'].reshape(n_games, n_players, 12)[games]
+    all_revealed = state['mask'].reshape(n_games, n_players, 12)[games]
+    cards = all_cards[np.arange(n), cur]
+    revealed = all_revealed[np.arange(n), cur]
+    hidden = ~revealed
+    n_hidden = hidden.sum(axis=1)
+    play_card = state['play_card'][games].astype(int)
+    locked = state['deck_locked'][games]
+
+    moves = np.full(n, -1)
+    pos = np.zeros(n, dtype=int)
+
+    def decide(selected, move, positions=None):
+        selected &= moves == -1
+        moves[selected] = move
+        if positions is not None:
+            pos[selected] = positions[selected]
+
+    larger = revealed & (cards > play_card[:, None])
+    equal = revealed & (cards == play_card[:, None])
+    scores = np.where(all_revealed, all_cards, 0).sum(axis=2)
+    own_score = scores[np.arange(n), cur]
+    scores[np.arange(n), cur] = np.iinfo(scores.dtype).min
+    finish_ok = np.all(scores + 4 < (own_score + play_card)[:, None], axis=1)
+
+    # every game takes at most one random choice, so all choices can share the same random keys
+    keys = rng.random((n, 12))
+    random_hidden = _random_true(hidden, keys)
+
+    decide((play_card > 4) & ~locked, GIVE)
+    decide(larger.any(axis=1), TAKE, _random_true(larger, keys))
+    take_equal = rng.random(n) > .5
+    decide(equal.any(axis=1) & take_equal, TAKE, _random_true(equal, keys))
+    decide(equal.any(axis=1), REJECT, random_hidden)
+    decide(n_hidden > 1, REJECT, random_hidden)
+    decide((n_hidden == 1) & finish_ok, TAKE, hidden.argmax(axis=1))
+    decide(~locked, GIVE)
+    # revealing the last card would finish the game with a higher score, so swap the highest card instead
+    decide(n_hidden < 12, TAKE, np.where(revealed, cards, NO_CARD).argmax(axis=1))
+    return moves, pos
+
+
+def apply_moves(state, games, moves, pos, rng):
+    """
+    Applies the moves of a batch policy to `games`. Taking or rejecting the play card ends the player's turn.
+    """
+    n_games = len(state['done'])
+    selected = np.zeros(n_games, dtype=bool)
+    full_pos = np.zeros(n_games, dtype=int)
+    full_pos[games] = pos
+    for move, action_type in ((GIVE, ActionType.PLAY_GIVE), (TAKE, ActionType.PLAY_TAKE),
+                              (REJECT, ActionType.PLAY_REJECT)):
+        selected[:] = False
+        selected[games[moves == move]] = True
+        if selected.any():
+            state = batch_reducer(state, {'type': action_type, 'pos': full_pos, 'games': selected}, rng)
+    selected[:] = False
+    selected[games[(moves == TAKE) | (moves == REJECT)]] = True
+    return batch_reducer(state, {'type': ActionType.NEXT_PLAYER, 'games': selected}, rng)
+
+
+def batch_play(state, rng, policy=batch_simple_policy):
+    """
+    Plays all games of a batch to their end with a vectorized `policy`, see `batch_simple_policy`.
+    """
+    while not state['done'].all():
+        games = np.flatnonzero(~state['done'])
+        moves, pos = policy(state, games, rng)
+        state = apply_moves(state, games, moves, pos, rng)
+    return state
+
+
+def from_states(states):
+    """
+    Stacks a list of states created by `skyjo.reducer.reducer` into one batch state.
+    All states need to have the same players.
+    """
+    n_players = len(states[0]['players'])
+    batch = _create_initial_batch_state(len(states), n_players, [p['name'] for p in states[0]['players']])
+    for g, state in enumerate(states):
+        for p, player in enumerate(state['players']):
+            batch['cards'][g, p] = player['cards']
+            batch['mask'][g, p] = player['mask'] == 1
+        batch['deck'][g] = state['deck'].counts
+        if state['play_card'] is not None:
+            batch['play_card'][g] = state['play_card']
+        for key in ('initial_player_ix', 'finish_player_ix', 'current_player_ix'):
+            if state[key] is not None:
+                batch[key][g] = state[key]
+        batch['deck_locked'][g] = state['deck_locked']
+    return batch
+
+
+def to_states(batch):
+    """
+    Converts a batch state back into a list of states as used by `skyjo.reducer.reducer`.
+    """
+    def optional(value, none):
+        return None if value == none else int(value)
+
+    states = []
+    for g in range(len(batch['done'])):
+        players = []
+        for p, name in enumerate(batch['names']):
+            cards = batch['cards'][g, p].astype(int)
+            mask = np.where(batch['mask'][g, p], 1., np.nan)
+            players.append({'name': name, 'cards': cards, 'mask': mask, **compute_totals(cards, mask)})
+        states.append({
+            'rng': None,
+            'players': players,
+            'deck': Deck(batch['deck'][g]),
+            'play_card': optional(batch['play_card'][g], NO_CARD),
+            'initial_player_ix': optional(batch['initial_player_ix'][g], NO_PLAYER),
+            'finish_player_ix': optional(batch['finish_player_ix'][g], NO_PLAYER),
+            'current_player_ix': optional(batch['current_player_ix'][g], NO_PLAYER),
+            'deck_locked': bool(batch['deck_locked'][g]),
+        })
+    return states
@@ -0,0 +1,174 @@
+"""
+Compact binary format for game states, and a JSON fallback that is compatible with `skyjo.NumpyEncoder`.
+
+Binary layout (little-endian): the header `MAGIC, VERSION, n_players, play_card, initial_player_ix,
+finish_player_ix, current_player_ix, deck_locked, has_rng` (None is stored as -128), the deck counts as 15 int16,
+the revealed masks as one uint16 bitmask per player (see `skyjo.packed.pack_mask`), the grids as 12 int8 per player
+in row-major order, the seed and number of draws of the draw stream as uint64 and uint32 if `has_rng` is set, and
+finally the length-prefixed UTF-8 player names.
+
+Decoding returns read-only views into the encoded bytes for the grids and deck counts, so no card data is copied.
+"""
+import json
+import struct
+import numpy as np
+
+from skyjo.deck import Deck, DrawStream
+from skyjo.packed import pack_mask, mask_bits
+from skyjo.reducer import compute_totals, freeze
+
+MAGIC = b'SKJS'
+VERSION = 2
+_HEADER = struct.Struct('<4sBBbbbb??')
+_RNG = struct.Struct('<QI')
+_NAME = struct.Struct('<H')
+_NONE = -128
+_DECK_SIZE = 15 * 2
+
+
+def _optional(value):
+    return _NONE if value is None else value
+
+
+def _required(value):
+    return None if value == _NONE else value
+
+
+def _check_size(data, offset, size):
+    if offset + size > len(data):
+        raise ValueError('Truncated encoded state: {} bytes needed, {} given.'.format(offset + size, len(data)))
+
+
+def encode_state(state):
+    """
+    Encodes a state produced by `reducer` into bytes. States whose seed does not fit into 64 bits can not be
+    encoded.
+    """
+    players = state['players']
+    rng = state['rng']
+    parts = [
+        _HEADER.pack(
+            MAGIC, VERSION, len(players), _optional(state['play_card']), _optional(state['initial_player_ix']),
+            _optional(state['finish_player_ix']), _optional(state['current_player_ix']), state['deck_locked'],
+            rng is not None
+        ),
+        state['deck'].counts.astype('<i2').tobytes(),
+        np.asarray(pack_mask(np.array([p['mask'] for p in players]).reshape((-1, 3, 4))), dtype='<u2').tobytes(),
+        np.array([p['cards'] for p in players], dtype=np.int8).tobytes(),
+    ]
+    if rng is not None:
+        if not 0 <= rng.seed < 2 ** 64:
+            raise ValueError('Only seeds below 2 ** 64 can be encoded.')
+        parts.append(_RNG.pack(rng.seed, rng.n))
+    for player in players:
+        name = player['name'].encode()
+        parts.append(_NAME.pack(len(name)))
+        parts.append(name)
+    return b''.join(parts)
+
+
+def decode_state(data):
+    """
+    Restores a state encoded with `encode_state`. The running totals of the players are recomputed.
+    Raises a ValueError if `data` is not an encoded state or is truncated.
+    """
+    _check_size(data, 0, _HEADER.size)
+    magic, version, n_players, play_card, initial_player_ix, finish_player_ix, current_player_ix, deck_locked, \
+        has_rng = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('Not a version {} encoded state.'.format(VERSION))
+    offset = _HEADER.size
+    _check_size(data, offset, _DECK_SIZE + 14 * n_players + (_RNG.size if has_rng else 0))
+
+    deck = Deck.__new__(Deck)
+    deck.counts = np.frombuffer(data, dtype='<i2', count=15, offset=offset)
+    deck.size = int(deck.counts.sum())
+    offset += _DECK_SIZE
+
+    masks = np.frombuffer(data, dtype='<u2', count=n_players, offset=offset)
+    offset += 2 * n_players
+    grids = np.frombuffer(data, dtype=np.int8, count=12 * n_players, offset=offset).reshape((n_players, 3, 4))
+    offset += 12 * n_players
+
+    rng = None
+    if has_rng:
+        rng = DrawStream(*_RNG.unpack_from(data, offset))
+        offset += _RNG.size
+
+    # the running totals of all players at once, see `skyjo.reducer.compute_totals`
+    revealed = mask_bits(masks).reshape((n_players, 3, 4))
+    mask = freeze(np.where(revealed, 1., np.nan))
+    visible = np.where(revealed, grids, 0.)
+    scores = visible.sum(axis=(1, 2))
+    hidden = (12 - revealed.sum(axis=(1, 2))).tolist()
+    col_sums = freeze(visible.sum(axis=1))
+
+    players = []
+    for ix in range(n_players):
+        _check_size(data, offset, _NAME.size)
+        length, = _NAME.unpack_from(data, offset)
+        offset += _NAME.size
+        _check_size(data, offset, length)
+        name = bytes(data[offset:offset + length]).decode()
+        offset += length
+        players.append({
+            'name': name, 'cards': grids[ix], 'mask': mask[ix],
+            'score': scores[ix], 'hidden': hidden[ix], 'col_sums': col_sums[ix],
+        })
+    if offset != len(data):
+        raise ValueError('{} unexpected bytes after the encoded state.'.format(len(data) - offset))
+
+    return {
+        'rng': rng,
+        'players': players,
+        'deck': deck,
+        'play_card': _required(play_card),
+        'initial_player_ix': _required(initial_player_ix),
+        'finish_player_ix': _required(finish_player_ix),
+        'current_player_ix': _required(current_player_ix),
+        'deck_locked': deck_locked,
+    }
+
+
+def _int(value):
+    return None if value is None else int(value)
+
+
+def state_to_json(state):
+    """
+    Serializes a state to the same JSON as `json.dumps(state, cls=NumpyEncoder)`, but without the encoder's
+    type dispatch. The draw stream is not serialized.
+    """
+    return json.dumps({
+        'rng': None,
+        'players': [{
+            **player,
+            'cards': player['cards'].tolist(),
+            'mask': player['mask'].tolist(),
+            'score': float(player['score']),
+            'hidden': int(player['hidden']),
+            'col_sums': player['col_sums'].tolist(),
+        } for player in state['players']],
+        'deck': state['deck'].to_dict(),
+        'play_card': _int(state['play_card']),
+        'initial_player_ix': _int(state['initial_player_ix']),
+        'finish_player_ix': _int(state['finish_player_ix']),
+        'current_player_ix': _int(state['current_player_ix']),
+        'deck_locked': bool(state['deck_locked']),
+    })
+
+
+def state_from_json(data):
+    """
+    Restores a state from JSON written by `state_to_json` or `NumpyEncoder`, given as string or parsed object.
+    The running totals of the players are recomputed.
+    """
+    if isinstance(data, (str, bytes)):
+        data = json.loads(data)
+    deck = data['deck']
+    players = []
+    for p in data['players']:
+        cards = freeze(np.array(p['cards']))
+        mask = freeze(np.array(p['mask'], dtype=float))
+        players.append({**p, 'cards': cards, 'mask': mask, **compute_totals(cards, mask)})
+    return {**data, 'players': players, 'deck': Deck([deck[str(card)] for card in range(-2, 13)])}
@@ -0,0 +1,208 @@
+"""
+Append-only trajectory dataset of fixed-width records, one per decision (PLAY_GIVE, PLAY_TAKE or PLAY_REJECT):
+the state before the decision, the encoded action, the acting player and the player's final score.
+
+A dataset file consists of a header `MAGIC, VERSION, n_players` followed by the raw `trajectory_dtype(n_players)`
+records, so it can be opened with `np.memmap` for zero-copy random access.
+
+Convert game logs with `python -m skyjo.dataset <game.log or binary log> <dataset>`.
+"""
+import argparse
+import json
+import struct
+import numpy as np
+
+from skyjo.actions import ActionType, encode_action, decode_action
+from skyjo.codec import state_from_json
+from skyjo.game import calculate_scores
+from skyjo.gamelog import MAGIC as GAME_LOG_MAGIC, read_game_log
+from skyjo.packed import pack_cards, pack_mask
+from skyjo.reducer import encoded_reducer
+
+MAGIC = b'SKYJOTRJ'
+VERSION = 1
+_HEADER = struct.Struct('<8sHB')
+_DECISIONS = (ActionType.PLAY_GIVE, ActionType.PLAY_TAKE, ActionType.PLAY_REJECT)
+
+
+def trajectory_dtype(n_players):
+    """
+    Returns the structured dtype of a single decision in a game of `n_players` players.
+    """
+    return np.dtype([
+        ('game', '<u4'),
+        ('cards', '<u8', (n_players,)),
+        ('mask', '<u2', (n_players,)),
+        ('play_card', 'i1'),
+        ('deck', '<i2', (15,)),
+        ('deck_locked', 'u1'),
+        ('action', 'u1'),
+        ('player', 'i1'),
+        ('score', '<i2'),
+    ])
+
+
+class TrajectoryWriter:
+    """
+    Writes games to a dataset file. Records are collected in a preallocated chunk of `chunk_size` records,
+    which is written to disk once it is full.
+    """
+
+    def __init__(self, path, n_players, chunk_size=65536):
+        self.n_players = n_players
+        self.games = 0
+        self.records = 0
+        self._chunk = np.zeros(chunk_size, dtype=trajectory_dtype(n_players))
+        self._size = 0
+        self._file = open(path, 'wb')
+        self._file.write(_HEADER.pack(MAGIC, VERSION, n_players))
+
+    def write_game(self, steps, final_state):
+        """
+        Writes the decisions of a game, given as `(state, action)` pairs, and the final state of the game.
+        Actions other than PLAY_GIVE, PLAY_TAKE and PLAY_REJECT are skipped.
+        """
+        scores = calculate_scores(final_state['players'], final_state['finish_player_ix'])
+        for state, action in steps:
+            if action['type'] not in _DECISIONS:
+                continue
+            if self._size == len(self._chunk):
+                self.flush()
+            record = self._chunk[self._size]
+            player = state['current_player_ix']
+            record['game'] = self.games
+            record['cards'] = [pack_cards(p['cards']) for p in state['players']]
+            record['mask'] = [pack_mask(p['mask']) for p in state['players']]
+            record['play_card'] = state['play_card']
+            record['deck'] = state['deck'].counts
+            record['deck_locked'] = state['deck_locked']
+            record['action'] = encode_action(action)
+            record['player'] = player
+            record['score'] = scores[player]
+            self._size += 1
+            self.records += 1
+        self.games += 1
+
+    def flush(self):
+        self._file.write(self._chunk[:self._size].tobytes())
+        self._file.flush()
+        self._size = 0
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class TrajectoryDataset:
+    """
+    Read-only view of a dataset file. `records` is a memory-mapped structured array.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            magic, version, n_players = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('{} is not a version {} trajectory dataset.'.format(path, VERSION))
+        self.n_players = n_players
+        dtype = trajectory_dtype(n_players)
+        self.records = np.memmap(path, dtype=dtype, mode='r', offset=_HEADER.size)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, ix):
+        return self.records[ix]
+
+    def shard(self, index, count):
+        """
+        Returns the `index`th of `count` contiguous, nearly equally sized parts of the dataset without copying.
+        """
+        bounds = np.linspace(0, len(self.records), count + 1).astype(int)
+        return self.records[bounds[index]:bounds[index + 1]]
+
+    def iter_chunks(self, chunk_size=65536):
+        for start in range(0, len(self.records), chunk_size):
+            yield self.records[start:start + chunk_size]
+
+
+def _binary_log_games(path):
+    """
+    Yields the `(state, action)` pairs and the final state of every game in a binary game log.
+    """
+    for game in read_game_log(path):
+        state = game.initial_state()
+        steps = []
+        for code in game.actions:
+            steps.append((state, decode_action(code)))
+            state = encoded_reducer(state, int(code))
+        yield steps, state
+
+
+def _json_log_games(path):
+    """
+    Yields the `(state, action)` pairs and the final state of every game in a text log written by
+    `skyjo.middleware.logger_middleware` or `queued_logger_middleware`.
+    """
+    steps, state = [], None
+    with open(path) as f:
+        for line in f:
+            if 'ACTION: ' in line:
+                action = json.loads(line.split('ACTION: ', 1)[1])
+                if action['type'] == ActionType.RESET_GAME:
+                    if steps:
+                        yield steps, state
+                    steps, state = [], None
+                elif state is not None and action['type'] in _DECISIONS:
+                    if action['type'] != ActionType.PLAY_GIVE:
+                        action['pos'] = tuple(action['pos'])
+                    steps.append((state, action))
+            elif 'NEW STATE: ' in line:
+                state = state_from_json(line.split('NEW STATE: ', 1)[1])
+    if steps:
+        yield steps, state
+
+
+def convert_log(log_path, dataset_path, chunk_size=65536):
+    """
+    Converts a binary game log (see `skyjo.gamelog`) or a JSON text log into a trajectory dataset.
+    Games that have not been finished are skipped. Returns the number of written records.
+    """
+    with open(log_path, 'rb') as f:
+        binary = f.read(len(GAME_LOG_MAGIC)) == GAME_LOG_MAGIC
+    games = _binary_log_games(log_path) if binary else _json_log_games(log_path)
+
+    writer = None
+    try:
+        for steps, final_state in games:
+            if final_state['finish_player_ix'] is None:
+                continue
+            n_players = len(final_state['players'])
+            if writer is None:
+                writer = TrajectoryWriter(dataset_path, n_players, chunk_size)
+            elif n_players != writer.n_players:
+                raise ValueError('All games of a dataset need to have the same number of players.')
+            writer.write_game(steps, final_state)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        raise ValueError('{} does not contain any finished game.'.format(log_path))
+    return writer.records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Converts a game log into a trajectory dataset.')
+    parser.add_argument('log', help='binary game log or JSON text log')
+    parser.add_argument('dataset', help='path of the dataset to write')
+    args = parser.parse_args(argv)
+    print('Wrote {} records to {}'.format(convert_log(args.log, args.dataset), args.dataset))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+import functools
+import numpy as np
+
+CARD_VALUES = np.arange(-2, 13, dtype=np.int8)
+DECK_COUNTS = np.array([5, 10, 15] + [10] * 12, dtype=np.int16)
+
+# Number of uniform random numbers of a DrawStream that are generated at once
+_BLOCK = 256
+
+
+class Deck:
+    """
+    Compact deck that stores the number of remaining cards per card value (-2 to 12) in an int16 array.
+
+    Drawing locates a uniform random number in the cumulative counts, which gives every remaining card
+    the same chance to be drawn, exactly like drawing with probabilities proportional to the counts.
+    The random source is either a `np.random.Generator`, a `DrawStream` or, if omitted, the global `np.random` state.
+    """
+    __slots__ = ('counts', 'size')
+
+    def __init__(self, counts=None):
+        self.counts = np.array(DECK_COUNTS if counts is None else counts, dtype=np.int16)
+        self.size = int(self.counts.sum())
+
+    def copy(self):
+        deck = Deck.__new__(Deck)
+        deck.counts = self.counts.copy()
+        deck.size = self.size
+        return deck
+
+    __copy__ = copy
+
+    def draw(self, rng=None):
+        """
+        Draws a single card and removes it from the deck.
+        """
+        rng = np.random if rng is None else rng
+        u = int(rng.random() * self.size)
+        ix = int(self.counts.cumsum().searchsorted(u, 'right'))
+        self.counts[ix] -= 1
+        self.size -= 1
+        return ix - 2
+
+    def deal(self, n, rng=None):
+        """
+        Draws `n` cards at once and returns them in random order.
+        With a `np.random.Generator` the cards are taken in one multivariate hypergeometric draw.
+        """
+        rng = np.random if rng is None else rng
+        if not hasattr(rng, 'multivariate_hypergeometric'):
+            return np.array([self.draw(rng) for _ in range(n)])
+        drawn = rng.multivariate_hypergeometric(self.counts, n)
+        self.counts -= drawn.astype(np.int16)
+        self.size -= n
+        return rng.permutation(np.repeat(CARD_VALUES, drawn).astype(int))
+
+    def to_dict(self):
+        """
+        Returns the deck in the `{card: count, '_size': n}` format.
+        """
+        deck = {int(card): int(count) for card, count in zip(CARD_VALUES, self.counts)}
+        deck['_size'] = self.size
+        return deck
+
+    def __getitem__(self, card):
+        return int(self.counts[card + 2])
+
+    def __len__(self):
+        return self.size
+
+    def __eq__(self, other):
+        return isinstance(other, Deck) and np.array_equal(self.counts, other.counts)
+
+    def __repr__(self):
+        return 'Deck({})'.format(self.counts.tolist())
+
+
+@functools.lru_cache(maxsize=1024)
+def _uniforms(seed, block):
+    # the second counter word keeps the blocks apart, the third one separates them from `DrawStream.generator`
+    return tuple(np.random.Generator(np.random.Philox(key=seed, counter=[0, block, 0, 0])).random(_BLOCK).tolist())
+
+
+class DrawStream:
+    """
+    Immutable source of the random numbers of a seeded game: draw `n` of a game only depends on `seed` and `n`.
+
+    `random` returns the uniform random number of draw `n`, taken from blocks of numbers that are generated once
+    per seed and cached, which makes single card draws about as cheap as with a shared generator. `generator`
+    returns a fresh `np.random.Generator` for draws that need more than one number, like dealing a grid.
+    `next` returns the stream of the following draw, the stream itself never changes.
+    """
+    __slots__ = ('seed', 'n')
+
+    def __init__(self, seed, n=0):
+        self.seed = seed
+        self.n = n
+
+    def random(self):
+        return _uniforms(self.seed, self.n // _BLOCK)[self.n % _BLOCK]
+
+    def generator(self):
+        return np.random.Generator(np.random.Philox(key=self.seed, counter=[0, self.n, 1, 0]))
+
+    def next(self):
+        return DrawStream(self.seed, self.n + 1)
+
+    def __eq__(self, other):
+        return isinstance(other, DrawStream) and (self.seed, self.n) == (other.seed, other.n)
+
+    def __repr__(self):
+        return 'DrawStream({}, {})'.format(self.seed, self.n)
@@ -0,0 +1,222 @@
+"""
+Depth-limited expectimax search for the last cards of a player.
+
+Once a player has only a few hidden cards left, the outcome of the player's next turns only depends on the visible
+cards, the number of hidden cards, the composition of the unseen cards and the play card. Grid positions do not
+matter, since the final score is the sum of all cards, so positions are memoized on the sorted visible cards.
+"""
+import bisect
+import functools
+import time
+import numpy as np
+
+from skyjo.actions import ActionCreator
+from skyjo.deck import DECK_COUNTS
+from skyjo.solver import simple_solver
+from skyjo.transposition import TranspositionTable
+
+_GIVE = 'give'
+_TAKE = 'take'
+_TAKE_HIDDEN = 'take_hidden'
+_REJECT = 'reject'
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+def _remove(pool, ix):
+    return pool[:ix] + (pool[ix] - 1,) + pool[ix + 1:]
+
+
+@functools.lru_cache(maxsize=65536)
+def _mean(pool):
+    n = sum(pool)
+    return sum(count * (ix - 2) for ix, count in enumerate(pool)) / n if n else 0.
+
+
+def _replace(visible, old, new):
+    cards = list(visible)
+    if old is not None:
+        cards.remove(old)
+    bisect.insort(cards, new)
+    return tuple(cards)
+
+
+class EndgameSolver:
+    """
+    Solver with the signature of `skyjo.solver.simple_solver` that searches the best move of a player with at most
+    `max_hidden` hidden cards by expectimax over the next `max_turns` turns of the player, minimizing the expected
+    final score of the player.
+
+    Draws and revealed cards are weighted by the counts of the unseen cards, taken from a `skyjo.tracker.CardTracker`
+    if one is passed and otherwise computed from the visible cards. If the player reveals the last card, the score is
+    doubled unless it is lower than the expected score of every other player. If another player has already revealed
+    all cards, the current turn is the last one and the score is never doubled, as in `skyjo.reducer`. Between the
+    turns of the player the other players are assumed to leave a random card from the deck as play card. Turns after
+    the last searched turn are estimated with the expected value of the hidden cards. Taking a visible card does not
+    reduce the number of hidden cards, so a line of play may never end, and the search is only exact for lines that
+    finish within `max_turns` turns.
+
+    Positions with more hidden cards, and searches that expand more than `node_budget` nodes or take longer than
+    `time_limit` seconds, are decided by `fallback`. Subproblems are memoized in `table` across calls, and `stats`
+    counts searches, expanded nodes, cache hits, fallbacks and exceeded budgets. `expected_score` is the expected final
+    score of the move chosen by the last search, or None if the last move was left to `fallback`.
+    """
+
+    def __init__(self, max_hidden=2, max_turns=1, node_budget=200000, time_limit=None, fallback=simple_solver,
+                 table=None):
+        self.max_hidden = max_hidden
+        self.max_turns = max_turns
+        self.node_budget = node_budget
+        self.time_limit = time_limit
+        self.fallback = fallback
+        self.table = TranspositionTable(1000000) if table is None else table
+        self.stats = {'searches': 0, 'nodes': 0, 'cache_hits': 0, 'fallbacks': 0, 'budget_exceeded': 0}
+        self.expected_score = None
+        self._nodes = 0
+        self._deadline = None
+        self._best_other = float('inf')
+        self._tie_doubles = False
+        self._finished = False
+
+    def __call__(self, players, current_player_ix, play_card, deck_locked, rng=None, tracker=None):
+        player = players[current_player_ix]
+        hidden = int(player['hidden'])
+        if not 0 < hidden <= self.max_hidden:
+            return self._fallback(players, current_player_ix, play_card, deck_locked, rng, tracker)
+
+        revealed = player['mask'] == 1
+        visible = tuple(sorted(int(card) for card in np.asarray(player['cards'])[revealed]))
+        if tracker is None:
+            counts = DECK_COUNTS.astype(int)
+            for p in players:
+                counts -= np.bincount(np.asarray(p['cards'], dtype=int)[p['mask'] == 1] + 2, minlength=15)
+            counts[play_card + 2] -= 1
+            hidden_pool, draw_pool = tuple(np.maximum(counts, 0).tolist()), None
+        else:
+            hidden_pool = tuple(tracker.unseen.tolist())
+            draw_pool = None if tracker.deck is None else tuple(tracker.deck.tolist())
+
+        # the expected scores of the other players decide whether finishing doubles the score
+        expected_hidden = _mean(hidden_pool)
+        others = {ix: float(p['score']) + p['hidden'] * expected_hidden
+                  for ix, p in enumerate(players) if ix != current_player_ix}
+        self._best_other = min(others.values()) if others else float('inf')
+        self._tie_doubles = any(score == self._best_other and ix < current_player_ix for ix, score in others.items())
+        # once another player has revealed all cards, this is the last turn and the score is never doubled
+        self._finished = any(p['hidden'] == 0 for ix, p in enumerate(players) if ix != current_player_ix)
+        context = (self._best_other, self._tie_doubles, self._finished)
+        turns = 1 if self._finished else self.max_turns
+
+        self.stats['searches'] += 1
+        self._nodes = 0
+        self._deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+        try:
+            self.expected_score, move = self._decide(context, visible, hidden, hidden_pool, draw_pool,
+                                                     int(play_card), bool(deck_locked), turns)
+        except _BudgetExceeded:
+            self.stats['budget_exceeded'] += 1
+            return self._fallback(players, current_player_ix, play_card, deck_locked, rng, tracker)
+        return self._to_action(move, player)
+
+    def _fallback(self, players, current_player_ix, play_card, deck_locked, rng, tracker):
+        self.stats['fallbacks'] += 1
+        self.expected_score = None
+        kwargs = {} if tracker is None else {'tracker': tracker}
+        return self.fallback(players, current_player_ix, play_card, deck_locked, rng=rng, **kwargs)
+
+    @staticmethod
+    def _to_action(move, player):
+        kind, value = move
+        if kind == _GIVE:
+            return ActionCreator.play_give()
+        if kind == _TAKE:
+            candidates = (player['cards'] == value) & (player['mask'] == 1)
+        else:
+            candidates = np.isnan(player['mask'])
+        pos = tuple(int(i) for i in np.argwhere(candidates)[0])
+        return ActionCreator.play_reject(pos) if kind == _REJECT else ActionCreator.play_take(pos)
+
+    def _expand(self):
+        self._nodes += 1
+        self.stats['nodes'] += 1
+        if self._nodes > self.node_budget or \
+                (self._deadline is not None and self._nodes % 1024 == 0 and time.perf_counter() > self._deadline):
+            raise _BudgetExceeded()
+
+    def _final_score(self, score):
+        if self._finished:
+            return score
+        if score > self._best_other or (score == self._best_other and self._tie_doubles):
+            return 2 * score
+        return score
+
+    def _decide(self, context, visible, hidden, hidden_pool, draw_pool, play_card, locked, turns):
+        """
+        Returns the expected final score and the best move of a decision of the player.
+        """
+        key = (context, visible, hidden, hidden_pool, draw_pool, play_card, locked, turns)
+        cached = self.table.get(key)
+        if cached is not None:
+            self.stats['cache_hits'] += 1
+            return cached
+        self._expand()
+
+        moves = []
+        for card in set(visible):
+            moves.append((self._end_turn(context, _replace(visible, card, play_card), hidden, hidden_pool, draw_pool,
+                                         turns), (_TAKE, card)))
+
+        n_hidden = sum(hidden_pool)
+        if n_hidden:
+            take, reject = 0., 0.
+            for ix, count in enumerate(hidden_pool):
+                if not count:
+                    continue
+                pool = _remove(hidden_pool, ix)
+                take += count * self._end_turn(context, _replace(visible, None, play_card), hidden - 1, pool,
+                                               draw_pool, turns)
+                reject += count * self._end_turn(context, _replace(visible, None, ix - 2), hidden - 1, pool,
+                                                 draw_pool, turns)
+            moves.append((take / n_hidden, (_TAKE_HIDDEN, None)))
+            moves.append((reject / n_hidden, (_REJECT, None)))
+
+        if not locked:
+            value = self._draw(context, visible, hidden, hidden_pool, draw_pool, True, turns)
+            if value is not None:
+                moves.append((value, (_GIVE, None)))
+
+        result = min(moves, key=lambda move: move[0])
+        self.table.put(key, result)
+        return result
+
+    def _draw(self, context, visible, hidden, hidden_pool, draw_pool, locked, turns):
+        """
+        Returns the expected final score if the play card is drawn from the deck, or None if the deck is empty.
+        """
+        pool = hidden_pool if draw_pool is None else draw_pool
+        n = sum(pool)
+        if not n:
+            return None
+        total = 0.
+        for ix, count in enumerate(pool):
+            if not count:
+                continue
+            if draw_pool is None:
+                total += count * self._decide(context, visible, hidden, _remove(pool, ix), None, ix - 2, locked,
+                                              turns)[0]
+            else:
+                total += count * self._decide(context, visible, hidden, hidden_pool, _remove(pool, ix), ix - 2,
+                                              locked, turns)[0]
+        return total / n
+
+    def _end_turn(self, context, visible, hidden, hidden_pool, draw_pool, turns):
+        score = sum(visible)
+        if hidden == 0:
+            return self._final_score(score)
+        estimate = score + hidden * _mean(hidden_pool)
+        if turns <= 1:
+            return estimate
+        value = self._draw(context, visible, hidden, hidden_pool, draw_pool, False, turns - 1)
+        return estimate if value is None else value
@@ -0,0 +1,126 @@
+import numpy as np
+
+from skyjo.actions import ActionCreator, N_ACTIONS
+from skyjo.batch import (
+    NO_CARD, create_batch_state, reset_games, batch_reducer, batch_scores, batch_legal_actions, batch_simple_policy,
+    apply_moves, index_moves
+)
+from skyjo.deck import DECK_COUNTS, CARD_VALUES
+
+
+class VectorEnv:
+    """
+    Gym-style environment of `n_envs` games played in parallel with the batched engine.
+
+    The agent plays seat `agent_ix` of every game and `opponent_policy` (see `skyjo.batch.batch_simple_policy`)
+    plays all other seats. Actions are indices of the legal action mask (see `skyjo.actions.action_index`);
+    drawing from the deck keeps the turn with the agent, taking or rejecting the play card ends it.
+    At the end of a game the agent is rewarded with the difference between the best other score and its own score,
+    so a positive reward means that the agent has won. Finished games are reset automatically; their final scores
+    are available in `final_scores` until the next step.
+    The `deck` observation counts all cards the agent cannot see, i.e. the deck and all hidden cards.
+
+    All returned arrays are buffers that are reused by every call to `reset` and `step`.
+    """
+
+    def __init__(self, n_envs, n_players=2, agent_ix=0, opponent_policy=batch_simple_policy):
+        self.n_envs = n_envs
+        self.n_players = n_players
+        self.agent_ix = agent_ix
+        self.opponent_policy = opponent_policy
+        self.opponents = [p for p in range(n_players) if p != agent_ix]
+        self.rng = np.random.default_rng()
+        self.state = None
+
+        self.observations = {
+            'cards': np.zeros((n_envs, 12), dtype=np.int8),
+            'mask': np.zeros((n_envs, 12), dtype=bool),
+            'opponent_cards': np.zeros((n_envs, n_players - 1, 12), dtype=np.int8),
+            'opponent_mask': np.zeros((n_envs, n_players - 1, 12), dtype=bool),
+            'play_card': np.zeros(n_envs, dtype=np.int8),
+            'deck': np.zeros((n_envs, 15), dtype=np.int16),
+            'deck_locked': np.zeros(n_envs, dtype=bool),
+        }
+        self.rewards = np.zeros(n_envs, dtype=np.float32)
+        self.dones = np.zeros(n_envs, dtype=bool)
+        self.legal = np.zeros((n_envs, N_ACTIONS), dtype=bool)
+        self.final_scores = np.zeros((n_envs, n_players), dtype=np.int16)
+
+    def reset(self, seed=None):
+        """
+        Starts new games in all environments and returns the observations and legal action masks.
+        """
+        self.rng = np.random.default_rng(seed)
+        state = create_batch_state(self.n_envs, self.n_players, self.rng)
+        self.state = batch_reducer(state, ActionCreator.open_game(), self.rng)
+        self._advance()
+        self.rewards[:] = 0
+        self.dones[:] = False
+        self._observe()
+        return self.observations, self.legal
+
+    def step(self, actions):
+        """
+        Applies one action per environment and lets the opponents play until it is the agent's turn again.
+        Returns the observations, rewards, done flags and legal action masks.
+        """
+        actions = np.asarray(actions)
+        games = np.flatnonzero(~self.state['done'])
+        illegal = ~self.legal[games, actions[games]]
+        if illegal.any():
+            raise ValueError('Illegal actions in environments {}.'.format(games[illegal].tolist()))
+        actions = actions[games]
+
+        moves, pos = index_moves(actions)
+        self.state = apply_moves(self.state, games, moves, pos, self.rng)
+        self._advance()
+
+        done = self.state['done']
+        self.dones[:] = done
+        self.rewards[:] = 0
+        if done.any():
+            finished = np.flatnonzero(done)
+            scores = batch_scores(self.state)[finished]
+            self.final_scores[finished] = scores
+            self.rewards[finished] = scores[:, self.opponents].min(axis=1) - scores[:, self.agent_ix]
+            self.state = reset_games(self.state, finished, self.rng)
+            opened = np.zeros(self.n_envs, dtype=bool)
+            opened[finished] = True
+            self.state = batch_reducer(self.state, {**ActionCreator.open_game(), 'games': opened}, self.rng)
+            self._advance()
+        self._observe()
+        return self.observations, self.rewards, self.dones, self.legal
+
+    def _advance(self):
+        """
+        Plays the turns of the opponents until the agent is the current player of all unfinished games.
+        """
+        state = self.state
+        while True:
+            games = np.flatnonzero(~state['done'] & (state['current_player_ix'] != self.agent_ix))
+            if len(games) == 0:
+                break
+            moves, pos = self.opponent_policy(state, games, self.rng)
+            state = apply_moves(state, games, moves, pos, self.rng)
+        self.state = state
+
+    def _observe(self):
+        state = self.state
+        obs = self.observations
+        cards = state['cards'].reshape(self.n_envs, self.n_players, 12)
+        mask = state['mask'].reshape(cards.shape)
+
+        np.copyto(obs['mask'], mask[:, self.agent_ix])
+        np.multiply(cards[:, self.agent_ix], obs['mask'], out=obs['cards'])
+        np.copyto(obs['opponent_mask'], mask[:, self.opponents])
+        np.multiply(cards[:, self.opponents], obs['opponent_mask'], out=obs['opponent_cards'])
+        np.copyto(obs['play_card'], state['play_card'])
+        np.copyto(obs['deck_locked'], state['deck_locked'])
+
+        # cards that are neither visible in a grid nor the play card, so that hidden cards are not disclosed
+        visible = np.where(mask, cards, NO_CARD).reshape(self.n_envs, -1)
+        seen = (visible[:, :, None] == CARD_VALUES).sum(axis=1)
+        seen[np.arange(self.n_envs), state['play_card'] + 2] += 1
+        np.subtract(DECK_COUNTS, seen, out=obs['deck'], casting='unsafe')
+
+        np.copyto(self.legal, batch_legal_actions(state))
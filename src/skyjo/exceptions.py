@@ -10,3 +10,10 @@ class DeckLockedException(Exception):
     This error message is thrown if the deck was locked when it was accessed.
     """
     pass
+
+
+class ReplayMismatchException(Exception):
+    """
+    This error message is thrown if a replayed game does not match the state recorded in its log.
+    """
+    pass
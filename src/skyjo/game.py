@@ -0,0 +1,106 @@
+import numpy as np
+
+from skyjo.actions import ActionCreator, ActionType
+from skyjo.exceptions import GameFinishException
+from skyjo.reducer import reducer
+from skyjo.store import create_store, apply_middleware
+
+
+def result_dtype(n_players):
+    """
+    Returns the structured dtype of a compact per-game result record.
+    """
+    return np.dtype([
+        ('game', np.int64),
+        ('seed', np.uint64),
+        ('solver_seed', np.uint64),
+        ('winner', np.int8),
+        ('finisher', np.int8),
+        ('turns', np.int16),
+        ('doubled', np.bool_),
+        ('scores', np.int16, (n_players,)),
+    ])
+
+
+def calculate_scores(players, finish_player_ix):
+    scores = [np.sum(player['cards']) for player in players]
+    if not np.argmin(scores) == finish_player_ix:
+        scores[finish_player_ix] *= 2
+    return scores
+
+
+def play_game(solvers, rng=None, seed=None, middlewares=()):
+    """
+    Plays a full game on a synchronous store without asyncio, with one solver per player.
+    The deck is seeded with `seed`, or with a seed drawn from `rng` if omitted; `rng` is also passed to the solvers.
+    Returns the final state and the number of turns played.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    if seed is None:
+        seed = int(rng.integers(2 ** 63))
+
+    if middlewares:
+        store = apply_middleware(*middlewares)(create_store)(reducer, {})
+    else:
+        store = create_store(reducer, {})
+
+    store.dispatch(ActionCreator.reset_game(seed))
+    for ix in range(len(solvers)):
+        store.dispatch(ActionCreator.add_player('Player {}'.format(ix)))
+    store.dispatch(ActionCreator.open_game())
+
+    turns = 0
+    try:
+        while True:
+            state = store.state
+            solver = solvers[state['current_player_ix']]
+            action = solver(
+                state['players'], state['current_player_ix'], state['play_card'], state['deck_locked'], rng=rng)
+            store.dispatch(action)
+
+            # only go to next player if the play card has either been taken or rejected
+            if action['type'] in (ActionType.PLAY_TAKE, ActionType.PLAY_REJECT):
+                turns += 1
+                store.dispatch(ActionCreator.next_player())
+    except GameFinishException:
+        return store.state, turns
+
+
+def game_result(state, turns, game=0, seed=0, solver_seed=0):
+    """
+    Summarizes a finished game as a compact result record.
+    """
+    scores = calculate_scores(state['players'], state['finish_player_ix'])
+    result = np.zeros((), dtype=result_dtype(len(scores)))
+    result['game'] = game
+    result['seed'] = seed
+    result['solver_seed'] = solver_seed
+    result['winner'] = np.argmin(scores)
+    result['finisher'] = state['finish_player_ix']
+    result['turns'] = turns
+    result['doubled'] = np.argmin([np.sum(p['cards']) for p in state['players']]) != state['finish_player_ix']
+    result['scores'] = scores
+    return result
+
+
+def iter_results(solvers, n_games=None, rng=None, start=0):
+    """
+    Plays games one after the other and yields the result record of each game as it finishes.
+    Plays forever if `n_games` is None. Every game gets its own deck seed and solver seed drawn from `rng`, so
+    a game can be replayed from its record with `replay_game`.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    game = start
+    while n_games is None or game < start + n_games:
+        seed, solver_seed = rng.integers(2 ** 63, size=2).tolist()
+        state, turns = play_game(solvers, np.random.default_rng(solver_seed), seed=seed)
+        yield game_result(state, turns, game=game, seed=seed, solver_seed=solver_seed)
+        game += 1
+
+
+def replay_game(solvers, result):
+    """
+    Plays the game of a result record from `iter_results` again with the same solvers.
+    Returns the final state and the number of turns played.
+    """
+    return play_game(solvers, np.random.default_rng(int(result['solver_seed'])), seed=int(result['seed']))
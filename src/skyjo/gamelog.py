@@ -0,0 +1,233 @@
+"""
+Compact binary game log. Instead of full states, every game is stored as its deck seed, the player names and one
+byte per action. Any intermediate state can be rebuilt by replaying the actions through `reducer`, and periodic
+checkpoints of the full state allow to seek to an action without replaying from the start.
+
+File layout (little-endian): the header `MAGIC, VERSION`, followed by one record per game consisting of
+`seed, n_players, n_actions, n_checkpoints`, the length-prefixed UTF-8 player names, the action bytes and the
+checkpoints as `checkpoint_dtype(n_players)` records.
+"""
+import struct
+import numpy as np
+
+from skyjo.actions import ActionCreator, ActionType, encode_action
+from skyjo.deck import DrawStream
+from skyjo.exceptions import ReplayMismatchException
+from skyjo.packed import pack_cards, pack_mask, unpack_state
+from skyjo.reducer import reducer, encoded_reducer
+
+MAGIC = b'SKYJOLOG'
+VERSION = 3
+_FILE_HEADER = struct.Struct('<8sH')
+_GAME_HEADER = struct.Struct('<QBII')
+_NAME = struct.Struct('<H')
+
+# Actions that set up a game are implied by the game record, all others are stored as one byte each,
+# see `skyjo.actions.encode_action`.
+_LOGGED_TYPES = (
+    ActionType.NEXT_PLAYER, ActionType.PLAY_GIVE, ActionType.PLAY_TAKE, ActionType.PLAY_REJECT, ActionType.LOCK_DECK,
+)
+_NO_INDEX = -1
+
+
+def checkpoint_dtype(n_players):
+    """
+    Returns the structured dtype of a full state after `index` actions, including the number of random draws so far.
+    """
+    return np.dtype([
+        ('index', '<u4'),
+        ('cards', '<u8', (n_players,)),
+        ('mask', '<u2', (n_players,)),
+        ('deck', '<i2', (15,)),
+        ('play_card', 'i1'),
+        ('initial_player_ix', 'i1'),
+        ('finish_player_ix', 'i1'),
+        ('current_player_ix', 'i1'),
+        ('deck_locked', 'u1'),
+        ('draws', '<u4'),
+    ])
+
+
+def _optional(value):
+    return _NO_INDEX if value is None else value
+
+
+def _required(value):
+    return None if value == _NO_INDEX else int(value)
+
+
+def create_checkpoint(state, index):
+    checkpoint = np.zeros((), dtype=checkpoint_dtype(len(state['players'])))
+    checkpoint['index'] = index
+    checkpoint['cards'] = [pack_cards(p['cards']) for p in state['players']]
+    checkpoint['mask'] = [pack_mask(p['mask']) for p in state['players']]
+    checkpoint['deck'] = state['deck'].counts
+    checkpoint['play_card'] = _optional(state['play_card'])
+    checkpoint['initial_player_ix'] = _optional(state['initial_player_ix'])
+    checkpoint['finish_player_ix'] = _optional(state['finish_player_ix'])
+    checkpoint['current_player_ix'] = _optional(state['current_player_ix'])
+    checkpoint['deck_locked'] = state['deck_locked']
+    checkpoint['draws'] = state['rng'].n
+    return checkpoint
+
+
+def restore_checkpoint(checkpoint, names, seed):
+    return unpack_state((
+        tuple(zip(checkpoint['cards'].tolist(), checkpoint['mask'].tolist())),
+        checkpoint['deck'].astype(np.int16).tobytes(),
+        _required(checkpoint['play_card']),
+        _required(checkpoint['initial_player_ix']),
+        _required(checkpoint['finish_player_ix']),
+        _required(checkpoint['current_player_ix']),
+        bool(checkpoint['deck_locked']),
+    ), names=names, rng=DrawStream(seed, int(checkpoint['draws'])))
+
+
+class GameRecord:
+    """
+    A single logged game: deck seed, player names, action bytes and checkpoints.
+    """
+
+    def __init__(self, seed, names, actions, checkpoints):
+        self.seed = seed
+        self.names = names
+        self.actions = actions
+        self.checkpoints = checkpoints
+
+    def __len__(self):
+        return len(self.actions)
+
+    def initial_state(self):
+        """
+        Returns the state after the game has been opened, i.e. before the first logged action.
+        """
+        state = reducer({}, ActionCreator.reset_game(self.seed))
+        for name in self.names:
+            state = reducer(state, ActionCreator.add_player(name))
+        return reducer(state, ActionCreator.open_game())
+
+    def replay(self, n=None):
+        """
+        Returns the state after the first `n` actions, starting at the closest preceding checkpoint.
+        """
+        n = len(self.actions) if n is None else n
+        if not 0 <= n <= len(self.actions):
+            raise IndexError('Action {} out of range.'.format(n))
+        ix = np.searchsorted(self.checkpoints['index'], n, 'right') - 1
+        if ix >= 0:
+            start = int(self.checkpoints['index'][ix])
+            state = restore_checkpoint(self.checkpoints[ix], self.names, self.seed)
+        else:
+            start = 0
+            state = self.initial_state()
+        for code in self.actions[start:n]:
+            state = encoded_reducer(state, int(code))
+        return state
+
+    def verify(self):
+        """
+        Replays the game from the start and checks every intermediate state against the checkpoints.
+        """
+        checkpoints = iter(self.checkpoints)
+        checkpoint = next(checkpoints, None)
+        state = self.initial_state()
+        for n in range(len(self.actions) + 1):
+            if checkpoint is not None and checkpoint['index'] == n:
+                if create_checkpoint(state, n).tobytes() != checkpoint.tobytes():
+                    raise ReplayMismatchException('Replay diverged from the checkpoint after {} actions.'.format(n))
+                checkpoint = next(checkpoints, None)
+            if n < len(self.actions):
+                state = encoded_reducer(state, int(self.actions[n]))
+        return state
+
+
+class GameLogWriter:
+    """
+    Writes games to a binary log file. Actions are passed to `record` together with the resulting state,
+    see `skyjo.middleware.game_log_middleware`. A game is written once the next game is reset or the writer closed.
+    """
+
+    def __init__(self, path, checkpoint_every=64):
+        self.checkpoint_every = checkpoint_every
+        self.games = 0
+        self._file = open(path, 'wb')
+        self._file.write(_FILE_HEADER.pack(MAGIC, VERSION))
+        self._game = None
+
+    def record(self, action, state):
+        game = self._game
+        if action['type'] == ActionType.RESET_GAME:
+            if action.get('seed') is None:
+                raise ValueError('Only games with a seed can be logged.')
+            self.flush()
+            self._game = GameRecord(action.get('seed'), [], bytearray(), [])
+        elif game is None:
+            return
+        elif action['type'] == ActionType.ADD_PLAYER:
+            game.names.append(action['name'])
+        elif action['type'] == ActionType.OPEN_GAME:
+            game.checkpoints.append(create_checkpoint(state, 0))
+        elif action['type'] in _LOGGED_TYPES and game.checkpoints:
+            game.actions.append(encode_action(action))
+            if len(game.actions) % self.checkpoint_every == 0:
+                game.checkpoints.append(create_checkpoint(state, len(game.actions)))
+
+    def write_game(self, game):
+        names = [name.encode('utf-8') for name in game.names]
+        if any(len(name) > 0xFFFF for name in names):
+            raise ValueError('Player names are limited to 65535 bytes.')
+        self._file.write(_GAME_HEADER.pack(game.seed, len(names), len(game.actions), len(game.checkpoints)))
+        for name in names:
+            self._file.write(_NAME.pack(len(name)) + name)
+        self._file.write(bytes(game.actions))
+        self._file.write(np.array(game.checkpoints, dtype=checkpoint_dtype(len(names))).tobytes())
+        self.games += 1
+
+    def flush(self):
+        """
+        Writes the current game if it has been opened.
+        """
+        game, self._game = self._game, None
+        if game is not None and game.checkpoints:
+            self.write_game(game)
+        self._file.flush()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_game_log(path):
+    """
+    Reads all games of a binary log file as GameRecords.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version = _FILE_HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('{} is not a version {} game log.'.format(path, VERSION))
+
+    games = []
+    offset = _FILE_HEADER.size
+    while offset < len(data):
+        seed, n_players, n_actions, n_checkpoints = _GAME_HEADER.unpack_from(data, offset)
+        offset += _GAME_HEADER.size
+        names = []
+        for _ in range(n_players):
+            length, = _NAME.unpack_from(data, offset)
+            offset += _NAME.size
+            names.append(data[offset:offset + length].decode('utf-8'))
+            offset += length
+        actions = np.frombuffer(data, dtype=np.uint8, count=n_actions, offset=offset)
+        offset += n_actions
+        dtype = checkpoint_dtype(n_players)
+        checkpoints = np.frombuffer(data, dtype=dtype, count=n_checkpoints, offset=offset)
+        offset += n_checkpoints * dtype.itemsize
+        games.append(GameRecord(seed, names, actions, checkpoints))
+    return games
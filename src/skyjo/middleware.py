@@ -1,8 +1,18 @@
+import inspect
 import logging
 import json
+import queue
+import threading
+import time
 from typing import Callable
 
+import numpy as np
+
+from skyjo.actions import ActionType
+from skyjo.exceptions import GameFinishException, DeckLockedException
+from skyjo.gamelog import GameLogWriter
 from skyjo.NumpyEncoder import NumpyEncoder
+from skyjo.tracker import CardTracker
 
 logger = logging.getLogger('middleware')
 
@@ -10,6 +20,8 @@ logger = logging.getLogger('middleware')
 def logger_middleware(dispatch: Callable, state_func: Callable):
     def next_func(next_handler):
         def action_func(action):
+            if not logger.isEnabledFor(logging.INFO):
+                return next_handler(action)
             # logger.info('PREV STATE: {}'.format(json.dumps(state_func(), cls=NumpyEncoder)))
             logger.info('ACTION: {}'.format(json.dumps(action, cls=NumpyEncoder)))
             val = next_handler(action)
@@ -17,3 +29,456 @@ def logger_middleware(dispatch: Callable, state_func: Callable):
             return val
         return action_func
     return next_func
+
+
+class LogWriter:
+    """
+    Serializes and logs records on a background thread, so that dispatching an action only costs a queue insert.
+    States are never modified in place by the reducer, so they can be queued by reference and serialized later.
+    Records are dropped and counted in `dropped` if more than `maxsize` records are waiting. Records that fail to
+    serialize or log are logged with their exception and counted in `errors`, and the writer keeps running.
+    """
+    _STOP = object()
+
+    def __init__(self, logger=logger, level=logging.INFO, maxsize=10000, batch_size=100):
+        self.logger = logger
+        self.level = level
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.errors = 0
+        self._queue = queue.Queue(maxsize)
+        self._thread = threading.Thread(target=self._run, name='skyjo-log-writer', daemon=True)
+        self._thread.start()
+
+    def enabled(self):
+        return self.logger.isEnabledFor(self.level)
+
+    def submit(self, prefix, obj):
+        """
+        Queues `obj` to be logged as `prefix: <json>`. Returns False if the record has been dropped.
+        """
+        try:
+            self._queue.put_nowait((prefix, obj))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is self._STOP
+            for prefix, obj in (batch[:-1] if stop else batch):
+                try:
+                    self.logger.log(self.level, '{}: {}'.format(prefix, json.dumps(obj, cls=NumpyEncoder)))
+                except Exception:
+                    self.errors += 1
+                    self.logger.exception('Could not log a {} record.'.format(prefix))
+            if stop:
+                return
+
+    def close(self):
+        """
+        Logs all queued records and stops the background thread.
+        """
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def queued_logger_middleware(writer: LogWriter, every_action=1, every_game=1):
+    """
+    Creates a middleware that logs actions and resulting states like `logger_middleware`, but through `writer`.
+    Only every `every_game`th game and within these every `every_action`th action is logged, and nothing is
+    queued at all if the logger would drop the records. Actions before the first RESET_GAME count as the first game.
+    """
+    games = 0
+    actions = 0
+
+    def middleware(dispatch: Callable, state_func: Callable):
+        def next_func(next_handler):
+            async def await_action(result):
+                val = await result
+                writer.submit('NEW STATE', state_func())
+                return val
+
+            def action_func(action):
+                nonlocal games, actions
+                if action['type'] == ActionType.RESET_GAME or games == 0:
+                    games += 1
+                    actions = 0
+                actions += 1
+                if (games - 1) % every_game or (actions - 1) % every_action or not writer.enabled():
+                    return next_handler(action)
+
+                writer.submit('ACTION', action)
+                val = next_handler(action)
+                if inspect.isawaitable(val):
+                    return await_action(val)
+                writer.submit('NEW STATE', state_func())
+                return val
+            return action_func
+        return next_func
+    return middleware
+
+
+class Metrics:
+    """
+    Counters collected by `metrics_middleware`: number of actions, reducer latency histograms and reducer
+    exceptions per action type, as well as the number of games and cards drawn from the deck.
+    All counters are allocated up front, so recording an action does not allocate.
+    """
+    ACTION_TYPES = (
+        ActionType.RESET_GAME, ActionType.LOCK_DECK, ActionType.NEXT_PLAYER, ActionType.PLAY_GIVE,
+        ActionType.PLAY_TAKE, ActionType.PLAY_REJECT, ActionType.ADD_PLAYER, ActionType.OPEN_GAME, 'OTHER',
+    )
+    EXCEPTIONS = (GameFinishException, DeckLockedException)
+    # Bucket i counts latencies below 2**i microseconds, the last bucket everything above.
+    BUCKETS = 18
+
+    def __init__(self, sample_every=1):
+        self.sample_every = sample_every
+        self._type_index = {action_type: ix for ix, action_type in enumerate(self.ACTION_TYPES)}
+        self.reset()
+
+    def reset(self):
+        n_types = len(self.ACTION_TYPES)
+        self.counts = [0] * n_types
+        self.sampled = [0] * n_types
+        self.latency_ns = [0] * n_types
+        self.histogram = [[0] * self.BUCKETS for _ in range(n_types)]
+        self.exceptions = [[0] * len(self.EXCEPTIONS) for _ in range(n_types)]
+        self.games = 0
+        self.draws = 0
+        self._calls = 0
+
+    def index(self, action_type):
+        return self._type_index.get(action_type, len(self.ACTION_TYPES) - 1)
+
+    def sample(self):
+        """
+        Returns whether the latency of the next action should be measured.
+        """
+        self._calls += 1
+        return self._calls % self.sample_every == 0
+
+    def record(self, ix, elapsed_ns):
+        self.sampled[ix] += 1
+        self.latency_ns[ix] += elapsed_ns
+        self.histogram[ix][min((elapsed_ns // 1000).bit_length(), self.BUCKETS - 1)] += 1
+
+    def record_exception(self, ix, exc):
+        for e, exc_type in enumerate(self.EXCEPTIONS):
+            if isinstance(exc, exc_type):
+                self.exceptions[ix][e] += 1
+
+    def record_state(self, ix, prev_state, state):
+        """
+        Counts games and the cards drawn from the deck between two states.
+        """
+        if self.ACTION_TYPES[ix] == ActionType.RESET_GAME:
+            self.games += 1
+            return
+        prev_deck, deck = (prev_state or {}).get('deck'), (state or {}).get('deck')
+        if prev_deck is None or deck is None or prev_deck is deck:
+            return
+        # a larger deck has been reshuffled from the discard pile before a card was drawn
+        self.draws += prev_deck.size - deck.size if deck.size < prev_deck.size else 1
+
+    def snapshot(self):
+        actions = {}
+        for ix, action_type in enumerate(self.ACTION_TYPES):
+            actions[action_type] = {
+                'count': self.counts[ix],
+                'sampled': self.sampled[ix],
+                'latency_seconds': self.latency_ns[ix] / 1e9,
+                'histogram': list(self.histogram[ix]),
+                'exceptions': {
+                    exc_type.__name__: self.exceptions[ix][e] for e, exc_type in enumerate(self.EXCEPTIONS)
+                },
+            }
+        return {
+            'actions': actions,
+            'bucket_bounds_seconds': [2 ** i / 1e6 for i in range(self.BUCKETS - 1)],
+            'games': self.games,
+            'draws': self.draws,
+            'draws_per_game': self.draws / self.games if self.games else 0.,
+        }
+
+    def to_json(self):
+        return json.dumps(self.snapshot())
+
+    def to_prometheus(self, prefix='skyjo'):
+        """
+        Exports all counters in the Prometheus text format.
+        """
+        lines = [
+            '# HELP {}_actions_total Number of dispatched actions.'.format(prefix),
+            '# TYPE {}_actions_total counter'.format(prefix),
+        ]
+        for ix, action_type in enumerate(self.ACTION_TYPES):
+            lines.append('{}_actions_total{{type="{}"}} {}'.format(prefix, action_type, self.counts[ix]))
+
+        lines += [
+            '# HELP {}_action_latency_seconds Latency of sampled actions.'.format(prefix),
+            '# TYPE {}_action_latency_seconds histogram'.format(prefix),
+        ]
+        for ix, action_type in enumerate(self.ACTION_TYPES):
+            cumulative = 0
+            for bucket, count in enumerate(self.histogram[ix]):
+                cumulative += count
+                le = '+Inf' if bucket == self.BUCKETS - 1 else repr(2 ** bucket / 1e6)
+                lines.append('{}_action_latency_seconds_bucket{{type="{}",le="{}"}} {}'.format(
+                    prefix, action_type, le, cumulative))
+            lines.append('{}_action_latency_seconds_sum{{type="{}"}} {}'.format(
+                prefix, action_type, self.latency_ns[ix] / 1e9))
+            lines.append('{}_action_latency_seconds_count{{type="{}"}} {}'.format(
+                prefix, action_type, self.sampled[ix]))
+
+        lines += [
+            '# HELP {}_reducer_exceptions_total Number of exceptions raised by the reducer.'.format(prefix),
+            '# TYPE {}_reducer_exceptions_total counter'.format(prefix),
+        ]
+        for ix, action_type in enumerate(self.ACTION_TYPES):
+            for e, exc_type in enumerate(self.EXCEPTIONS):
+                lines.append('{}_reducer_exceptions_total{{type="{}",exception="{}"}} {}'.format(
+                    prefix, action_type, exc_type.__name__, self.exceptions[ix][e]))
+
+        lines += [
+            '# HELP {}_games_total Number of started games.'.format(prefix),
+            '# TYPE {}_games_total counter'.format(prefix),
+            '{}_games_total {}'.format(prefix, self.games),
+            '# HELP {}_deck_draws_total Number of cards drawn from the deck.'.format(prefix),
+            '# TYPE {}_deck_draws_total counter'.format(prefix),
+            '{}_deck_draws_total {}'.format(prefix, self.draws),
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+def metrics_middleware(metrics: Metrics):
+    """
+    Creates a middleware that records every dispatched action in `metrics`.
+    Works with both the synchronous store and the `aioredux` store, whose dispatch returns an awaitable.
+    """
+    def middleware(dispatch: Callable, state_func: Callable):
+        def next_func(next_handler):
+            def fail(ix, start, exc):
+                if start is not None:
+                    metrics.record(ix, time.perf_counter_ns() - start)
+                metrics.record_exception(ix, exc)
+
+            def finish(ix, start, prev_state):
+                if start is not None:
+                    metrics.record(ix, time.perf_counter_ns() - start)
+                metrics.record_state(ix, prev_state, state_func())
+
+            async def await_action(result, ix, start, prev_state):
+                try:
+                    val = await result
+                except metrics.EXCEPTIONS as e:
+                    fail(ix, start, e)
+                    raise
+                finish(ix, start, prev_state)
+                return val
+
+            def action_func(action):
+                ix = metrics.index(action['type'])
+                metrics.counts[ix] += 1
+                prev_state = state_func()
+                start = time.perf_counter_ns() if metrics.sample() else None
+                try:
+                    val = next_handler(action)
+                except metrics.EXCEPTIONS as e:
+                    fail(ix, start, e)
+                    raise
+                if inspect.isawaitable(val):
+                    return await_action(val, ix, start, prev_state)
+                finish(ix, start, prev_state)
+                return val
+            return action_func
+        return next_func
+    return middleware
+
+
+def game_log_middleware(writer: GameLogWriter):
+    """
+    Creates a middleware that records every game in a binary game log, see `skyjo.gamelog`.
+    Games are replayed from their seed, so `RESET_GAME` actions without a seed get a random one.
+    """
+    def middleware(dispatch: Callable, state_func: Callable):
+        def next_func(next_handler):
+            async def await_action(result, action):
+                val = await result
+                writer.record(action, state_func())
+                return val
+
+            def action_func(action):
+                if action['type'] == ActionType.RESET_GAME and action.get('seed') is None:
+                    action = {**action, 'seed': int(np.random.randint(2 ** 63, dtype=np.int64))}
+                val = next_handler(action)
+                if inspect.isawaitable(val):
+                    return await_action(val, action)
+                writer.record(action, state_func())
+                return val
+            return action_func
+        return next_func
+    return middleware
+
+
+class SpectatorFeed:
+    """
+    Stream of state deltas of a single game for any number of spectators. Every delta is encoded once as a JSON line
+    and the same bytes are written to all subscribers, objects with a `write(bytes)` method like
+    `asyncio.StreamWriter`.
+
+    A delta only contains what has changed: the changed cells as `[player, position, card]` (see
+    `skyjo.actions.POSITIONS`, hidden cards are `null`), the play card, the current player, the deck size and the
+    finishing player. After every `keyframe_every` deltas, and whenever players are added or the game is reset,
+    a keyframe with the full visible state is sent instead. New subscribers receive the last keyframe and all
+    deltas since then.
+    """
+
+    def __init__(self, keyframe_every=64):
+        self.keyframe_every = keyframe_every
+        self.subscribers = set()
+        self.seq = 0
+        self.bytes_encoded = 0
+        self._backlog = []
+        self._grids = []
+
+    def subscribe(self, writer):
+        for data in self._backlog:
+            writer.write(data)
+        self.subscribers.add(writer)
+
+    def unsubscribe(self, writer):
+        self.subscribers.discard(writer)
+
+    @staticmethod
+    def _grid(player):
+        # -128 marks a hidden card, all card values fit into int8
+        return np.where(np.isnan(player['mask']), -128, player['cards']).astype(np.int8).ravel()
+
+    @staticmethod
+    def _header(state):
+        return {
+            'play_card': None if state['play_card'] is None else int(state['play_card']),
+            'current': state['current_player_ix'],
+            'deck': state['deck'].size,
+            'finish': state['finish_player_ix'],
+        }
+
+    def _keyframe(self, state):
+        self._grids = [self._grid(player) for player in state['players']]
+        return {
+            'seq': self.seq,
+            'keyframe': True,
+            'players': [
+                {'name': player['name'], 'cards': [None if card == -128 else card for card in grid.tolist()]}
+                for player, grid in zip(state['players'], self._grids)
+            ],
+            **self._header(state),
+        }
+
+    def _delta(self, prev_state, state):
+        delta = {'seq': self.seq}
+        cells = []
+        for ix, player in enumerate(state['players']):
+            # the reducer shares unchanged players between states
+            if player is prev_state['players'][ix]:
+                continue
+            grid = self._grid(player)
+            for pos in np.flatnonzero(grid != self._grids[ix]).tolist():
+                card = int(grid[pos])
+                cells.append([ix, pos, None if card == -128 else card])
+            self._grids[ix] = grid
+        if cells:
+            delta['cells'] = cells
+        prev_header = self._header(prev_state)
+        for key, value in self._header(state).items():
+            if value != prev_header[key]:
+                delta[key] = value
+        return delta
+
+    def publish(self, action, prev_state, state):
+        """
+        Encodes the change from `prev_state` to `state` and writes it to all subscribers. Returns the encoded bytes.
+        """
+        self.seq += 1
+        keyframe = action['type'] == ActionType.RESET_GAME or not prev_state or \
+            len(state['players']) != len(prev_state['players']) or len(self._backlog) > self.keyframe_every
+        if keyframe:
+            message = self._keyframe(state)
+        else:
+            message = self._delta(prev_state, state)
+        data = (json.dumps(message, separators=(',', ':')) + '\n').encode()
+        self.bytes_encoded += len(data)
+        if keyframe:
+            self._backlog = [data]
+        else:
+            self._backlog.append(data)
+
+        for writer in list(self.subscribers):
+            is_closing = getattr(writer, 'is_closing', None)
+            if is_closing is not None and is_closing():
+                self.subscribers.discard(writer)
+            else:
+                writer.write(data)
+        return data
+
+
+def spectator_middleware(feed: SpectatorFeed):
+    """
+    Creates a middleware that publishes the change of the state after every action to a `SpectatorFeed`.
+    """
+    def middleware(dispatch: Callable, state_func: Callable):
+        def next_func(next_handler):
+            async def await_action(result, action, prev_state):
+                val = await result
+                feed.publish(action, prev_state, state_func())
+                return val
+
+            def action_func(action):
+                prev_state = state_func()
+                val = next_handler(action)
+                if inspect.isawaitable(val):
+                    return await_action(val, action, prev_state)
+                feed.publish(action, prev_state, state_func())
+                return val
+            return action_func
+        return next_func
+    return middleware
+
+
+def tracker_middleware(tracker: CardTracker):
+    """
+    Creates a middleware that updates a `CardTracker` with every action.
+    """
+    def middleware(dispatch: Callable, state_func: Callable):
+        def next_func(next_handler):
+            async def await_action(result, action, prev_state):
+                val = await result
+                tracker.update(action, prev_state, state_func())
+                return val
+
+            def action_func(action):
+                prev_state = state_func()
+                val = next_handler(action)
+                if inspect.isawaitable(val):
+                    return await_action(val, action, prev_state)
+                tracker.update(action, prev_state, state_func())
+                return val
+            return action_func
+        return next_func
+    return middleware
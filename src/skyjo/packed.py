@@ -0,0 +1,135 @@
+import numpy as np
+
+from skyjo.deck import Deck
+from skyjo.reducer import compute_totals
+
+# Every card value (-2 to 12) is stored as a 4 bit nibble `value + 2`; hidden cards can be packed as HIDDEN instead.
+HIDDEN = 15
+CARD_SHIFTS = np.arange(12, dtype=np.uint64) * np.uint64(4)
+MASK_BITS = np.arange(12, dtype=np.uint64)
+# Bits of the revealed mask that belong to the three cards of a column
+COLUMN_MASKS = np.uint64(0x111) << np.arange(4, dtype=np.uint64)
+
+
+def _scalar(packed):
+    return int(packed) if np.ndim(packed) == 0 else packed
+
+
+def pack_cards(cards, mask=None):
+    """
+    Packs one or more 3x4 card grids into 48 bit integers, 4 bits per card in row-major order.
+    If a mask is given, hidden cards are packed as HIDDEN, so that only the visible grid is encoded.
+    Returns a Python int for a single grid and an uint64 array otherwise.
+    """
+    cards = np.asarray(cards)
+    nibbles = (cards.reshape(cards.shape[:-2] + (12,)) + 2).astype(np.uint64)
+    if mask is not None:
+        hidden = ~_revealed(mask).reshape(nibbles.shape)
+        nibbles[hidden] = HIDDEN
+    return _scalar(np.bitwise_or.reduce(nibbles << CARD_SHIFTS, axis=-1))
+
+
+def _nibbles(packed):
+    return (np.asarray(packed, dtype=np.uint64)[..., None] >> CARD_SHIFTS) & np.uint64(0xF)
+
+
+def unpack_cards(packed):
+    """
+    Unpacks cards packed with `pack_cards` into grids of shape (..., 3, 4). Hidden cards are returned as HIDDEN - 2.
+    """
+    nibbles = _nibbles(packed).astype(np.int8) - 2
+    return nibbles.reshape(nibbles.shape[:-1] + (3, 4))
+
+
+def _revealed(mask):
+    mask = np.asarray(mask)
+    return mask if mask.dtype == bool else mask == 1
+
+
+def pack_mask(mask):
+    """
+    Packs one or more revealed masks (NaN/1 or boolean) into 12 bit integers; bit `row * 4 + col` is set if revealed.
+    """
+    revealed = _revealed(mask)
+    bits = revealed.reshape(revealed.shape[:-2] + (12,)).astype(np.uint64) << MASK_BITS
+    return _scalar(np.bitwise_or.reduce(bits, axis=-1))
+
+
+def mask_bits(packed):
+    """
+    Returns the revealed flags of masks packed with `pack_mask` as a boolean array with a trailing axis of 12.
+    """
+    return ((np.asarray(packed, dtype=np.uint64)[..., None] >> MASK_BITS) & np.uint64(1)).astype(bool)
+
+
+def unpack_mask(packed):
+    """
+    Unpacks masks packed with `pack_mask` into the NaN/1 float format of the reducer.
+    """
+    bits = mask_bits(packed)
+    return np.where(bits, 1., np.nan).reshape(bits.shape[:-1] + (3, 4))
+
+
+def pack_state(state):
+    """
+    Encodes a game state as a hashable tuple. The encoding is lossless except for player names and the
+    draw stream, see `unpack_state`.
+    """
+    return (
+        tuple((pack_cards(p['cards']), pack_mask(p['mask'])) for p in state['players']),
+        state['deck'].counts.tobytes(),
+        state['play_card'],
+        state['initial_player_ix'],
+        state['finish_player_ix'],
+        state['current_player_ix'],
+        state['deck_locked'],
+    )
+
+
+def unpack_state(key, names=None, rng=None):
+    """
+    Restores a state encoded with `pack_state`.
+    """
+    packed_players, deck, play_card, initial_player_ix, finish_player_ix, current_player_ix, deck_locked = key
+    if names is None:
+        names = ['Player {}'.format(i) for i in range(len(packed_players))]
+    players = []
+    for name, (cards, mask) in zip(names, packed_players):
+        cards = unpack_cards(cards).astype(int)
+        mask = unpack_mask(mask)
+        players.append({'name': name, 'cards': cards, 'mask': mask, **compute_totals(cards, mask)})
+    return {
+        'rng': rng,
+        'players': players,
+        'deck': Deck(np.frombuffer(deck, dtype=np.int16)),
+        'play_card': play_card,
+        'initial_player_ix': initial_player_ix,
+        'finish_player_ix': finish_player_ix,
+        'current_player_ix': current_player_ix,
+        'deck_locked': deck_locked,
+    }
+
+
+def any_revealed_greater(cards, mask, value):
+    """
+    Returns whether any revealed card is greater than `value`, for packed cards and masks of any shape.
+    """
+    nibbles = _nibbles(cards).astype(np.int8) - 2
+    return np.any((nibbles > value) & mask_bits(mask), axis=-1)
+
+
+def complete_columns(mask):
+    """
+    Returns a boolean array of shape (..., 4) that tells which columns are fully revealed.
+    """
+    mask = np.asarray(mask, dtype=np.uint64)[..., None]
+    return (mask & COLUMN_MASKS) == COLUMN_MASKS
+
+
+def equal_columns(cards, mask):
+    """
+    Returns a boolean array of shape (..., 4) that tells which columns are fully revealed and hold three equal cards.
+    """
+    rows = _nibbles(cards).reshape(np.shape(cards) + (3, 4))
+    equal = (rows[..., 0, :] == rows[..., 1, :]) & (rows[..., 1, :] == rows[..., 2, :])
+    return equal & complete_columns(mask)
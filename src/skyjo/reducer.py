@@ -1,11 +1,17 @@
+import os
 import numpy as np
 import copy
-from skyjo.actions import ActionType
+from skyjo.actions import ActionType, Opcode, POSITIONS, GIVE_INDEX, TAKE_INDEX, REJECT_INDEX, N_ACTIONS
+from skyjo.deck import Deck, DrawStream, DECK_COUNTS
 from skyjo.exceptions import GameFinishException, DeckLockedException
 
+# If enabled, the running totals of every player are checked against a full recompute after each update.
+DEBUG = os.environ.get('SKYJO_DEBUG', '') not in ('', '0')
 
-def _create_initial_state():
+
+def _create_initial_state(rng=None):
     return {
+        'rng': rng,
         'players': [],
         'deck': _generate_deck(),
         'play_card': None,
@@ -17,35 +23,90 @@ def _create_initial_state():
 
 
 def _create_player(name, cards):
+    mask = np.ones((3, 4)) * np.nan
     return {
         'name': name,
-        'cards': cards,
-        'mask': np.ones((3, 4)) * np.nan
+        'cards': freeze(cards),
+        'mask': freeze(mask),
+        **compute_totals(cards, mask)
+    }
+
+
+def freeze(array):
+    """
+    Marks an array as read-only. States are never modified in place, so that unchanged players and
+    grids can be shared between a state and its successors; grids are copied before they are changed.
+    """
+    array.flags.writeable = False
+    return array
+
+
+def compute_totals(cards, mask):
+    """
+    Computes the running totals of a player from scratch: the score of all visible cards,
+    the number of hidden cards and the score of the visible cards per column.
+    """
+    visible = np.nan_to_num(cards * mask)
+    return {
+        'score': visible.sum(),
+        'hidden': int(np.isnan(mask).sum()),
+        'col_sums': freeze(visible.sum(axis=0)),
     }
 
 
+def _update_totals(player, col, old_card, new_card):
+    """
+    Returns the running totals of a player after a card in column `col` changed from `old_card`
+    to the now visible `new_card`. `old_card` is None if the card was hidden before.
+    """
+    diff = new_card - (0 if old_card is None else old_card)
+    col_sums = player['col_sums'].copy()
+    col_sums[col] += diff
+    return {
+        'score': player['score'] + diff,
+        'hidden': player['hidden'] - (old_card is None),
+        'col_sums': freeze(col_sums),
+    }
+
+
+def _check_totals(player):
+    totals = compute_totals(player['cards'], player['mask'])
+    assert player['score'] == totals['score'], 'score {} != {}'.format(player['score'], totals['score'])
+    assert player['hidden'] == totals['hidden'], 'hidden {} != {}'.format(player['hidden'], totals['hidden'])
+    np.testing.assert_array_equal(player['col_sums'], totals['col_sums'])
+
+
 def _generate_deck():
-    def n(card):
-        if card == -2:
-            return 5
-        if card == 0:
-            return 15
-        else:
-            return 10
-    deck = {}
-    for c in range(-2, 13):
-        deck[c] = n(c)
-    deck['_size'] = 150
-    return deck
-
-
-def _give_card(deck):
-    cards = list(deck.keys())[:15]
-    p = np.array(list(deck.values())[:15]) / deck['_size']
-    card = np.random.choice(cards, p=p)
-    deck['_size'] -= 1
-    deck[card] -= 1
-    return card
+    return Deck()
+
+
+def _give_card(deck, rng=None):
+    return deck.draw(rng)
+
+
+def _next_draw(rng):
+    """
+    Returns the draw stream of the next state. Streams never change, so replaying an action on an earlier state,
+    e.g. after an undo, draws the same cards.
+    """
+    return None if rng is None else rng.next()
+
+
+def _draw_generator(rng):
+    return None if rng is None else rng.generator()
+
+
+def _reshuffle_deck(state):
+    """
+    Creates a new deck from the discard pile once the deck is empty. The discard pile holds all cards
+    that are neither part of a player's grid nor the current play card.
+    """
+    counts = DECK_COUNTS.copy()
+    for player in state['players']:
+        counts -= np.bincount(np.asarray(player['cards'], dtype=int).ravel() + 2, minlength=15).astype(np.int16)
+    if state['play_card'] is not None:
+        counts[state['play_card'] + 2] -= 1
+    return Deck(counts)
 
 
 def _reveal_card(mask, pos):
@@ -53,9 +114,10 @@ def _reveal_card(mask, pos):
     mask[row, col] = 1
 
 
-def _get_random_unrevealed_card_pos(mask, size=1):
+def _get_random_unrevealed_card_pos(mask, size=1, rng=None):
+    rng = np.random if rng is None else rng
     indices = np.argwhere(np.isnan(mask))
-    ixs = np.random.choice(np.arange(len(indices)), size=size, replace=False)
+    ixs = rng.choice(np.arange(len(indices)), size=size, replace=False)
     return (indices[ix] for ix in ixs)
 
 
@@ -63,7 +125,7 @@ def _player_maxscore_index(players):
     ix = 0
     max_score = -100
     for i, player in enumerate(players):
-        score = np.nansum(player['cards'] * player['mask'])
+        score = player['score']
         if score > max_score:
             max_score = score
             ix = i
@@ -80,103 +142,181 @@ def _finish_check(state):
 
     # Mark current user as initiator of last round if all cards
     # have been revealed.
-    if np.nansum(player['mask']) == 12:
+    if player['hidden'] == 0:
         state['finish_player_ix'] = ix
     
     return state
 
 
+def legal_actions(state):
+    """
+    Returns a boolean mask of the moves the current player may make, see `skyjo.actions.action_index`.
+    Drawing from the deck requires it to be unlocked, taking is possible at every position and rejecting
+    at every hidden position. Nothing is legal before the game has been opened.
+    """
+    legal = np.zeros(N_ACTIONS, dtype=bool)
+    if state.get('play_card') is None:
+        return legal
+    player = state['players'][state['current_player_ix']]
+    legal[GIVE_INDEX] = not state['deck_locked']
+    legal[TAKE_INDEX:REJECT_INDEX] = True
+    legal[REJECT_INDEX:] = np.isnan(player['mask']).ravel()
+    return legal
+
+
 def _drop_filled_rows(cards, mask):
     masked_cards = cards * mask
     m = np.all(masked_cards == cards[0, :], axis=0)
     return cards[:, ~m], mask[:, ~m]
 
 
-def reducer(state, action):
-    if action['type'] == ActionType.RESET_GAME:
-        return _create_initial_state()
-    elif action['type'] == ActionType.LOCK_DECK:
-        return {**state, 'deck_locked': action['lock']}
-    elif action['type'] == ActionType.NEXT_PLAYER:
-        ix = state['current_player_ix'] + 1
-        if ix >= len(state['players']):
-            ix = 0
-        if state['finish_player_ix'] is not None and state['finish_player_ix'] == ix:
-            raise GameFinishException()
-        return {**state, 'current_player_ix': ix}
-    elif action['type'] == ActionType.PLAY_GIVE:
-        if state['deck_locked']:
-            raise DeckLockedException()
-        deck = copy.copy(state['deck'])
-        card = _give_card(deck)
-        return {**state, 'deck': deck, 'play_card': card, 'deck_locked': True}
-    elif action['type'] == ActionType.PLAY_TAKE:
-        row, col = action['pos']
-        ix = state['current_player_ix']
-        player = state['players'][ix]
-        cards = copy.copy(player['cards'])
-        mask = copy.copy(player['mask'])
+def _reset_game(state, seed=None):
+    return _create_initial_state(None if seed is None else DrawStream(int(seed)))
+
+
+def _lock_deck(state, lock):
+    return {**state, 'deck_locked': lock}
+
+
+def _next_player(state):
+    ix = state['current_player_ix'] + 1
+    if ix >= len(state['players']):
+        ix = 0
+    if state['finish_player_ix'] is not None and state['finish_player_ix'] == ix:
+        raise GameFinishException()
+    return {**state, 'current_player_ix': ix}
 
-        # update
-        old_card = cards[row, col]
-        cards[row, col] = state['play_card']
-        mask[row, col] = 1
-
-        players = [*state['players']]
-        players[ix]['cards'] = cards
-        players[ix]['mask'] = mask
-
-        return _finish_check({
-            **state,
-            'play_card': old_card,
-            'players': players,
-            'deck_locked': False
-        })
-    elif action['type'] == ActionType.PLAY_REJECT:
-        row, col = action['pos']
-        ix = state['current_player_ix']
-        player = state['players'][ix]
 
+def _play_give(state):
+    if state['deck_locked']:
+        raise DeckLockedException()
+    deck = state['deck'].copy() if state['deck'].size else _reshuffle_deck(state)
+    card = _give_card(deck, state['rng'])
+    return {**state, 'rng': _next_draw(state['rng']), 'deck': deck, 'play_card': card, 'deck_locked': True}
+
+
+def _play_take(state, row, col):
+    ix = state['current_player_ix']
+    player = state['players'][ix]
+    cards = copy.copy(player['cards'])
+    mask = copy.copy(player['mask'])
+
+    # update
+    old_card = cards[row, col]
+    totals = _update_totals(player, col, None if np.isnan(mask[row, col]) else old_card, state['play_card'])
+    cards[row, col] = state['play_card']
+    mask[row, col] = 1
+
+    players = [*state['players']]
+    players[ix] = {**player, 'cards': freeze(cards), 'mask': freeze(mask), **totals}
+    if DEBUG:
+        _check_totals(players[ix])
+
+    return _finish_check({
+        **state,
+        'play_card': old_card,
+        'players': players,
+        'deck_locked': False
+    })
+
+
+def _play_reject(state, row, col):
+    ix = state['current_player_ix']
+    player = state['players'][ix]
+
+    mask = copy.copy(player['mask'])
+    totals = _update_totals(player, col, None, player['cards'][row, col]) if np.isnan(mask[row, col]) else {}
+    mask[row, col] = 1
+
+    players = [*state['players']]
+    players[ix] = {**player, 'mask': freeze(mask), **totals}
+    if DEBUG:
+        _check_totals(players[ix])
+
+    return _finish_check({
+        **state,
+        'players': players,
+        'deck_locked': False
+    })
+
+
+def _add_player(state, name=None):
+    players = [*state['players']]
+    if name is None:
+        name = 'Player {}'.format(len(players))
+    deck = state['deck'].copy()
+    cards = deck.deal(12, _draw_generator(state['rng'])).reshape((3, 4))
+    player = _create_player(name, cards)
+    players.append(player)
+    return {**state, 'rng': _next_draw(state['rng']), 'players': players, 'deck': deck}
+
+
+def _open_game(state):
+    rng = _draw_generator(state['rng'])
+    players = []
+    for player in state['players']:
         mask = copy.copy(player['mask'])
-        mask[row, col] = 1
-
-        players = [*state['players']]
-        players[ix]['mask'] = mask
-
-        return _finish_check({
-            **state,
-            'players': players,
-            'deck_locked': False
-        })
-    elif action['type'] == ActionType.ADD_PLAYER:
-        name = action['name']
-        players = [*state['players']]
-        deck = copy.copy(state['deck'])
-        cards = np.array([_give_card(deck) for _ in range(12)]).reshape((3, 4))
-        player = _create_player(name, cards)
+        positions = _get_random_unrevealed_card_pos(mask, size=2, rng=rng)
+        for pos in positions:
+            _reveal_card(mask, pos)
+            player = {**player, **_update_totals(player, pos[1], None, player['cards'][tuple(pos)])}
+        player = {**player, 'mask': freeze(mask)}
+        if DEBUG:
+            _check_totals(player)
         players.append(player)
-        return {**state, 'players': players, 'deck': deck}
-    elif action['type'] == ActionType.OPEN_GAME:
-        players = [*state['players']]
-        for ix, player in enumerate(players):
-            mask = copy.copy(player['mask'])
-            positions = _get_random_unrevealed_card_pos(mask, size=2)
-            for pos in positions:
-                _reveal_card(mask, pos)
-            player['mask'] = mask
-
-        initial_player_ix = _player_maxscore_index(players)
-
-        deck = copy.copy(state['deck'])
-        card = _give_card(deck)
-
-        return {
-            **state,
-            'deck': deck,
-            'players': players,
-            'initial_player_ix': initial_player_ix,
-            'current_player_ix': initial_player_ix,
-            'play_card': card
-        }
 
-    return state
+    initial_player_ix = _player_maxscore_index(players)
+
+    deck = state['deck'].copy()
+    card = _give_card(deck, rng)
+
+    return {
+        **state,
+        'rng': _next_draw(state['rng']),
+        'deck': deck,
+        'players': players,
+        'initial_player_ix': initial_player_ix,
+        'current_player_ix': initial_player_ix,
+        'play_card': card
+    }
+
+
+# Handlers of dict actions, keyed by action type
+_REDUCERS = {
+    ActionType.RESET_GAME: lambda state, action: _reset_game(state, action.get('seed')),
+    ActionType.LOCK_DECK: lambda state, action: _lock_deck(state, action['lock']),
+    ActionType.NEXT_PLAYER: lambda state, action: _next_player(state),
+    ActionType.PLAY_GIVE: lambda state, action: _play_give(state),
+    ActionType.PLAY_TAKE: lambda state, action: _play_take(state, *action['pos']),
+    ActionType.PLAY_REJECT: lambda state, action: _play_reject(state, *action['pos']),
+    ActionType.ADD_PLAYER: lambda state, action: _add_player(state, action['name']),
+    ActionType.OPEN_GAME: lambda state, action: _open_game(state),
+}
+
+# Handlers of encoded actions, indexed by opcode and called with the argument bits
+_ENCODED_REDUCERS = [None] * 16
+_ENCODED_REDUCERS[Opcode.NEXT_PLAYER] = lambda state, arg: _next_player(state)
+_ENCODED_REDUCERS[Opcode.PLAY_GIVE] = lambda state, arg: _play_give(state)
+_ENCODED_REDUCERS[Opcode.PLAY_TAKE] = lambda state, arg: _play_take(state, *POSITIONS[arg])
+_ENCODED_REDUCERS[Opcode.PLAY_REJECT] = lambda state, arg: _play_reject(state, *POSITIONS[arg])
+_ENCODED_REDUCERS[Opcode.LOCK_DECK] = lambda state, arg: _lock_deck(state, bool(arg))
+_ENCODED_REDUCERS[Opcode.RESET_GAME] = lambda state, arg: _reset_game(state)
+_ENCODED_REDUCERS[Opcode.ADD_PLAYER] = lambda state, arg: _add_player(state)
+_ENCODED_REDUCERS[Opcode.OPEN_GAME] = lambda state, arg: _open_game(state)
+
+
+def reducer(state, action):
+    handler = _REDUCERS.get(action['type'])
+    if handler is None:
+        return state
+    return handler(state, action)
+
+
+def encoded_reducer(state, code):
+    """
+    Counterpart of `reducer` for actions encoded with `skyjo.actions.encode_action`.
+    """
+    handler = _ENCODED_REDUCERS[code >> 4]
+    if handler is None:
+        return state
+    return handler(state, code & 0xF)
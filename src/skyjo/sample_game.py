@@ -5,6 +5,7 @@ import aioredux
 
 from skyjo.actions import ActionCreator, ActionType
 from skyjo.exceptions import GameFinishException
+from skyjo.game import calculate_scores
 from skyjo.reducer import reducer
 from skyjo.middleware import logger_middleware
 from skyjo.solver import simple_solver
@@ -32,13 +33,6 @@ def configure_logger():
     logger.addHandler(fh)
 
 
-def calculate_scores(players, finish_player_ix):
-    scores = [np.sum(player['cards']) for player in players]
-    if not np.argmin(scores) == finish_player_ix:
-        scores[finish_player_ix] *= 2
-    return scores
-
-
 async def go():
     """
     Main routine.
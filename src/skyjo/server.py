@@ -0,0 +1,207 @@
+"""
+Game server that hosts many tables in one asyncio event loop. Every table has its own store with `reducer` and
+the configured middlewares. Clients talk to the server over TCP or a Unix socket with a line protocol:
+
+    CREATE <table> <n_players> [seed]   creates a table and opens the game        -> OK <table> <legal>
+    ACTION <table> <code>               applies an action encoded with             -> OK <table> <legal>
+                                        `skyjo.actions.encode_action`
+    STATE <table>                       returns the full state as JSON             -> STATE <table> <json>
+    JOIN <table>                        subscribes to the updates of a table       -> OK <table> <legal>
+    LEAVE <table>                       unsubscribes from a table                  -> OK <table>
+    CLOSE <table>                       removes a table                            -> OK <table>
+
+`<legal>` is the legal action mask of the current player (see `skyjo.reducer.legal_actions`) as a hex number,
+bit `i` being set if index `i` is legal. Errors are answered with `ERR <table> <message>`.
+After every action the subscribers of the table receive `UPDATE <table> <seq> <code>`, and once the game is over
+`END <table> <scores>` with the comma separated scores. Taking or rejecting a card automatically passes control
+to the next player. Subscribers that do not read their updates are disconnected once more than `max_buffer` bytes
+are waiting to be sent to them.
+
+Run with `python -m skyjo.server [--host HOST] [--port PORT | --unix PATH] [--max-buffer BYTES]`.
+"""
+import argparse
+import asyncio
+import json
+
+import numpy as np
+
+from skyjo.actions import ActionCreator, ActionType, Opcode, decode_action, action_index
+from skyjo.exceptions import GameFinishException
+from skyjo.game import calculate_scores
+from skyjo.NumpyEncoder import NumpyEncoder
+from skyjo.reducer import reducer, legal_actions
+from skyjo.store import create_store, apply_middleware
+
+_LEGAL_BITS = 1 << np.arange(25, dtype=np.int64)
+_PLAYER_ACTIONS = (ActionType.PLAY_GIVE, ActionType.PLAY_TAKE, ActionType.PLAY_REJECT)
+
+
+class Table:
+
+    def __init__(self, name, store):
+        self.name = name
+        self.store = store
+        self.subscribers = set()
+        self.seq = 0
+        self.scores = None
+
+    def legal(self):
+        if self.scores is not None:
+            return 0
+        return int(legal_actions(self.store.state) @ _LEGAL_BITS)
+
+    def apply(self, code):
+        """
+        Applies an encoded action and passes control to the next player after PLAY_TAKE or PLAY_REJECT.
+        Returns whether the game is over.
+        """
+        self.store.dispatch(decode_action(code))
+        self.seq += 1
+        if code >> 4 in (Opcode.PLAY_TAKE, Opcode.PLAY_REJECT):
+            try:
+                self.store.dispatch(ActionCreator.next_player())
+            except GameFinishException:
+                state = self.store.state
+                self.scores = calculate_scores(state['players'], state['finish_player_ix'])
+                return True
+        return False
+
+
+class GameServer:
+    """
+    Hosts any number of tables. `middlewares` are applied to the store of every table. Subscribers with more than
+    `max_buffer` unsent bytes are disconnected and counted in `lagging`.
+    """
+
+    def __init__(self, middlewares=(), max_buffer=1 << 20):
+        self.middlewares = middlewares
+        self.max_buffer = max_buffer
+        self.tables = {}
+        self.lagging = 0
+
+    def create_table(self, name, n_players, seed=None):
+        if name in self.tables:
+            raise ValueError('table exists')
+        if not 1 <= n_players <= 8:
+            raise ValueError('invalid number of players')
+        if self.middlewares:
+            store = apply_middleware(*self.middlewares)(create_store)(reducer, {})
+        else:
+            store = create_store(reducer, {})
+        store.dispatch(ActionCreator.reset_game(seed))
+        for ix in range(n_players):
+            store.dispatch(ActionCreator.add_player('Player {}'.format(ix)))
+        store.dispatch(ActionCreator.open_game())
+        table = self.tables[name] = Table(name, store)
+        return table
+
+    def _table(self, name):
+        try:
+            return self.tables[name]
+        except KeyError:
+            raise ValueError('unknown table')
+
+    def _action(self, table, code):
+        if table.scores is not None:
+            raise ValueError('game over')
+        action = decode_action(code)
+        if action['type'] not in _PLAYER_ACTIONS or not legal_actions(table.store.state)[action_index(action)]:
+            raise ValueError('illegal action')
+        finished = table.apply(code)
+        message = 'UPDATE {} {} {}\n'.format(table.name, table.seq, code)
+        if finished:
+            message += 'END {} {}\n'.format(table.name, ','.join(str(int(s)) for s in table.scores))
+        self._broadcast(table, message.encode())
+
+    def _broadcast(self, table, data):
+        # the same bytes are written to every subscriber
+        for writer in list(table.subscribers):
+            if writer.is_closing():
+                table.subscribers.discard(writer)
+            elif writer.transport.get_write_buffer_size() > self.max_buffer:
+                # a subscriber that does not keep up would hold an ever growing buffer
+                table.subscribers.discard(writer)
+                self.lagging += 1
+                writer.close()
+            else:
+                writer.write(data)
+
+    def handle_line(self, line, writer=None):
+        """
+        Handles a single protocol line and returns the reply line.
+        """
+        parts = line.split()
+        if len(parts) < 2:
+            return 'ERR - invalid command\n'
+        command, name, args = parts[0].upper(), parts[1], parts[2:]
+        try:
+            if command == 'CREATE':
+                table = self.create_table(name, int(args[0]), int(args[1]) if len(args) > 1 else None)
+            elif command == 'ACTION':
+                table = self._table(name)
+                self._action(table, int(args[0]))
+            elif command == 'STATE':
+                return 'STATE {} {}\n'.format(name, json.dumps(self._table(name).store.state, cls=NumpyEncoder))
+            elif command == 'JOIN':
+                table = self._table(name)
+                table.subscribers.add(writer)
+            elif command == 'LEAVE':
+                self._table(name).subscribers.discard(writer)
+                return 'OK {}\n'.format(name)
+            elif command == 'CLOSE':
+                del self.tables[self._table(name).name]
+                return 'OK {}\n'.format(name)
+            else:
+                return 'ERR {} unknown command\n'.format(name)
+        except (ValueError, IndexError) as e:
+            return 'ERR {} {}\n'.format(name, e)
+        return 'OK {} {:x}\n'.format(name, table.legal())
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    reply = self.handle_line(line.decode(), writer)
+                except UnicodeDecodeError:
+                    reply = 'ERR - invalid encoding\n'
+                writer.write(reply.encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for table in self.tables.values():
+                table.subscribers.discard(writer)
+            writer.close()
+
+    async def serve_tcp(self, host='127.0.0.1', port=8765):
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    async def serve_unix(self, path):
+        return await asyncio.start_unix_server(self.handle_client, path)
+
+
+async def _serve(args):
+    game_server = GameServer(max_buffer=args.max_buffer)
+    if args.unix:
+        server = await game_server.serve_unix(args.unix)
+    else:
+        server = await game_server.serve_tcp(args.host, args.port)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Skyjo game server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='listen on a Unix socket instead of TCP')
+    parser.add_argument('--max-buffer', type=int, default=1 << 20,
+                        help='disconnect subscribers with more unsent bytes than this (default: 1 MiB)')
+    asyncio.run(_serve(parser.parse_args(argv)))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,37 +1,154 @@
+import time
 import numpy as np
 from skyjo.actions import ActionCreator
+from skyjo.batch import (
+    GIVE, TAKE, NO_PLAYER, _create_initial_batch_state, _draw_cards, apply_moves, batch_play,
+    batch_scores, batch_simple_policy, index_moves
+)
+from skyjo.deck import DECK_COUNTS
+from skyjo.reducer import legal_actions
 
 
-def simple_solver(players, current_player_ix, play_card, deck_locked):
+def simple_solver(players, current_player_ix, play_card, deck_locked, rng=None, tracker=None):
     """
     Simple solver that is based on a heuristic and is mainly used for demonstration purposes.
+    Random choices are taken from `rng` or the global `np.random` state if omitted.
+    Play cards above 4 are replaced by a card from the deck, or, if a `skyjo.tracker.CardTracker` is given,
+    play cards above the expected value of the next draw.
     """
+    rng = np.random if rng is None else rng
     player = players[current_player_ix]
-    cards = player['cards'] * player['mask']
-    total = np.nansum(cards)
-    other_players = [players[ix] for ix in range(len(players)) if ix != current_player_ix]
-    other_players_totals = np.array([np.nansum(p['cards'] * p['mask']) for p in other_players])
-
-    ixs_larger = np.argwhere(cards > play_card)
-    ixs_equal = np.argwhere(cards == play_card)
-    ixs_nan = np.argwhere(np.isnan(cards))
+    threshold = 4 if tracker is None else tracker.expected_draw()
 
-    if play_card > 4 and not deck_locked:
+    if play_card > threshold and not deck_locked:
         return ActionCreator.play_give()
+
+    # candidates are only searched once the previous rules did not apply
+    cards = player['cards'] * player['mask']
+    ixs_larger = np.argwhere(cards > play_card)
     if len(ixs_larger) > 0:
-        cix = np.random.choice(range(len(ixs_larger)))
+        cix = rng.choice(len(ixs_larger))
         return ActionCreator.play_take(ixs_larger[cix])
+    ixs_equal = np.argwhere(cards == play_card)
+    ixs_nan = np.argwhere(np.isnan(cards))
     if len(ixs_equal) > 0:
-        if np.random.rand() > .5:
-            cix = np.random.choice(range(len(ixs_equal)))
+        if rng.random() > .5:
+            cix = rng.choice(len(ixs_equal))
             return ActionCreator.play_take(ixs_equal[cix])
         else:
-            cix = np.random.choice(range(len(ixs_nan)))
+            cix = rng.choice(len(ixs_nan))
             return ActionCreator.play_reject(ixs_nan[cix])
     if len(ixs_nan) > 1:
-        cix = np.random.choice(range(len(ixs_nan)))
+        cix = rng.choice(len(ixs_nan))
         return ActionCreator.play_reject(ixs_nan[cix])
+    total = player['score']
+    other_players_totals = np.array([p['score'] for ix, p in enumerate(players) if ix != current_player_ix])
     if len(ixs_nan) == 1 and np.all(other_players_totals + 4 < total + play_card):
         return ActionCreator.play_take(ixs_nan[0])
+    if not deck_locked:
+        return ActionCreator.play_give()
+    if len(ixs_nan) < 12:
+        # revealing the last card would finish the game with a higher score, so swap the highest card instead
+        return ActionCreator.play_take(np.argwhere(cards == np.nanmax(cards))[0])
 
     raise RuntimeError("No action available.")
+
+
+def _to_action(move, pos):
+    if move == GIVE:
+        return ActionCreator.play_give()
+    action = ActionCreator.play_take if move == TAKE else ActionCreator.play_reject
+    return action(divmod(int(pos), 4))
+
+
+def _determinize(players, current_player_ix, play_card, deck_locked, n, rng, tracker=None):
+    """
+    Creates a batch of `n` games from the view of a solver. Hidden cards are dealt from all cards that are not
+    visible and the remaining ones form the deck; since the discard pile is unknown, it is assumed to be in the deck.
+    With a `skyjo.tracker.CardTracker` the grids are not scanned, and the discard pile and a reshuffled deck are
+    taken into account.
+    """
+    n_players = len(players)
+    state = _create_initial_batch_state(n, n_players, [p['name'] for p in players])
+    revealed = np.array([p['mask'] == 1 for p in players])
+    cards = np.where(revealed, np.array([p['cards'] for p in players]), 0).astype(np.int8)
+
+    if tracker is None:
+        unseen = DECK_COUNTS - np.bincount(cards[revealed] + 2, minlength=15).astype(np.int16)
+        unseen[play_card + 2] -= 1
+    else:
+        unseen = tracker.unseen
+    state['deck'][:] = np.maximum(unseen, 0)
+    state['cards'][:] = cards
+    state['mask'][:] = revealed
+
+    flat = state['cards'].reshape(n, -1)
+    games = np.arange(n)
+    for ix in np.flatnonzero(~revealed.ravel()):
+        flat[:, ix] = _draw_cards(state['deck'], games, rng)
+    if tracker is not None and tracker.deck is not None:
+        state['deck'][:] = tracker.deck
+
+    # all moves see the same sequence of drawn cards for a sample
+    state['draw_keys'] = rng.random((n, 160))
+    state['draw_count'] = np.zeros(n, dtype=np.int16)
+
+    finish_player_ix = next((ix for ix, p in enumerate(players) if p['hidden'] == 0), NO_PLAYER)
+    state['play_card'][:] = play_card
+    state['finish_player_ix'][:] = finish_player_ix
+    state['current_player_ix'][:] = current_player_ix
+    state['deck_locked'][:] = deck_locked
+    return state
+
+
+def rollout_solver(players, current_player_ix, play_card, deck_locked, rng=None,
+                   rollouts=256, batch_size=256, time_limit=None, policy=batch_simple_policy, tracker=None):
+    """
+    Monte Carlo solver that evaluates every move with random rollouts to the end of the game.
+
+    A rollout samples the unknown cards, applies the move and lets the vectorized `policy` play the remaining turns
+    of all players. All moves are evaluated on the same samples and all rollouts of a round are played at once with
+    the batched engine. The move with the lowest mean score difference to the best other player is chosen.
+    Rounds of `batch_size` rollouts per move are played until `rollouts` is reached. With a `time_limit` in seconds
+    the first round plays a single rollout per move, and every further round is sized from the time the previous
+    round took, so that it ends before the deadline. At least one rollout per move is always played.
+    The unknown cards are sampled from the counts of `tracker` if given, see `skyjo.tracker.CardTracker`.
+    """
+    if rng is None:
+        rng = np.random.default_rng(np.random.randint(2 ** 32))
+    legal = legal_actions({
+        'players': players, 'current_player_ix': current_player_ix, 'play_card': play_card, 'deck_locked': deck_locked
+    })
+    moves, pos = index_moves(np.flatnonzero(legal))
+    n_moves = len(moves)
+    totals = np.zeros(n_moves)
+    done = 0
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    k = batch_size if deadline is None else 1
+
+    while done < rollouts:
+        k = min(k, batch_size, rollouts - done)
+        start = time.perf_counter()
+        sampled = _determinize(players, current_player_ix, play_card, deck_locked, k, rng, tracker)
+        # game `i * k + j` plays move i on sample j
+        state = {key: value if key == 'names' else np.repeat(value[None], n_moves, axis=0).reshape(
+            (n_moves * k,) + value.shape[1:]) for key, value in sampled.items()}
+        games = np.arange(n_moves * k)
+        state = apply_moves(state, games, np.repeat(moves, k), np.repeat(pos, k), rng)
+        state = batch_play(state, rng, policy)
+
+        scores = batch_scores(state).astype(int)
+        own = scores[:, current_player_ix].copy()
+        scores[:, current_player_ix] = np.iinfo(scores.dtype).max
+        totals += (own - scores.min(axis=1)).reshape(n_moves, k).sum(axis=1)
+        done += k
+
+        if deadline is not None:
+            # a round has a fixed cost, so scaling the last round linearly overestimates the time of the next one
+            end = time.perf_counter()
+            k = int((deadline - end) / (end - start) * k)
+            if k < 1:
+                break
+
+    best = int(np.argmin(totals))
+    return _to_action(moves[best], pos[best])
@@ -0,0 +1,200 @@
+"""
+Online aggregate statistics over streams of game result records (see `skyjo.game.result_dtype`).
+
+Every aggregator consumes single records or arrays of records with `update` and keeps a constant amount of memory,
+no matter how many games are streamed. `aggregate` feeds a stream of results to several aggregators and
+periodically writes a snapshot of their summaries to disk.
+"""
+import json
+import os
+import statistics
+import numpy as np
+
+
+class WinRate:
+    """
+    Wins and win rates per seat and per solver. `solvers` names the solver of each seat; seats with the same
+    name are combined.
+    """
+    name = 'win_rate'
+
+    def __init__(self, n_players, solvers=None):
+        self.solvers = list(solvers) if solvers is not None else ['Player {}'.format(i) for i in range(n_players)]
+        self.games = 0
+        self.wins = np.zeros(n_players, dtype=np.int64)
+
+    def update(self, records):
+        records = np.atleast_1d(records)
+        self.games += len(records)
+        self.wins += np.bincount(records['winner'], minlength=len(self.wins))
+
+    def summary(self):
+        games = max(self.games, 1)
+        solver_wins = {}
+        for solver, wins in zip(self.solvers, self.wins.tolist()):
+            solver_wins[solver] = solver_wins.get(solver, 0) + wins
+        return {
+            'games': self.games,
+            'seats': (self.wins / games).tolist(),
+            'solvers': {solver: wins / games for solver, wins in solver_wins.items()},
+        }
+
+
+class ScoreMoments:
+    """
+    Mean and variance of the final scores per seat. Chunks are combined with the parallel variant of Welford's
+    algorithm, so the result is numerically stable for any number of games.
+    """
+    name = 'scores'
+
+    def __init__(self, n_players):
+        self.count = 0
+        self.mean = np.zeros(n_players)
+        self.m2 = np.zeros(n_players)
+
+    def update(self, records):
+        scores = np.atleast_1d(records)['scores'].astype(float)
+        n = len(scores)
+        if n == 0:
+            return
+        mean = scores.mean(axis=0)
+        m2 = ((scores - mean) ** 2).sum(axis=0)
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else np.zeros_like(self.m2)
+
+    def summary(self):
+        return {'count': self.count, 'mean': self.mean.tolist(), 'variance': self.variance.tolist()}
+
+
+class Histogram:
+    """
+    Histogram of an integer field of the result records over the values `lo` to `hi`. Smaller and larger values
+    are counted in the first and last bin.
+    """
+
+    def __init__(self, field, lo, hi, name=None):
+        self.field = field
+        self.lo = lo
+        self.name = name or '{}_histogram'.format(field)
+        self.counts = np.zeros(hi - lo + 1, dtype=np.int64)
+
+    def update(self, records):
+        values = np.atleast_1d(records)[self.field].ravel().astype(np.int64)
+        bins = np.clip(values - self.lo, 0, len(self.counts) - 1)
+        self.counts += np.bincount(bins, minlength=len(self.counts))
+
+    def summary(self):
+        return {'lo': self.lo, 'counts': self.counts.tolist()}
+
+
+def score_histogram():
+    # 12 cards of -2 to 12 points, the finisher's score may be doubled
+    return Histogram('scores', -48, 288)
+
+
+def turn_histogram(max_turns=500):
+    return Histogram('turns', 0, max_turns)
+
+
+class DoubledRate:
+    """
+    How often the score of the finisher is doubled because another player has a lower score.
+    """
+    name = 'doubled'
+
+    def __init__(self):
+        self.games = 0
+        self.doubled = 0
+
+    def update(self, records):
+        records = np.atleast_1d(records)
+        self.games += len(records)
+        self.doubled += int(records['doubled'].sum())
+
+    def summary(self):
+        return {'games': self.games, 'doubled': self.doubled, 'rate': self.doubled / self.games if self.games else 0.}
+
+
+class PairedDifference:
+    """
+    Mean of paired differences, e.g. the score of one solver minus the score of another solver in the same game,
+    with a normal approximation confidence interval. Chunks are combined like in `ScoreMoments`.
+    """
+
+    def __init__(self, name='difference', confidence=.95):
+        self.name = name
+        self.confidence = confidence
+        self.count = 0
+        self.mean = 0.
+        self.m2 = 0.
+
+    def update(self, differences):
+        differences = np.atleast_1d(differences).astype(float)
+        n = len(differences)
+        if n == 0:
+            return
+        mean = float(differences.mean())
+        m2 = float(((differences - mean) ** 2).sum())
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.
+
+    @property
+    def stderr(self):
+        return (self.variance / self.count) ** .5 if self.count else float('inf')
+
+    def interval(self):
+        z = statistics.NormalDist().inv_cdf((1 + self.confidence) / 2)
+        return self.mean - z * self.stderr, self.mean + z * self.stderr
+
+    def summary(self):
+        lo, hi = self.interval()
+        return {
+            'count': self.count, 'mean': self.mean, 'variance': self.variance, 'stderr': self.stderr,
+            'confidence': self.confidence, 'interval': [lo, hi],
+        }
+
+
+def write_snapshot(path, aggregators):
+    """
+    Writes the summaries of all aggregators to a JSON file. The file is replaced atomically,
+    so a reader never sees a partially written snapshot.
+    """
+    tmp_path = '{}.tmp'.format(path)
+    with open(tmp_path, 'w') as f:
+        json.dump({aggregator.name: aggregator.summary() for aggregator in aggregators}, f)
+    os.replace(tmp_path, path)
+
+
+def aggregate(results, aggregators, snapshot_path=None, snapshot_every=100000):
+    """
+    Feeds a stream of result records or arrays of records, e.g. `skyjo.game.iter_results` or
+    `skyjo.tournament.run_tournament`, to all aggregators. If `snapshot_path` is given, a snapshot is written
+    whenever another `snapshot_every` games have been aggregated and once the stream has ended.
+    Returns the aggregators.
+    """
+    games = 0
+    next_snapshot = snapshot_every
+    for records in results:
+        for aggregator in aggregators:
+            aggregator.update(records)
+        games += np.size(records)
+        if snapshot_path is not None and games >= next_snapshot:
+            write_snapshot(snapshot_path, aggregators)
+            next_snapshot = games + snapshot_every
+    if snapshot_path is not None:
+        write_snapshot(snapshot_path, aggregators)
+    return aggregators
@@ -0,0 +1,121 @@
+from collections import deque
+from functools import reduce
+
+
+class ActionTypes:
+    INIT = '@@redux/INIT'
+
+
+class Store:
+    """
+    Synchronous store with the same reducer and middleware contract as the `aioredux` store.
+    `dispatch` runs the reducer immediately and returns the action, so no event loop is required.
+    This makes it suitable for CPU-bound offline simulations.
+    """
+
+    def __init__(self, reducer, initial_state=None):
+        if not callable(reducer):
+            raise ValueError('Expected the reducer to be callable.')
+        self.reducer = reducer
+        self._state = initial_state
+        self.listeners = set()
+        self.is_dispatching = False
+
+    @property
+    def state(self):
+        return self._state
+
+    def subscribe(self, listener):
+        self.listeners.add(listener)
+
+        def unsubscribe():
+            self.listeners.remove(listener)
+
+        return unsubscribe
+
+    def dispatch(self, action):
+        if self.is_dispatching:
+            raise RuntimeError('Reducers may not dispatch actions.')
+        try:
+            self.is_dispatching = True
+            next_state = self.reducer(self._state, action)
+        finally:
+            self.is_dispatching = False
+        # If no change in state, do not notify subscribers
+        if next_state is not self._state:
+            self._state = next_state
+            for listener in self.listeners:
+                listener()
+        return action
+
+
+class HistoryStore(Store):
+    """
+    Synchronous store that keeps an undo stack of previous states.
+    The reducer never modifies states in place, so every state can be kept as an O(1) snapshot that shares
+    all unchanged players and grids with its neighbours. The random draws of a seeded game only depend on the seed and
+    the number of draws so far, so dispatching an action again after an undo draws the same cards. At most `limit`
+    states are kept if given.
+    """
+
+    def __init__(self, reducer, initial_state=None, limit=None):
+        super().__init__(reducer, initial_state)
+        self.past = deque(maxlen=limit)
+        self.future = []
+
+    def dispatch(self, action):
+        state = self._state
+        action = super().dispatch(action)
+        if self._state is not state:
+            self.past.append(state)
+            self.future.clear()
+        return action
+
+    def snapshot(self):
+        return self._state
+
+    def _restore(self, state):
+        self._state = state
+        for listener in self.listeners:
+            listener()
+
+    def undo(self):
+        if not self.past:
+            raise IndexError('Nothing to undo.')
+        self.future.append(self._state)
+        self._restore(self.past.pop())
+
+    def redo(self):
+        if not self.future:
+            raise IndexError('Nothing to redo.')
+        self.past.append(self._state)
+        self._restore(self.future.pop())
+
+
+def create_store(reducer, initial_state=None):
+    store = Store(reducer, initial_state)
+    # dispatch an 'INIT' action so every reducer returns initial state
+    store.dispatch({'type': ActionTypes.INIT})
+    return store
+
+
+def create_history_store(reducer, initial_state=None, limit=None):
+    store = HistoryStore(reducer, initial_state, limit)
+    store.dispatch({'type': ActionTypes.INIT})
+    return store
+
+
+def apply_middleware(*middlewares):
+    """
+    Synchronous counterpart of `aioredux.apply_middleware`.
+    Middlewares are called as `middleware(dispatch, state_func)(next_handler)(action)`, the first one being outermost.
+    """
+    def next_func(next_handler):
+        def create_store_with_middleware(reducer, initial_state=None):
+            store = next_handler(reducer, initial_state)
+            middleware_api = dict(dispatch=lambda action: store.dispatch(action), state_func=lambda: store.state)
+            chain = [middleware(**middleware_api) for middleware in middlewares]
+            store.dispatch = reduce(lambda handler, middleware: middleware(handler), reversed(chain), store.dispatch)
+            return store
+        return create_store_with_middleware
+    return next_func
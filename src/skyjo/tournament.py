@@ -0,0 +1,178 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+from multiprocessing import shared_memory
+
+from skyjo.game import calculate_scores, iter_results, play_game, result_dtype
+from skyjo.solver import simple_solver
+from skyjo.stats import PairedDifference
+
+
+def _play_into(results, solvers, seed_seq, start):
+    """
+    Plays one game per entry of `results` with a Generator created from `seed_seq` and writes the result records.
+    Every game gets its own deck seed and solver seed drawn from that Generator, so a game can be replayed from its
+    record with `skyjo.game.replay_game`.
+    """
+    for i, result in enumerate(iter_results(solvers, len(results), np.random.default_rng(seed_seq), start)):
+        results[i] = result
+
+
+def _play_chunk(solvers, seed_seq, start, count):
+    """
+    Plays `count` games and returns their result records.
+    """
+    results = np.zeros(count, dtype=result_dtype(len(solvers)))
+    _play_into(results, solvers, seed_seq, start)
+    return results
+
+
+def _play_chunk_shared(solvers, seed_seq, start, count, name, n_games):
+    """
+    Plays `count` games and writes their result records into the slots `start` to `start + count` of the
+    shared memory block `name`. Only the number of games is sent back to the parent.
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        results = np.ndarray(n_games, dtype=result_dtype(len(solvers)), buffer=shm.buf)
+        _play_into(results[start:start + count], solvers, seed_seq, start)
+        del results
+    finally:
+        shm.close()
+    return count
+
+
+def _chunks(n_games, workers, seed, chunk_size):
+    """
+    Splits the games evenly across the workers and every worker's share into chunks.
+    Each worker gets its own spawned SeedSequence, whose children seed the chunks of that worker.
+    """
+    worker_seqs = np.random.SeedSequence(seed).spawn(workers)
+    bounds = np.linspace(0, n_games, workers + 1).astype(int)
+    for seq, lo, hi in zip(worker_seqs, bounds[:-1], bounds[1:]):
+        starts = range(lo, hi, chunk_size)
+        for chunk_seq, start in zip(seq.spawn(len(starts)), starts):
+            yield chunk_seq, start, min(chunk_size, hi - start)
+
+
+def run_tournament(n_games, solvers=(simple_solver, simple_solver), workers=None, seed=0, chunk_size=1000):
+    """
+    Plays `n_games` games in a process pool and yields arrays of result records (see `result_dtype`) as chunks finish.
+
+    Chunks are yielded in order of completion; the `game` field identifies each game. For a given `seed` and
+    number of `workers` every game is played with the same random numbers, so results are reproducible.
+    Solvers need to be picklable, e.g. module level functions.
+    """
+    workers = workers or os.cpu_count()
+    chunks = list(_chunks(n_games, workers, seed, chunk_size))
+    if workers == 1:
+        for chunk in chunks:
+            yield _play_chunk(solvers, *chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_play_chunk, solvers, *chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+class SharedResults:
+    """
+    Result records of `n_games` games in a shared memory block that worker processes write to directly.
+    `records` is a view of the block; drop all references to it before calling `close`, which frees the block.
+    """
+
+    def __init__(self, n_games, n_players):
+        dtype = result_dtype(n_players)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, n_games * dtype.itemsize))
+        self.records = np.ndarray(n_games, dtype=dtype, buffer=self._shm.buf)
+        self.records[:] = 0
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def close(self):
+        self.records = None
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def run_shared_tournament(n_games, solvers=(simple_solver, simple_solver), workers=None, seed=0, chunk_size=1000):
+    """
+    Plays `n_games` games like `run_tournament`, but the workers write the result records into a preallocated
+    shared memory block instead of sending them back through a pipe. Every chunk owns a fixed range of slots,
+    so no locking is needed, and record `i` always holds game `i`.
+    Returns a SharedResults, which has to be closed once the results are no longer needed.
+    """
+    workers = workers or os.cpu_count()
+    results = SharedResults(n_games, len(solvers))
+    try:
+        chunks = list(_chunks(n_games, workers, seed, chunk_size))
+        if workers == 1:
+            for seed_seq, start, count in chunks:
+                _play_into(results.records[start:start + count], solvers, seed_seq, start)
+            return results
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_play_chunk_shared, solvers, *chunk, results.name, n_games)
+                       for chunk in chunks]
+            wait(futures)
+            for future in futures:
+                future.result()
+        return results
+    except BaseException:
+        results.close()
+        raise
+
+
+def _seat_results(solver, seat, n_players, opponent, deck_seed, solver_seed):
+    """
+    Plays one game with `solver` in `seat` and `opponent` in all other seats.
+    Returns the score of the seat and whether it has won.
+    """
+    solvers = [opponent] * n_players
+    solvers[seat] = solver
+    state, _ = play_game(solvers, np.random.default_rng([solver_seed, seat]), seed=deck_seed)
+    scores = calculate_scores(state['players'], state['finish_player_ix'])
+    return float(scores[seat]), float(np.argmin(scores) == seat)
+
+
+def compare_solvers(solver_a, solver_b, n_games, n_players=2, opponent=simple_solver, seed=0, confidence=.95,
+                    common_random_numbers=True):
+    """
+    Compares two solvers with common random numbers. Every game is played in every seat rotation, once with
+    `solver_a` and once with `solver_b` in the rotated seat and `opponent` in all other seats. Both runs use the
+    same deck seed, which fixes the deal and the cards revealed by OPEN_GAME, and the same random numbers for the
+    solvers, so the paired differences only reflect the decisions of the two solvers.
+
+    Returns the summaries of the paired differences (a minus b) of the mean score and the win rate per game,
+    see `skyjo.stats.PairedDifference`. With `common_random_numbers=False` the runs of `solver_b` get their own
+    seeds, which shows how many more games independent runs need for the same confidence.
+    """
+    rng = np.random.default_rng(seed)
+    score_diff = PairedDifference('score', confidence)
+    win_diff = PairedDifference('win_rate', confidence)
+    scores = np.zeros((n_games, 2))
+    for game in range(n_games):
+        seeds_a = rng.integers(2 ** 63, size=2).tolist()
+        seeds_b = seeds_a if common_random_numbers else rng.integers(2 ** 63, size=2).tolist()
+        results = np.array([
+            [_seat_results(solver, seat, n_players, opponent, *seeds) for seat in range(n_players)]
+            for solver, seeds in ((solver_a, seeds_a), (solver_b, seeds_b))
+        ]).mean(axis=1)
+        scores[game] = results[:, 0]
+        score_diff.update(results[0, 0] - results[1, 0])
+        win_diff.update(results[0, 1] - results[1, 1])
+    return {
+        'games': n_games,
+        'mean_score': scores.mean(axis=0).tolist(),
+        'score': score_diff.summary(),
+        'win_rate': win_diff.summary(),
+    }
@@ -0,0 +1,132 @@
+"""
+Card counting from the view of a player: which cards have not been seen yet, and what is known about hidden cards and
+the next card drawn from the deck.
+"""
+import numpy as np
+
+from skyjo.actions import ActionType
+from skyjo.deck import CARD_VALUES, DECK_COUNTS
+
+_VALUES = CARD_VALUES.astype(np.int64)
+_SQUARES = _VALUES ** 2
+
+
+class CardTracker:
+    """
+    Keeps the counts of the cards that have not been seen, updated incrementally with every action
+    (see `skyjo.middleware.tracker_middleware`).
+
+    Starting from a full deck, every revealed card and every play card is removed from `unseen`. Replaced play cards
+    are collected in `discards`. As long as the deck has not been reshuffled, hidden cards and the next draw are
+    equally likely to be any of the unseen cards. Once the deck runs out, it is rebuilt from the discard pile, so
+    the following draws come from `deck`, while the unseen cards are exactly the hidden ones.
+
+    All queries take constant time.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.unseen = DECK_COUNTS.astype(np.int64)
+        self.discards = np.zeros(15, dtype=np.int64)
+        # composition of the deck after a reshuffle, None while the deck is drawn from the unseen cards
+        self.deck = None
+        self.deck_size = int(DECK_COUNTS.sum())
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Creates a tracker from a single state by scanning all grids. A reshuffle of the deck can not be detected
+        from a state, so all unseen cards are assumed to be in the deck or hidden.
+        """
+        tracker = cls()
+        in_play = np.zeros(15, dtype=np.int64)
+        for player in state['players']:
+            revealed = player['mask'] == 1
+            tracker.unseen -= np.bincount(np.asarray(player['cards'])[revealed] + 2, minlength=15)
+            in_play += np.bincount(np.asarray(player['cards'], dtype=int).ravel() + 2, minlength=15)
+        if state['play_card'] is not None:
+            tracker.unseen[state['play_card'] + 2] -= 1
+            in_play[state['play_card'] + 2] += 1
+        tracker.discards = DECK_COUNTS - in_play - state['deck'].counts
+        tracker.unseen -= tracker.discards
+        tracker.deck_size = state['deck'].size
+        return tracker
+
+    def _see(self, card):
+        self.unseen[card + 2] -= 1
+
+    def _reveal(self, player, pos):
+        """
+        Removes the card at `pos` of `player` if it was hidden before.
+        """
+        if np.isnan(player['mask'][pos]):
+            self._see(player['cards'][pos])
+
+    def update(self, action, prev_state, state):
+        """
+        Updates the counts with an action that turned `prev_state` into `state`.
+        """
+        action_type = action['type']
+        if action_type == ActionType.RESET_GAME:
+            self.reset()
+        elif action_type == ActionType.OPEN_GAME:
+            for player in state['players']:
+                revealed = player['mask'] == 1
+                self.unseen -= np.bincount(np.asarray(player['cards'])[revealed] + 2, minlength=15)
+            self._see(state['play_card'])
+        elif action_type == ActionType.PLAY_GIVE:
+            if prev_state['deck'].size == 0:
+                self.deck = self.discards
+                self.discards = np.zeros(15, dtype=np.int64)
+            if self.deck is None:
+                self._see(state['play_card'])
+            else:
+                self.deck[state['play_card'] + 2] -= 1
+            self.discards[prev_state['play_card'] + 2] += 1
+        elif action_type in (ActionType.PLAY_TAKE, ActionType.PLAY_REJECT):
+            pos = tuple(action['pos'])
+            self._reveal(prev_state['players'][prev_state['current_player_ix']], pos)
+        self.deck_size = state['deck'].size
+
+    def _moments(self, counts):
+        n = counts.sum()
+        if n == 0:
+            return np.nan, np.nan
+        mean = counts @ _VALUES / n
+        return mean, counts @ _SQUARES / n - mean ** 2
+
+    def hidden_distribution(self):
+        """
+        Returns the probability of every card value (-2 to 12) for a hidden card.
+        """
+        return self.unseen / max(self.unseen.sum(), 1)
+
+    def draw_counts(self):
+        """
+        Returns the counts of the cards the next draw is taken from.
+        """
+        # an empty deck is rebuilt from the discard pile before drawing
+        if self.deck_size == 0:
+            return self.discards
+        return self.unseen if self.deck is None else self.deck
+
+    def draw_distribution(self):
+        """
+        Returns the probability of every card value (-2 to 12) for the next card drawn from the deck.
+        """
+        counts = self.draw_counts()
+        return counts / max(counts.sum(), 1)
+
+    def expected_hidden(self):
+        return self._moments(self.unseen)[0]
+
+    def hidden_variance(self):
+        return self._moments(self.unseen)[1]
+
+    def expected_draw(self):
+        return self._moments(self.draw_counts())[0]
+
+    def draw_variance(self):
+        return self._moments(self.draw_counts())[1]
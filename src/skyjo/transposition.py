@@ -0,0 +1,123 @@
+import functools
+import pickle
+from collections import OrderedDict
+
+from skyjo.packed import pack_cards, pack_mask
+
+
+def solver_key(players, current_player_ix, play_card, deck_locked):
+    """
+    Canonical hashable key of a position as seen by a solver. Hidden cards are not part of the key,
+    so positions that only differ in cards the solver cannot see share their key.
+    """
+    grids = tuple((pack_cards(p['cards'], p['mask']), pack_mask(p['mask'])) for p in players)
+    return grids, int(current_player_ix), int(play_card), bool(deck_locked)
+
+
+class TranspositionTable:
+    """
+    Bounded memoization table with least recently used eviction.
+    Counts hits, misses and evictions and can be persisted to disk between runs.
+    """
+
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.,
+        }
+
+    def save(self, path):
+        """
+        Writes all entries, from least to most recently used, to `path`.
+        """
+        with open(path, 'wb') as f:
+            pickle.dump({'maxsize': self.maxsize, 'entries': list(self._entries.items())}, f)
+
+    @classmethod
+    def load(cls, path, maxsize=None):
+        """
+        Reads a table written by `save`. Counters start at zero.
+        """
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        table = cls(data['maxsize'] if maxsize is None else maxsize)
+        for key, value in data['entries']:
+            table.put(key, value)
+        table.evictions = 0
+        return table
+
+
+def cached_solver(solver, table=None):
+    """
+    Wraps a solver with the signature of `skyjo.solver.simple_solver`, so that the move for a known position is
+    looked up in a TranspositionTable instead of being evaluated again. The table is available as `.table`.
+
+    The move of a randomized solver is fixed per position once cached, so a game could cycle through the same
+    positions forever. A position that repeats within a game is therefore evaluated by `solver` again instead.
+    Revealed cards stay revealed, so positions can only repeat while the number of hidden cards is unchanged,
+    and only these positions are remembered. Repeats are counted in `.repeats`.
+    """
+    table = TranspositionTable() if table is None else table
+    seen = set()
+    seen_hidden = None
+
+    @functools.wraps(solver)
+    def wrapper(players, current_player_ix, play_card, deck_locked, **kwargs):
+        nonlocal seen_hidden
+        key = solver_key(players, current_player_ix, play_card, deck_locked)
+        hidden = sum(int(p['hidden']) for p in players)
+        if hidden != seen_hidden:
+            seen.clear()
+            seen_hidden = hidden
+        if key in seen:
+            wrapper.repeats += 1
+            return solver(players, current_player_ix, play_card, deck_locked, **kwargs)
+        seen.add(key)
+
+        action = table.get(key)
+        if action is None:
+            action = solver(players, current_player_ix, play_card, deck_locked, **kwargs)
+            table.put(key, action)
+        return dict(action)
+
+    wrapper.table = table
+    wrapper.repeats = 0
+    return wrapper
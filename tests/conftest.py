@@ -1,11 +1,28 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 """
-    Dummy conftest.py for skyjo.
+    Shared fixtures for the skyjo tests.
 
-    If you don't know what this is for, just leave it empty.
     Read more about conftest.py under:
     https://pytest.org/latest/plugins.html
 """
 
-# import pytest
+import pytest
+import numpy as np
+from skyjo.reducer import compute_totals
+
+
+def _make_player(cards, hidden=()):
+    mask = np.ones((3, 4))
+    for pos in hidden:
+        mask[pos] = np.nan
+    cards = np.array(cards, dtype=float)
+    return {'name': 'Foobar', 'cards': cards, 'mask': mask, **compute_totals(cards, mask)}
+
+
+@pytest.fixture
+def make_player():
+    """
+    Returns a factory for a player dict with the given grid, all cards revealed except the positions in `hidden`.
+    """
+    return _make_player
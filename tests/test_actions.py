@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+from skyjo.actions import (
+    ActionCreator, EncodedActionCreator, encode_action, decode_action, action_index, index_action,
+    GIVE_INDEX, TAKE_INDEX, N_ACTIONS
+)
+
+
+class TestActions(object):
+
+    def test_encode_action(self):
+        for action in [ActionCreator.next_player(), ActionCreator.play_give(), ActionCreator.lock_deck(True),
+                       ActionCreator.play_take((2, 3)), ActionCreator.play_reject((1, 0)),
+                       ActionCreator.reset_game(), ActionCreator.open_game()]:
+            assert decode_action(encode_action(action)) == action
+        assert encode_action(ActionCreator.play_take(np.array([2, 3]))) == 0x2B
+        assert decode_action(encode_action(ActionCreator.add_player('Foo'))) == {'type': 'ADD_PLAYER', 'name': None}
+
+    def test_encoded_action_creator(self):
+        assert EncodedActionCreator.play_take(11) == encode_action(ActionCreator.play_take((2, 3)))
+        assert EncodedActionCreator.play_reject(4) == encode_action(ActionCreator.play_reject((1, 0)))
+        assert EncodedActionCreator.lock_deck(False) == encode_action(ActionCreator.lock_deck(False))
+        assert EncodedActionCreator.next_player() == encode_action(ActionCreator.next_player())
+
+    def test_unknown_opcode(self):
+        with pytest.raises(ValueError):
+            decode_action(0xF0)
+
+    def test_action_index(self):
+        assert action_index(ActionCreator.play_give()) == GIVE_INDEX
+        assert action_index(ActionCreator.play_take(np.array([0, 1]))) == TAKE_INDEX + 1
+        assert action_index(ActionCreator.play_reject((2, 3))) == N_ACTIONS - 1
+        for ix in range(N_ACTIONS):
+            assert action_index(index_action(ix)) == ix
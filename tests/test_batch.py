@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+from skyjo.exceptions import GameFinishException, DeckLockedException
+from skyjo.reducer import reducer, legal_actions, _create_initial_state, _player_maxscore_index
+from skyjo.actions import ActionCreator
+from skyjo.game import calculate_scores
+from skyjo.batch import (
+    create_batch_state, batch_reducer, batch_scores, batch_legal_actions, index_moves, batch_play, batch_simple_policy,
+    from_states, to_states,
+    DECK_COUNTS, NO_PLAYER, GIVE, TAKE, REJECT
+)
+
+
+def _opened_states(n_games, n_players):
+    states = []
+    for _ in range(n_games):
+        state = reducer(_create_initial_state(), ActionCreator.reset_game())
+        for p in range(n_players):
+            state = reducer(state, ActionCreator.add_player('Player {}'.format(p)))
+        states.append(reducer(state, ActionCreator.open_game()))
+    return states
+
+
+def _assert_states_equal(a, b):
+    assert a['deck'] == b['deck']
+    assert a['play_card'] == b['play_card']
+    assert a['current_player_ix'] == b['current_player_ix']
+    assert a['finish_player_ix'] == b['finish_player_ix']
+    assert a['deck_locked'] == b['deck_locked']
+    for pa, pb in zip(a['players'], b['players']):
+        np.testing.assert_array_equal(pa['cards'], pb['cards'])
+        np.testing.assert_array_equal(pa['mask'], pb['mask'])
+
+
+class TestBatch(object):
+
+    def test_create_batch_state(self):
+        state = create_batch_state(5, 3, rng=np.random.default_rng(0))
+
+        assert state['cards'].shape == (5, 3, 3, 4)
+        assert state['mask'].shape == (5, 3, 3, 4)
+        assert not state['mask'].any()
+        assert state['deck'].shape == (5, 15)
+        np.testing.assert_array_equal(state['deck'].sum(axis=1), 150 - 3 * 12)
+        for g in range(5):
+            dealt = np.bincount(state['cards'][g].ravel() + 2, minlength=15)
+            np.testing.assert_array_equal(dealt + state['deck'][g], DECK_COUNTS)
+
+    def test_draw_distribution(self):
+        state = create_batch_state(20000, 1, rng=np.random.default_rng(0))
+        freq = np.bincount(state['cards'][:, 0, 0, 0] + 2, minlength=15) / 20000
+        np.testing.assert_allclose(freq, DECK_COUNTS / 150, atol=0.01)
+
+    def test_open_game(self):
+        state = create_batch_state(50, 4, rng=np.random.default_rng(0))
+        state = batch_reducer(state, ActionCreator.open_game(), rng=np.random.default_rng(1))
+
+        np.testing.assert_array_equal(state['mask'].sum(axis=(2, 3)), 2)
+        np.testing.assert_array_equal(state['deck'].sum(axis=1), 150 - 4 * 12 - 1)
+        assert np.all(state['current_player_ix'] == state['initial_player_ix'])
+        for s in to_states(state):
+            assert s['initial_player_ix'] == _player_maxscore_index(s['players'])
+
+    def test_play_give_lock(self):
+        state = create_batch_state(3, 2, rng=np.random.default_rng(0))
+        state = batch_reducer(state, ActionCreator.open_game())
+        state = batch_reducer(state, {**ActionCreator.play_give(), 'games': np.array([True, False, True])})
+
+        np.testing.assert_array_equal(state['deck_locked'], [True, False, True])
+        with pytest.raises(DeckLockedException):
+            batch_reducer(state, ActionCreator.play_give())
+
+    def test_play_give_reshuffle(self):
+        state = create_batch_state(2, 2, rng=np.random.default_rng(0))
+        state = batch_reducer(state, ActionCreator.open_game(), rng=np.random.default_rng(0))
+        deck = state['deck'].copy()
+        play_card = state['play_card'][0]
+        state['deck'][0] = 0
+        state = batch_reducer(state, ActionCreator.play_give(), rng=np.random.default_rng(0))
+
+        assert state['deck'][0].sum() == 150 - 2 * 12 - 1 - 1
+        assert state['deck'][1].sum() == deck[1].sum() - 1
+        cards = np.bincount(state['cards'][0].ravel() + 2, minlength=15)
+        cards[state['play_card'][0] + 2] += 1
+        # the replaced play card stays on the discard pile
+        cards[play_card + 2] += 1
+        np.testing.assert_array_equal(state['deck'][0] + cards, DECK_COUNTS)
+
+    def test_matches_reducer(self):
+        np.random.seed(0)
+        states = _opened_states(8, 3)
+        batch = from_states(states)
+        finished = np.zeros(len(states), dtype=bool)
+        rng = np.random.default_rng(0)
+
+        while not finished.all():
+            pos = rng.integers(0, 12, size=len(states))
+            take = rng.random(len(states)) > .5
+            batch = batch_reducer(batch, {**ActionCreator.play_take(pos), 'games': take})
+            batch = batch_reducer(batch, {**ActionCreator.play_reject(pos), 'games': ~take})
+            batch = batch_reducer(batch, ActionCreator.next_player())
+            for g in np.flatnonzero(~finished):
+                action = ActionCreator.play_take if take[g] else ActionCreator.play_reject
+                state = reducer(states[g], action(divmod(pos[g], 4)))
+                try:
+                    states[g] = reducer(state, ActionCreator.next_player())
+                except GameFinishException:
+                    states[g] = state
+                    finished[g] = True
+            np.testing.assert_array_equal(batch['done'], finished)
+
+        for a, b in zip(states, to_states(batch)):
+            _assert_states_equal(a, b)
+        np.testing.assert_array_equal(
+            batch_scores(batch), [calculate_scores(s['players'], s['finish_player_ix']) for s in states])
+
+    def test_batch_scores(self):
+        state = create_batch_state(2, 2, rng=np.random.default_rng(0))
+        state['cards'][:] = 1
+        state['cards'][0, 1] = 2
+        state['finish_player_ix'][:] = [1, NO_PLAYER]
+
+        np.testing.assert_array_equal(batch_scores(state), [[12, 48], [12, 12]])
+
+    def test_batch_play(self):
+        rng = np.random.default_rng(0)
+        state = create_batch_state(200, 3, rng=rng)
+        state = batch_reducer(state, ActionCreator.open_game(), rng=rng)
+        state = batch_play(state, rng)
+
+        assert state['done'].all()
+        finish = state['finish_player_ix'].astype(int)
+        assert np.all(state['mask'][np.arange(200), finish].all(axis=(1, 2)))
+
+    def test_simple_policy(self):
+        state = create_batch_state(3, 2, rng=np.random.default_rng(0))
+        state['cards'][:] = 0
+        state['cards'][:, 0, 1, 1] = 9
+        state['mask'][:, 0, 1] = True
+        state['play_card'][:] = [1, 7, -1]
+        state['current_player_ix'][:] = 0
+        state['deck_locked'][:] = [False, False, True]
+        moves, pos = batch_simple_policy(state, np.arange(3), np.random.default_rng(0))
+
+        np.testing.assert_array_equal(moves, [TAKE, GIVE, TAKE])
+        assert pos[0] == 5
+        assert pos[2] in (4, 5, 6, 7)
+
+    def test_draw_keys(self):
+        state = create_batch_state(2, 2, rng=np.random.default_rng(0))
+        state['deck'][1] = state['deck'][0]
+        state = batch_reducer(state, ActionCreator.open_game(), rng=np.random.default_rng(0))
+        state['deck'][1] = state['deck'][0]
+        state['draw_keys'] = np.tile(np.random.default_rng(1).random(160), (2, 1))
+        state['draw_count'] = np.zeros(2, dtype=np.int16)
+        state['current_player_ix'][:] = 0
+
+        for _ in range(5):
+            state = batch_reducer(state, ActionCreator.play_give(), rng=np.random.default_rng())
+            assert state['play_card'][0] == state['play_card'][1]
+            state['deck_locked'][:] = False
+
+    def test_legal_actions(self):
+        np.random.seed(0)
+        states = _opened_states(4, 3)
+        states[1] = reducer(states[1], ActionCreator.play_give())
+        batch = from_states(states)
+        batch['done'][3] = True
+        legal = batch_legal_actions(batch)
+
+        for g in range(3):
+            np.testing.assert_array_equal(legal[g], legal_actions(states[g]))
+        assert not legal[3].any()
+        assert not batch_legal_actions(create_batch_state(2, 2)).any()
+
+    def test_index_moves(self):
+        moves, pos = index_moves([0, 1, 12, 13, 24])
+        np.testing.assert_array_equal(moves, [GIVE, TAKE, TAKE, REJECT, REJECT])
+        np.testing.assert_array_equal(pos, [0, 0, 11, 0, 11])
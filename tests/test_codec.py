@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import pytest
+import numpy as np
+from skyjo.actions import ActionCreator
+from skyjo.codec import encode_state, decode_state, state_to_json, state_from_json
+from skyjo.deck import DrawStream
+from skyjo.game import play_game
+from skyjo.NumpyEncoder import NumpyEncoder
+from skyjo.packed import pack_state
+from skyjo.reducer import reducer
+from skyjo.solver import simple_solver
+
+
+def _states(n_games=3):
+    states = []
+
+    def middleware(dispatch, state_func):
+        def next_func(next_handler):
+            def action_func(action):
+                val = next_handler(action)
+                states.append(state_func())
+                return val
+            return action_func
+        return next_func
+
+    rng = np.random.default_rng(0)
+    for i in range(n_games):
+        play_game([simple_solver] * (2 + i % 3), rng, middlewares=[middleware])
+    return states
+
+
+def _assert_equal(restored, state):
+    assert pack_state(restored) == pack_state(state)
+    for p, q in zip(restored['players'], state['players']):
+        assert p['name'] == q['name']
+        assert p['score'] == q['score']
+        assert p['hidden'] == q['hidden']
+        np.testing.assert_array_equal(p['col_sums'], q['col_sums'])
+
+
+class TestCodec(object):
+
+    def test_roundtrip(self):
+        for state in _states():
+            data = encode_state(state)
+            restored = decode_state(data)
+            _assert_equal(restored, state)
+            assert restored['rng'] == state['rng']
+            assert encode_state(restored) == data
+
+    def test_continue(self):
+        state = _states(1)[30]
+        restored = decode_state(encode_state(state))
+        assert not restored['players'][0]['cards'].flags.writeable
+
+        for action in (ActionCreator.play_give(), ActionCreator.play_reject((0, 0))):
+            state = reducer(state, action)
+            restored = reducer(restored, action)
+            _assert_equal(restored, state)
+
+    def test_without_rng(self):
+        state = reducer(reducer({}, ActionCreator.reset_game()), ActionCreator.add_player('Jörg'))
+        state = {**state, 'rng': None}
+        restored = decode_state(encode_state(state))
+        assert restored['rng'] is None
+        assert restored['play_card'] is None
+        assert restored['players'][0]['name'] == 'Jörg'
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            decode_state(b'SKYJOLOG' + bytes(64))
+        state = reducer({}, ActionCreator.reset_game())
+        with pytest.raises(ValueError):
+            encode_state({**state, 'rng': DrawStream(2 ** 64)})
+
+    def test_truncated(self):
+        data = encode_state(_states(1)[30])
+        for size in (0, 10, 60, len(data) - 1):
+            with pytest.raises(ValueError):
+                decode_state(data[:size])
+        with pytest.raises(ValueError):
+            decode_state(data + b'\0')
+
+    def test_json(self):
+        for state in _states(1):
+            text = state_to_json(state)
+            assert text == json.dumps(state, cls=NumpyEncoder)
+            restored = state_from_json(text)
+            _assert_equal(restored, state)
+            assert restored['deck'].size == state['deck'].size
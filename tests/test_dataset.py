@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import pytest
+import numpy as np
+from skyjo.actions import decode_action
+from skyjo.dataset import TrajectoryWriter, TrajectoryDataset, convert_log
+from skyjo.game import play_game, calculate_scores
+from skyjo.gamelog import GameLogWriter
+from skyjo.middleware import game_log_middleware, logger_middleware, logger
+from skyjo.packed import unpack_cards
+from skyjo.solver import simple_solver
+
+
+def _write_binary_log(path, n_games, rng):
+    states = []
+    with GameLogWriter(path) as writer:
+        for _ in range(n_games):
+            states.append(play_game([simple_solver] * 2, rng, middlewares=[game_log_middleware(writer)])[0])
+    return states
+
+
+class TestTrajectoryDataset(object):
+
+    def test_convert_binary_log(self, tmpdir):
+        log_path, path = str(tmpdir.join('games.log')), str(tmpdir.join('games.trj'))
+        states = _write_binary_log(log_path, 3, np.random.default_rng(0))
+        n = convert_log(log_path, path, chunk_size=16)
+        dataset = TrajectoryDataset(path)
+
+        assert len(dataset) == n > 0
+        assert dataset.n_players == 2
+        assert isinstance(dataset.records, np.memmap)
+        np.testing.assert_array_equal(np.unique(dataset.records['game']), [0, 1, 2])
+        for g, state in enumerate(states):
+            records = dataset.records[dataset.records['game'] == g]
+            scores = calculate_scores(state['players'], state['finish_player_ix'])
+            np.testing.assert_array_equal(records['score'], np.take(scores, records['player']))
+        assert decode_action(dataset[0]['action'])['type'] in ('PLAY_GIVE', 'PLAY_TAKE', 'PLAY_REJECT')
+
+    def test_convert_json_log(self, tmpdir):
+        log_path = str(tmpdir.join('game.log'))
+        handler = logging.FileHandler(log_path, mode='w')
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        level = logger.level
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        try:
+            play_game([simple_solver] * 2, np.random.default_rng(0), seed=5, middlewares=[logger_middleware])
+        finally:
+            logger.setLevel(level)
+            logger.removeHandler(handler)
+            handler.close()
+
+        binary_path = str(tmpdir.join('games.bin'))
+        with GameLogWriter(binary_path) as writer:
+            play_game([simple_solver] * 2, np.random.default_rng(0), seed=5, middlewares=[game_log_middleware(writer)])
+
+        convert_log(log_path, str(tmpdir.join('a.trj')))
+        convert_log(binary_path, str(tmpdir.join('b.trj')))
+        a = TrajectoryDataset(str(tmpdir.join('a.trj'))).records
+        b = TrajectoryDataset(str(tmpdir.join('b.trj'))).records
+        assert a.tobytes() == b.tobytes()
+
+    def test_shards(self, tmpdir):
+        path = str(tmpdir.join('games.trj'))
+        rng = np.random.default_rng(1)
+        with TrajectoryWriter(path, 2, chunk_size=7) as writer:
+            for _ in range(2):
+                state, _ = play_game([simple_solver] * 2, rng)
+                writer.write_game([], state)
+        assert len(TrajectoryDataset(path)) == 0
+
+        log_path = str(tmpdir.join('games.log'))
+        _write_binary_log(log_path, 2, rng)
+        convert_log(log_path, path, chunk_size=7)
+        dataset = TrajectoryDataset(path)
+        shards = [dataset.shard(i, 3) for i in range(3)]
+        assert sum(len(s) for s in shards) == len(dataset)
+        assert np.concatenate(shards).tobytes() == dataset.records.tobytes()
+        assert sum(len(c) for c in dataset.iter_chunks(5)) == len(dataset)
+        grid = unpack_cards(dataset[0]['cards'][0])
+        assert grid.shape == (3, 4)
+
+    def test_invalid_file(self, tmpdir):
+        path = tmpdir.join('games.trj')
+        path.write_binary(b'0' * 64)
+        with pytest.raises(ValueError):
+            TrajectoryDataset(str(path))
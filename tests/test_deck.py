@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from skyjo.deck import Deck, DrawStream, DECK_COUNTS
+
+
+class TestDeck(object):
+
+    def test_init(self):
+        deck = Deck()
+        assert deck.size == 150
+        assert len(deck) == 150
+        assert deck[-2] == 5
+        assert deck[0] == 15
+        assert deck[12] == 10
+
+    def test_copy(self):
+        deck = Deck()
+        copied = deck.copy()
+        copied.draw()
+
+        assert deck.size == 150
+        assert copied.size == 149
+        assert deck != copied
+
+    def test_draw(self):
+        deck = Deck()
+        card = deck.draw(np.random.default_rng(0))
+        assert -2 <= card <= 12
+        assert deck[card] == DECK_COUNTS[card + 2] - 1
+        assert deck.size == 149
+
+    def test_draw_exhausts_deck(self):
+        deck = Deck()
+        rng = np.random.default_rng(0)
+        cards = [deck.draw(rng) for _ in range(150)]
+
+        assert deck.size == 0
+        np.testing.assert_array_equal(np.bincount(np.array(cards) + 2), DECK_COUNTS)
+
+    def test_draw_distribution(self):
+        rng = np.random.default_rng(0)
+        cards = [Deck([0, 1] + [0] * 12 + [3]).draw(rng) for _ in range(4000)]
+        assert abs(np.mean(np.array(cards) == -1) - .25) < .03
+
+    def test_deal(self):
+        deck = Deck()
+        cards = deck.deal(12, np.random.default_rng(0))
+
+        assert cards.shape == (12,)
+        assert deck.size == 150 - 12
+        np.testing.assert_array_equal(np.bincount(cards + 2, minlength=15) + deck.counts, DECK_COUNTS)
+
+    def test_deal_legacy_random(self):
+        np.random.seed(0)
+        deck = Deck()
+        cards = deck.deal(12)
+
+        assert deck.size == 150 - 12
+        np.testing.assert_array_equal(np.bincount(cards + 2, minlength=15) + deck.counts, DECK_COUNTS)
+
+    def test_draw_stream(self):
+        stream = DrawStream(0)
+        # a stream does not change when drawing, and every draw depends only on the seed and its number
+        cards = [Deck().draw(stream) for _ in range(3)]
+        assert cards == [cards[0]] * 3
+        assert stream.next() == DrawStream(0, 1) and stream == DrawStream(0)
+
+        numbers = [DrawStream(0, n).random() for n in range(1000)]
+        assert len(set(numbers)) == 1000
+        assert abs(np.mean(numbers) - .5) < .03
+        assert DrawStream(1, 999).random() != numbers[999]
+        np.testing.assert_array_equal(DrawStream(0, 3).generator().random(4), DrawStream(0, 3).generator().random(4))
+
+    def test_to_dict(self):
+        deck = Deck().to_dict()
+        assert deck['_size'] == 150
+        assert deck[-2] == 5
+        assert deck[0] == 15
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import functools
+import numpy as np
+from skyjo.actions import ActionType
+from skyjo.endgame import EndgameSolver
+from skyjo.game import play_game
+from skyjo.middleware import tracker_middleware
+from skyjo.solver import simple_solver
+from skyjo.tracker import CardTracker
+
+
+class TestEndgameSolver(object):
+
+    def test_finish(self, make_player):
+        players = [make_player(np.zeros((3, 4)), hidden=[(2, 3)]), make_player(np.full((3, 4), 5))]
+        solver = EndgameSolver()
+        action = solver(players, 0, -2, True)
+        assert action['type'] == ActionType.PLAY_TAKE
+        assert tuple(action['pos']) == (2, 3)
+
+    def test_avoid_doubling(self, make_player):
+        cards = np.full((3, 4), 3)
+        cards[1, 2] = 9
+        players = [make_player(cards, hidden=[(0, 0)]), make_player(np.zeros((3, 4)))]
+        action = EndgameSolver()(players, 0, 2, True)
+        assert action['type'] == ActionType.PLAY_TAKE
+        assert tuple(action['pos']) == (1, 2)
+
+    def test_other_player_finished(self, make_player):
+        cards = np.array([4] * 7 + [3] * 5).reshape((3, 4))
+        players = [make_player(cards, hidden=[(2, 3)]), make_player(np.zeros((3, 4)))]
+        assert players[0]['score'] == 40
+        solver = EndgameSolver()
+        action = solver(players, 0, 0, True)
+
+        # the other player has finished, so revealing the last card ends the game with 40 points, not doubled
+        assert action['type'] == ActionType.PLAY_TAKE
+        assert tuple(action['pos']) == (2, 3)
+        assert solver.expected_score == 40
+
+    def test_expected_value(self, make_player):
+        # the other player is expected to end with 0 + 9.5 points
+        players = [make_player(np.zeros((3, 4)), hidden=[(2, 3)]), make_player(np.zeros((3, 4)), hidden=[(0, 0)])]
+        tracker = CardTracker()
+        tracker.unseen[:] = 0
+        tracker.unseen[[4, 14]] = [1, 3]  # one 2 and three 12s
+        solver = EndgameSolver()
+
+        action = solver(players, 0, 5, True, tracker=tracker)
+        take_visible = 5 + (2 + 3 * 12) / 4
+        # revealing a 12 finishes with more points than the other player, which doubles the score
+        reject = (2 + 3 * 2 * 12) / 4
+        take_hidden = 5
+        assert action['type'] == ActionType.PLAY_TAKE
+        assert tuple(action['pos']) == (2, 3)
+        assert solver.expected_score == min(take_visible, reject, take_hidden)
+
+        # drawing gives a 2 to finish with, or a 12 after which revealing the hidden card is best
+        action = solver(players, 0, 12, False, tracker=tracker)
+        give = (2 + 3 * (2 + 2 * 2 * 12) / 3) / 4
+        assert action['type'] == ActionType.PLAY_GIVE
+        assert solver.expected_score == give
+
+    def test_memoize(self, make_player):
+        players = [make_player(np.ones((3, 4)), hidden=[(0, 0), (0, 1)]), make_player(np.ones((3, 4)), hidden=[(0, 0)])]
+        solver = EndgameSolver()
+        first = solver(players, 0, 3, False)
+        nodes = solver.stats['nodes']
+        assert solver(players, 0, 3, False) == first
+        assert solver.stats['nodes'] == nodes
+        assert solver.stats['cache_hits'] == 1
+        assert solver.stats['searches'] == 2
+
+    def test_fallback(self, make_player):
+        players = [make_player(np.ones((3, 4)), hidden=[(0, 0), (0, 1), (0, 2)]), make_player(np.ones((3, 4)))]
+        solver = EndgameSolver(fallback=lambda *args, **kwargs: 'fallback')
+        assert solver(players, 0, 3, False) == 'fallback'
+
+        solver = EndgameSolver(max_hidden=3, max_turns=2, node_budget=10, fallback=simple_solver)
+        solver(players, 0, 3, False, rng=np.random.default_rng(0))
+        assert solver.stats['budget_exceeded'] == 1
+        assert solver.stats['fallbacks'] == 1
+        assert solver.expected_score is None
+        assert solver.stats['nodes'] == 11
+
+    def test_play_game(self):
+        endgame_solver = EndgameSolver()
+        rng = np.random.default_rng(0)
+        for _ in range(3):
+            tracker = CardTracker()
+            solver = functools.partial(endgame_solver, tracker=tracker)
+            state, _ = play_game([solver, solver], rng, middlewares=[tracker_middleware(tracker)])
+            assert state['finish_player_ix'] is not None
+        assert endgame_solver.stats['searches'] > 0
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+from skyjo.actions import GIVE_INDEX, REJECT_INDEX
+from skyjo.deck import DECK_COUNTS
+from skyjo.env import VectorEnv
+
+
+def _random_actions(legal, rng):
+    return np.where(legal, rng.random(legal.shape), -1).argmax(axis=1)
+
+
+class TestVectorEnv(object):
+
+    def test_reset(self):
+        env = VectorEnv(8, n_players=3)
+        obs, legal = env.reset(seed=0)
+
+        assert obs['cards'].shape == (8, 12)
+        assert obs['opponent_cards'].shape == (8, 2, 12)
+        assert np.all(env.state['current_player_ix'] == 0)
+        assert legal[:, GIVE_INDEX].all()
+        np.testing.assert_array_equal(legal[:, REJECT_INDEX:], ~obs['mask'])
+        np.testing.assert_array_equal(obs['cards'][~obs['mask']], 0)
+        # all hidden cards are unseen
+        hidden = 12 * 3 - obs['mask'].sum(axis=1) - obs['opponent_mask'].sum(axis=(1, 2))
+        np.testing.assert_array_equal(obs['deck'].sum(axis=1), DECK_COUNTS.sum() - 36 - 1 + hidden)
+
+    def test_reproducible(self):
+        a, b = VectorEnv(4), VectorEnv(4)
+        obs_a, _ = a.reset(seed=1)
+        obs_b, _ = b.reset(seed=1)
+        for key in obs_a:
+            np.testing.assert_array_equal(obs_a[key], obs_b[key])
+
+    def test_step(self):
+        env = VectorEnv(16)
+        obs, legal = env.reset(seed=0)
+        rng = np.random.default_rng(0)
+        finished = 0
+        for _ in range(300):
+            obs, rewards, dones, legal = env.step(_random_actions(legal, rng))
+            assert np.all(rewards[~dones] == 0)
+            assert np.all(env.state['current_player_ix'] == 0)
+            assert not env.state['done'].any()
+            scores = env.final_scores[dones]
+            np.testing.assert_array_equal(rewards[dones], scores[:, 1] - scores[:, 0])
+            finished += dones.sum()
+        assert finished > 0
+
+    def test_buffers(self):
+        env = VectorEnv(2)
+        obs, legal = env.reset(seed=0)
+        step_obs, rewards, dones, step_legal = env.step(np.full(2, GIVE_INDEX))
+
+        assert step_obs['cards'] is obs['cards']
+        assert step_legal is legal
+        assert env.state['deck_locked'].all()
+        assert not legal[:, GIVE_INDEX].any()
+
+    def test_illegal_action(self):
+        env = VectorEnv(2)
+        env.reset(seed=0)
+        env.step(np.full(2, GIVE_INDEX))
+        with pytest.raises(ValueError):
+            env.step(np.full(2, GIVE_INDEX))
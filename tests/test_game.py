@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from skyjo.game import calculate_scores, play_game, game_result, iter_results, replay_game
+from skyjo.solver import simple_solver
+
+
+class TestGame(object):
+
+    def test_calculate_scores(self):
+        players = [{'cards': np.ones((3, 4))}, {'cards': np.zeros((3, 4))}]
+        assert calculate_scores(players, 1) == [12, 0]
+        assert calculate_scores(players, 0) == [24, 0]
+
+    def test_play_game(self):
+        state, turns = play_game([simple_solver] * 3, np.random.default_rng(0))
+
+        assert state['finish_player_ix'] is not None
+        assert turns > 0
+        assert np.nansum(state['players'][state['finish_player_ix']]['mask']) == 12
+
+    def test_play_game_reproducible(self):
+        a, turns_a = play_game([simple_solver] * 2, np.random.default_rng(1))
+        b, turns_b = play_game([simple_solver] * 2, np.random.default_rng(1))
+
+        assert turns_a == turns_b
+        for pa, pb in zip(a['players'], b['players']):
+            np.testing.assert_array_equal(pa['cards'], pb['cards'])
+
+    def test_game_result(self):
+        state, turns = play_game([simple_solver] * 2, np.random.default_rng(0))
+        result = game_result(state, turns, game=3, seed=7)
+
+        assert result['game'] == 3
+        assert result['seed'] == 7
+        assert result['turns'] == turns
+        assert result['finisher'] == state['finish_player_ix']
+        assert result['winner'] == np.argmin(result['scores'])
+
+    def test_replay_game(self):
+        solvers = [simple_solver] * 3
+        for result in iter_results(solvers, 3, np.random.default_rng(0)):
+            state, turns = replay_game(solvers, result)
+            np.testing.assert_array_equal(game_result(state, turns, result['game'], result['seed'],
+                                                      result['solver_seed']), result)
+
+    def test_play_game_middleware(self):
+        actions = []
+
+        def recorder(dispatch, state_func):
+            def next_func(next_handler):
+                def action_func(action):
+                    actions.append(action['type'])
+                    return next_handler(action)
+                return action_func
+            return next_func
+
+        state, turns = play_game([simple_solver] * 2, np.random.default_rng(0), middlewares=[recorder])
+
+        assert actions[:4] == ['RESET_GAME', 'ADD_PLAYER', 'ADD_PLAYER', 'OPEN_GAME']
+        assert actions.count('NEXT_PLAYER') == turns
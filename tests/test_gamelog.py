@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+from skyjo.exceptions import ReplayMismatchException
+from skyjo.game import play_game
+from skyjo.actions import ActionCreator
+from skyjo.gamelog import GameLogWriter, read_game_log
+from skyjo.middleware import game_log_middleware
+from skyjo.packed import pack_state
+from skyjo.reducer import reducer
+from skyjo.solver import simple_solver
+from skyjo.store import apply_middleware, create_store
+
+
+def _log_games(path, n_games, checkpoint_every=16):
+    rng = np.random.default_rng(0)
+    states = []
+    with GameLogWriter(path, checkpoint_every=checkpoint_every) as writer:
+        middleware = game_log_middleware(writer)
+        for i in range(n_games):
+            state, _ = play_game([simple_solver] * (2 + i % 3), rng, middlewares=[middleware])
+            states.append(state)
+    return states
+
+
+class TestGameLog(object):
+
+    def test_replay(self, tmpdir):
+        path = str(tmpdir.join('games.log'))
+        states = _log_games(path, 3)
+        games = read_game_log(path)
+
+        assert len(games) == 3
+        for game, state in zip(games, states):
+            assert game.names == [p['name'] for p in state['players']]
+            assert pack_state(game.verify()) == pack_state(state)
+            assert pack_state(game.replay()) == pack_state(state)
+
+    def test_seek(self, tmpdir):
+        path = str(tmpdir.join('games.log'))
+        _log_games(path, 1, checkpoint_every=5)
+        game = read_game_log(path)[0]
+
+        assert len(game.checkpoints) == len(game) // 5 + 1
+        state = game.initial_state()
+        for n in range(len(game)):
+            assert pack_state(game.replay(n)) == pack_state(state)
+            state = game.replay(n + 1)
+        with pytest.raises(IndexError):
+            game.replay(len(game) + 1)
+
+    def test_mismatch(self, tmpdir):
+        path = str(tmpdir.join('games.log'))
+        _log_games(path, 1, checkpoint_every=5)
+        game = read_game_log(path)[0]
+        game.checkpoints = game.checkpoints.copy()
+        game.checkpoints[1]['deck'][0] += 1
+
+        with pytest.raises(ReplayMismatchException):
+            game.verify()
+
+    def test_long_names(self, tmpdir):
+        path = str(tmpdir.join('games.log'))
+        names = ['ä' * 200, 'b' * 1000]
+        with GameLogWriter(path) as writer:
+            store = apply_middleware(game_log_middleware(writer))(create_store)(reducer, {})
+            store.dispatch(ActionCreator.reset_game(0))
+            for name in names:
+                store.dispatch(ActionCreator.add_player(name))
+            store.dispatch(ActionCreator.open_game())
+
+        assert read_game_log(path)[0].names == names
+
+        with GameLogWriter(str(tmpdir.join('long.log'))) as writer:
+            store = apply_middleware(game_log_middleware(writer))(create_store)(reducer, {})
+            store.dispatch(ActionCreator.reset_game(0))
+            store.dispatch(ActionCreator.add_player('x' * 70000))
+            store.dispatch(ActionCreator.open_game())
+            with pytest.raises(ValueError):
+                writer.flush()
+
+    def test_invalid_file(self, tmpdir):
+        path = tmpdir.join('games.log')
+        path.write_binary(b'{"type": "RESET_GAME"}')
+        with pytest.raises(ValueError):
+            read_game_log(str(path))
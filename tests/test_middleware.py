@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import logging
+import threading
+import aioredux
+import pytest
+import numpy as np
+from skyjo.actions import ActionCreator, ActionType
+from skyjo.exceptions import DeckLockedException
+from skyjo.game import play_game
+from skyjo.middleware import (
+    LogWriter, Metrics, SpectatorFeed, metrics_middleware, queued_logger_middleware, spectator_middleware
+)
+from skyjo.reducer import reducer
+from skyjo.solver import simple_solver
+from skyjo.store import create_store, apply_middleware
+
+
+class _ListHandler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def _logger(name, level=logging.INFO):
+    log = logging.getLogger(name)
+    log.setLevel(level)
+    log.propagate = False
+    handler = _ListHandler()
+    log.handlers = [handler]
+    return log, handler
+
+
+class TestQueuedLoggerMiddleware(object):
+
+    def _play(self, writer, **kwargs):
+        store = apply_middleware(queued_logger_middleware(writer, **kwargs))(create_store)(reducer, {})
+        for seed in range(3):
+            store.dispatch(ActionCreator.reset_game(seed))
+            store.dispatch(ActionCreator.add_player('Foo'))
+
+    def test_log(self):
+        log, handler = _logger('test_log')
+        with LogWriter(log) as writer:
+            self._play(writer)
+
+        assert len(handler.messages) == 12
+        assert handler.messages[0] == 'ACTION: {"type": "RESET_GAME", "seed": 0}'
+        assert handler.messages[3].startswith('NEW STATE: {"rng": null, "players": [{"name": "Foo"')
+
+    def test_sampling(self):
+        log, handler = _logger('test_sampling')
+        with LogWriter(log) as writer:
+            self._play(writer, every_game=2, every_action=2)
+
+        assert len(handler.messages) == 4
+        assert handler.messages[0] == 'ACTION: {"type": "RESET_GAME", "seed": 0}'
+        assert handler.messages[1].startswith('NEW STATE: {"rng": null, "players": []')
+        assert handler.messages[2] == 'ACTION: {"type": "RESET_GAME", "seed": 2}'
+
+    def test_disabled(self):
+        log, handler = _logger('test_disabled', level=logging.WARNING)
+        with LogWriter(log) as writer:
+            self._play(writer)
+            assert writer._queue.empty()
+        assert handler.messages == []
+
+    def test_drop(self):
+        log, handler = _logger('test_drop')
+        logging_started, release = threading.Event(), threading.Event()
+        handler.emit = lambda record: logging_started.set() or release.wait()
+        writer = LogWriter(log, maxsize=1)
+        writer.submit('A', 1)
+        # the writer thread has taken the first record and blocks in the handler
+        logging_started.wait()
+        assert writer.submit('B', 2)
+        assert not writer.submit('C', 3)
+        assert writer.dropped == 1
+        release.set()
+        writer.close()
+
+    def test_error(self):
+        log, handler = _logger('test_error')
+        with LogWriter(log) as writer:
+            writer.submit('A', object())
+            writer.submit('B', 2)
+
+        assert writer.errors == 1
+        assert handler.messages == ['Could not log a A record.', 'B: 2']
+
+    def test_sampling_before_reset(self):
+        log, handler = _logger('test_sampling_before_reset')
+        with LogWriter(log) as writer:
+            store = apply_middleware(queued_logger_middleware(writer, every_game=2))(create_store)(reducer, {})
+            store.dispatch(ActionCreator.lock_deck(True))
+            store.dispatch(ActionCreator.reset_game(0))
+            store.dispatch(ActionCreator.reset_game(1))
+
+        assert handler.messages[0] == 'ACTION: {"type": "LOCK_DECK", "lock": true}'
+        assert len(handler.messages) == 4
+        assert handler.messages[2] == 'ACTION: {"type": "RESET_GAME", "seed": 1}'
+
+
+class TestMetricsMiddleware(object):
+
+    def test_play_game(self):
+        metrics = Metrics()
+        state, turns = play_game([simple_solver] * 2, np.random.default_rng(0),
+                                 middlewares=[metrics_middleware(metrics)])
+        snapshot = metrics.snapshot()
+        actions = snapshot['actions']
+
+        assert snapshot['games'] == 1
+        assert actions[ActionType.ADD_PLAYER]['count'] == 2
+        assert actions[ActionType.NEXT_PLAYER]['count'] == turns
+        assert actions[ActionType.NEXT_PLAYER]['exceptions']['GameFinishException'] == 1
+        assert actions[ActionType.PLAY_GIVE]['exceptions']['DeckLockedException'] == 0
+        # 24 cards dealt, one opening card and one per give
+        assert snapshot['draws'] == 25 + actions[ActionType.PLAY_GIVE]['count']
+        for data in actions.values():
+            assert sum(data['histogram']) == data['sampled'] == data['count']
+        json.loads(metrics.to_json())
+
+    def test_sampling(self):
+        metrics = Metrics(sample_every=4)
+        store = apply_middleware(metrics_middleware(metrics))(create_store)(reducer, {})
+        for _ in range(8):
+            store.dispatch(ActionCreator.lock_deck(True))
+
+        ix = metrics.index(ActionType.LOCK_DECK)
+        assert metrics.counts[ix] == 8
+        assert metrics.sampled[ix] == 2
+
+    def test_exception(self):
+        metrics = Metrics()
+        store = apply_middleware(metrics_middleware(metrics))(create_store)(reducer, {})
+        store.dispatch(ActionCreator.reset_game(0))
+        store.dispatch(ActionCreator.lock_deck(True))
+        with pytest.raises(DeckLockedException):
+            store.dispatch(ActionCreator.play_give())
+
+        assert metrics.snapshot()['actions'][ActionType.PLAY_GIVE]['exceptions']['DeckLockedException'] == 1
+
+    def test_aioredux(self):
+        metrics = Metrics()
+
+        async def go():
+            create = aioredux.apply_middleware(metrics_middleware(metrics))(aioredux.create_store)
+            store = await create(reducer, {})
+            await store.dispatch(ActionCreator.reset_game(0))
+            await store.dispatch(ActionCreator.add_player('Foo'))
+
+        asyncio.run(go())
+        assert metrics.draws == 12
+        assert metrics.sampled[metrics.index(ActionType.ADD_PLAYER)] == 1
+
+    def test_prometheus(self):
+        metrics = Metrics()
+        store = apply_middleware(metrics_middleware(metrics))(create_store)(reducer, {})
+        store.dispatch(ActionCreator.reset_game(0))
+        text = metrics.to_prometheus()
+
+        assert 'skyjo_actions_total{type="RESET_GAME"} 1\n' in text
+        assert 'skyjo_action_latency_seconds_bucket{type="RESET_GAME",le="+Inf"} 1\n' in text
+        assert 'skyjo_action_latency_seconds_count{type="RESET_GAME"} 1\n' in text
+        assert 'skyjo_games_total 1\n' in text
+
+
+class _Spectator(object):
+    """
+    Rebuilds the visible state of a game from a spectator feed.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.view = None
+
+    def write(self, data):
+        self.chunks.append(data)
+        message = json.loads(data)
+        if message.get('keyframe'):
+            self.view = {**message, 'players': [p['cards'] for p in message['players']]}
+            return
+        assert message['seq'] == self.view['seq'] + 1
+        self.view['seq'] = message['seq']
+        for player, pos, card in message.pop('cells', []):
+            self.view['players'][player][pos] = card
+        self.view.update(message)
+
+
+def _visible(state):
+    return {
+        'players': [[None if np.isnan(m) else int(c) for c, m in zip(p['cards'].ravel(), p['mask'].ravel())]
+                    for p in state['players']],
+        'play_card': int(state['play_card']),
+        'current': state['current_player_ix'],
+        'deck': state['deck'].size,
+        'finish': state['finish_player_ix'],
+    }
+
+
+class TestSpectatorMiddleware(object):
+
+    def test_play_game(self):
+        feed = SpectatorFeed(keyframe_every=16)
+        spectator = _Spectator()
+        feed.subscribe(spectator)
+        state, turns = play_game([simple_solver] * 3, np.random.default_rng(0),
+                                 middlewares=[spectator_middleware(feed)])
+
+        late = _Spectator()
+        feed.subscribe(late)
+        for view in (spectator.view, late.view):
+            assert {k: v for k, v in view.items() if k not in ('seq', 'keyframe')} == _visible(state)
+        assert late.chunks[-1] is spectator.chunks[-1]
+        assert len(late.chunks) <= 17
+        assert feed.bytes_encoded == sum(map(len, spectator.chunks))
+
+    def test_delta(self):
+        feed = SpectatorFeed()
+        store = apply_middleware(spectator_middleware(feed))(create_store)(reducer, {})
+        store.dispatch(ActionCreator.reset_game(0))
+        store.dispatch(ActionCreator.add_player('Foo'))
+        store.dispatch(ActionCreator.add_player('Bar'))
+        store.dispatch(ActionCreator.open_game())
+        store.dispatch(ActionCreator.play_give())
+        spectator = _Spectator()
+        feed.subscribe(spectator)
+
+        state = store.state
+        player = state['current_player_ix']
+        row, col = np.argwhere(np.isnan(state['players'][player]['mask']))[0]
+        store.dispatch(ActionCreator.play_take((row, col)))
+        delta = json.loads(spectator.chunks[-1])
+        assert delta == {
+            'seq': 6,
+            'cells': [[player, int(row * 4 + col), int(state['play_card'])]],
+            'play_card': int(state['players'][player]['cards'][row, col]),
+        }
+
+    def test_aioredux(self):
+        feed = SpectatorFeed()
+        spectator = _Spectator()
+        feed.subscribe(spectator)
+
+        async def go():
+            create = aioredux.apply_middleware(spectator_middleware(feed))(aioredux.create_store)
+            store = await create(reducer, {})
+            await store.dispatch(ActionCreator.reset_game(0))
+            await store.dispatch(ActionCreator.add_player('Foo'))
+            await store.dispatch(ActionCreator.add_player('Bar'))
+            await store.dispatch(ActionCreator.open_game())
+            return store.state
+
+        state = asyncio.run(go())
+        assert {k: v for k, v in spectator.view.items() if k not in ('seq', 'keyframe')} == _visible(state)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from skyjo.actions import ActionCreator
+from skyjo.game import play_game
+from skyjo.packed import (
+    HIDDEN, pack_cards, unpack_cards, pack_mask, unpack_mask, pack_state, unpack_state,
+    any_revealed_greater, complete_columns, equal_columns
+)
+from skyjo.reducer import reducer
+from skyjo.solver import simple_solver
+
+
+def _grid():
+    cards = np.arange(-2, 10).reshape((3, 4))
+    cards[:, 3] = 12
+    mask = np.ones((3, 4)) * np.nan
+    mask[:, 3] = 1
+    mask[:, 0] = 1
+    mask[0, 1] = 1
+    return cards, mask
+
+
+class TestPacked(object):
+
+    def test_cards_roundtrip(self):
+        cards, _ = _grid()
+        packed = pack_cards(cards)
+
+        assert isinstance(packed, int)
+        assert packed < 2 ** 48
+        np.testing.assert_array_equal(unpack_cards(packed), cards)
+
+    def test_visible_cards(self):
+        cards, mask = _grid()
+        unpacked = unpack_cards(pack_cards(cards, mask))
+
+        assert unpacked[1, 1] == HIDDEN - 2
+        assert unpacked[0, 1] == cards[0, 1]
+
+    def test_mask_roundtrip(self):
+        _, mask = _grid()
+        packed = pack_mask(mask)
+
+        assert packed == 0b100110011011
+        np.testing.assert_array_equal(unpack_mask(packed), mask)
+        assert pack_mask(mask == 1) == packed
+
+    def test_vectorized(self):
+        cards = np.random.default_rng(0).integers(-2, 13, size=(5, 3, 3, 4))
+        packed = pack_cards(cards)
+
+        assert packed.shape == (5, 3)
+        np.testing.assert_array_equal(unpack_cards(packed), cards)
+
+    def test_state_roundtrip(self):
+        state, _ = play_game([simple_solver] * 3, np.random.default_rng(0))
+        key = pack_state(state)
+        restored = unpack_state(key, names=[p['name'] for p in state['players']])
+
+        assert hash(key) == hash(pack_state(restored))
+        assert restored['deck'] == state['deck']
+        for a, b in zip(state['players'], restored['players']):
+            np.testing.assert_array_equal(a['cards'], b['cards'])
+            np.testing.assert_array_equal(a['mask'], b['mask'])
+            assert a['score'] == b['score']
+            assert a['hidden'] == b['hidden']
+        for k in ('play_card', 'initial_player_ix', 'finish_player_ix', 'current_player_ix', 'deck_locked'):
+            assert restored[k] == state[k]
+
+    def test_state_key_changes(self):
+        state = reducer({}, ActionCreator.reset_game(0))
+        state = reducer(state, ActionCreator.add_player('Foo'))
+        state = reducer(state, ActionCreator.open_game())
+        key = pack_state(state)
+
+        assert pack_state(reducer(state, ActionCreator.lock_deck(True))) != key
+        assert pack_state(reducer(state, ActionCreator.lock_deck(False))) == key
+
+    def test_any_revealed_greater(self):
+        cards, mask = _grid()
+        assert any_revealed_greater(pack_cards(cards), pack_mask(mask), 11)
+        assert not any_revealed_greater(pack_cards(cards), pack_mask(mask), 12)
+        mask[:, 3] = np.nan
+        np.testing.assert_array_equal(
+            any_revealed_greater(np.array([pack_cards(cards)] * 2), np.array([pack_mask(mask)] * 2), 6), [False, False])
+
+    def test_columns(self):
+        cards, mask = _grid()
+        np.testing.assert_array_equal(complete_columns(pack_mask(mask)), [True, False, False, True])
+        np.testing.assert_array_equal(equal_columns(pack_cards(cards), pack_mask(mask)), [False, False, False, True])
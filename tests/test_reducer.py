@@ -5,8 +5,15 @@ import pytest
 import copy
 import numpy as np
 from skyjo.exceptions import GameFinishException, DeckLockedException
-from skyjo.reducer import reducer, _create_initial_state, _generate_deck, _give_card, _drop_filled_rows
-from skyjo.actions import ActionCreator
+from skyjo.reducer import (
+    reducer, encoded_reducer, legal_actions, _create_initial_state, _generate_deck, _give_card, _drop_filled_rows,
+    compute_totals, _check_totals, _reshuffle_deck
+)
+from skyjo.actions import ActionCreator, EncodedActionCreator, encode_action, GIVE_INDEX, TAKE_INDEX, REJECT_INDEX
+from skyjo.deck import Deck, DECK_COUNTS
+from skyjo.packed import pack_state
+from skyjo.game import play_game
+from skyjo.solver import simple_solver
 
 
 class TestReducer(object):
@@ -14,7 +21,7 @@ class TestReducer(object):
     def test_generate_deck(self):
         deck = _generate_deck()
 
-        assert deck['_size'] == 150
+        assert deck.size == 150
         assert deck[-2] == 5
         assert deck[-1] == 10
         assert deck[0] == 15
@@ -25,7 +32,7 @@ class TestReducer(object):
         deck = _generate_deck()
         original_deck = copy.copy(deck)
         card = _give_card(deck)
-        assert deck['_size'] == 149
+        assert deck.size == 149
         assert deck[card] == original_deck[card] - 1
 
     def test_drop_filled_rows_failure(self):
@@ -99,7 +106,7 @@ class TestReducer(object):
         assert player0['cards'].shape == (3,4)
         assert np.nansum(player0['mask']) == 0
         assert player0['name'] == 'Foobar'
-        assert state['deck']['_size'] == 150 - 12
+        assert state['deck'].size == 150 - 12
 
     def test_play_give(self):
         state = _create_initial_state()
@@ -108,7 +115,7 @@ class TestReducer(object):
         state = reducer(state, action)
 
         assert not np.isnan(state['play_card'])
-        assert state['deck']['_size'] == 149
+        assert state['deck'].size == 149
         assert state['deck_locked'] is True
 
     def test_play_give_lock(self):
@@ -120,6 +127,34 @@ class TestReducer(object):
         with pytest.raises(DeckLockedException):
             reducer(state, action)
 
+    def _opened_state(self):
+        state = reducer(_create_initial_state(), ActionCreator.reset_game(0))
+        state = reducer(state, ActionCreator.add_player('Foobar0'))
+        state = reducer(state, ActionCreator.add_player('Foobar1'))
+        return reducer(state, ActionCreator.open_game())
+
+    def test_reshuffle_deck(self):
+        state = self._opened_state()
+        deck = _reshuffle_deck(state)
+
+        # all cards but the grids and the play card are in the discard pile
+        in_play = np.bincount(np.array([p['cards'] for p in state['players']]).ravel() + 2, minlength=15)
+        in_play[state['play_card'] + 2] += 1
+        np.testing.assert_array_equal(deck.counts, DECK_COUNTS - in_play)
+        assert deck.size == 150 - 2 * 12 - 1
+
+    def test_play_give_reshuffle(self):
+        state = {**self._opened_state(), 'deck': Deck(np.zeros(15))}
+        play_card = state['play_card']
+        new_state = reducer(state, ActionCreator.play_give())
+
+        assert new_state['deck'].size == 150 - 2 * 12 - 1 - 1
+        assert state['deck'].size == 0
+        counts = new_state['deck'].counts.copy()
+        counts[new_state['play_card'] + 2] += 1
+        np.testing.assert_array_equal(counts, _reshuffle_deck(state).counts)
+        assert counts[play_card + 2] < DECK_COUNTS[play_card + 2]
+
     def test_play_take(self):
         state = _create_initial_state()
         action = ActionCreator.add_player('Foobar')
@@ -128,6 +163,7 @@ class TestReducer(object):
         state['play_card'] = 10
         state['current_player_ix'] = 0
         state['players'][0]['cards'] = np.ones((3,4))
+        state['players'][0].update(compute_totals(state['players'][0]['cards'], state['players'][0]['mask']))
         state['deck_locked'] = True  # not strictly necessary, but could be the case
 
         action = ActionCreator.play_take((0,0))
@@ -137,6 +173,9 @@ class TestReducer(object):
         assert state['players'][0]['cards'][0,0] == 10
         assert state['players'][0]['mask'][0,0] == 1
         assert np.nansum(state['players'][0]['mask']) == 1
+        assert state['players'][0]['score'] == 10
+        assert state['players'][0]['hidden'] == 11
+        np.testing.assert_array_equal(state['players'][0]['col_sums'], [10, 0, 0, 0])
         assert state['finish_player_ix'] is None
         assert state['deck_locked'] is False
 
@@ -150,6 +189,7 @@ class TestReducer(object):
         state['players'][0]['cards'] = np.ones((3,4))
         state['players'][0]['mask'] = np.ones((3,4))
         state['players'][0]['mask'][0,0] = np.nan
+        state['players'][0].update(compute_totals(state['players'][0]['cards'], state['players'][0]['mask']))
 
         action = ActionCreator.play_take((0,0))
         state = reducer(state, action)
@@ -164,6 +204,7 @@ class TestReducer(object):
         state['play_card'] = 10
         state['current_player_ix'] = 0
         state['players'][0]['cards'] = np.ones((3,4))
+        state['players'][0].update(compute_totals(state['players'][0]['cards'], state['players'][0]['mask']))
         state['deck_locked'] = True  # not strictly necessary, but could be the case
 
         action = ActionCreator.play_reject((0,0))
@@ -186,6 +227,7 @@ class TestReducer(object):
         state['players'][0]['cards'] = np.ones((3,4))
         state['players'][0]['mask'] = np.ones((3,4))
         state['players'][0]['mask'][0,0] = np.nan
+        state['players'][0].update(compute_totals(state['players'][0]['cards'], state['players'][0]['mask']))
 
         action = ActionCreator.play_reject((0,0))
         state = reducer(state, action)
@@ -207,3 +249,63 @@ class TestReducer(object):
         assert not np.isnan(state['initial_player_ix'])
         assert state['initial_player_ix'] == state['current_player_ix']
         assert state['play_card'] is not None
+        for player in state['players']:
+            _check_totals(player)
+
+    def test_encoded_reducer(self):
+        state = reducer({}, ActionCreator.reset_game(3))
+        encoded = reducer({}, ActionCreator.reset_game(3))
+        actions = [ActionCreator.add_player('Player 0'), ActionCreator.add_player('Player 1'),
+                   ActionCreator.open_game(), ActionCreator.play_give(), ActionCreator.play_take((1, 2)),
+                   ActionCreator.next_player(), ActionCreator.lock_deck(True), ActionCreator.play_reject((2, 0))]
+        for action in actions:
+            state = reducer(state, action)
+            encoded = encoded_reducer(encoded, encode_action(action))
+            assert pack_state(encoded) == pack_state(state)
+        assert [p['name'] for p in encoded['players']] == ['Player 0', 'Player 1']
+
+        locked = encoded_reducer(encoded, EncodedActionCreator.lock_deck(True))
+        with pytest.raises(DeckLockedException):
+            encoded_reducer(locked, EncodedActionCreator.play_give())
+        assert encoded_reducer(encoded, 0xF0) is encoded
+
+    def test_legal_actions(self):
+        state = reducer({}, ActionCreator.reset_game(0))
+        state = reducer(state, ActionCreator.add_player('Foo'))
+        assert not legal_actions(state).any()
+
+        state = reducer(state, ActionCreator.open_game())
+        legal = legal_actions(state)
+        assert legal[GIVE_INDEX]
+        assert legal[TAKE_INDEX:REJECT_INDEX].all()
+        assert legal[REJECT_INDEX:].sum() == 10
+        np.testing.assert_array_equal(legal[REJECT_INDEX:], np.isnan(state['players'][0]['mask']).ravel())
+
+        state = reducer(state, ActionCreator.play_give())
+        assert not legal_actions(state)[GIVE_INDEX]
+
+    def test_structural_sharing(self):
+        state = reducer(_create_initial_state(), ActionCreator.reset_game(0))
+        state = reducer(state, ActionCreator.add_player('Foobar0'))
+        state = reducer(state, ActionCreator.add_player('Foobar1'))
+        state = reducer(state, ActionCreator.open_game())
+        ix = state['current_player_ix']
+        player = state['players'][ix]
+        mask = player['mask'].copy()
+
+        new_state = reducer(state, ActionCreator.play_reject(np.argwhere(np.isnan(mask))[0]))
+
+        # the previous state is left untouched and unchanged players are shared
+        np.testing.assert_array_equal(state['players'][ix]['mask'], mask)
+        assert state['players'][ix] is player
+        assert new_state['players'][1 - ix] is state['players'][1 - ix]
+        assert new_state['players'][ix]['cards'] is player['cards']
+        with pytest.raises(ValueError):
+            new_state['players'][ix]['mask'][0, 0] = 1
+
+    def test_running_totals_debug(self, monkeypatch):
+        monkeypatch.setattr('skyjo.reducer.DEBUG', True)
+        state, _ = play_game([simple_solver] * 4, np.random.default_rng(0))
+
+        for player in state['players']:
+            _check_totals(player)
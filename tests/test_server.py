@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import numpy as np
+from skyjo.actions import EncodedActionCreator, GIVE_INDEX, REJECT_INDEX
+from skyjo.server import GameServer
+
+
+def _legal(reply):
+    bits = int(reply.split()[2], 16)
+    return np.array([bits >> i & 1 for i in range(25)], dtype=bool)
+
+
+class _Writer:
+
+    def __init__(self, buffered=0):
+        self.transport = self
+        self.buffered = buffered
+        self.data = []
+        self.closed = False
+
+    def get_write_buffer_size(self):
+        return self.buffered
+
+    def is_closing(self):
+        return self.closed
+
+    def write(self, data):
+        self.data.append(data)
+
+    def close(self):
+        self.closed = True
+
+
+class TestGameServer(object):
+
+    def test_handle_line(self):
+        server = GameServer()
+        reply = server.handle_line('CREATE t1 2 7')
+        assert reply.startswith('OK t1 ')
+        legal = _legal(reply)
+        assert legal[GIVE_INDEX]
+
+        assert server.handle_line('CREATE t1 2') == 'ERR t1 table exists\n'
+        assert server.handle_line('ACTION t2 16') == 'ERR t2 unknown table\n'
+        assert server.handle_line('ACTION t1 {}'.format(EncodedActionCreator.next_player())) == \
+            'ERR t1 illegal action\n'
+
+        legal = _legal(server.handle_line('ACTION t1 {}'.format(EncodedActionCreator.play_give())))
+        assert not legal[GIVE_INDEX]
+        pos = int(np.flatnonzero(legal[REJECT_INDEX:])[0])
+        state = server.tables['t1'].store.state
+        current = state['current_player_ix']
+        server.handle_line('ACTION t1 {}'.format(EncodedActionCreator.play_reject(pos)))
+        assert server.tables['t1'].store.state['current_player_ix'] == (current + 1) % 2
+
+        data = json.loads(server.handle_line('STATE t1').split(' ', 2)[2])
+        assert len(data['players']) == 2
+        assert server.handle_line('CLOSE t1') == 'OK t1\n'
+        assert 't1' not in server.tables
+
+    def test_lagging_subscriber(self):
+        server = GameServer(max_buffer=100)
+        server.handle_line('CREATE t 2 7')
+        fast, slow = _Writer(), _Writer(buffered=101)
+        server.handle_line('JOIN t', fast)
+        server.handle_line('JOIN t', slow)
+        server.handle_line('ACTION t {}'.format(EncodedActionCreator.play_give()))
+
+        assert fast.data == ['UPDATE t 1 {}\n'.format(EncodedActionCreator.play_give()).encode()]
+        assert slow.data == [] and slow.closed
+        assert server.tables['t'].subscribers == {fast}
+        assert server.lagging == 1
+
+    def test_invalid_encoding(self, tmpdir):
+        path = str(tmpdir.join('skyjo.sock'))
+
+        async def go():
+            server = await GameServer().serve_unix(path)
+            async with server:
+                reader, writer = await asyncio.open_unix_connection(path)
+                writer.write(b'CREATE \xff 2\nCREATE t 2\n')
+                replies = [(await reader.readline()).decode() for _ in range(2)]
+                writer.close()
+                return replies
+
+        replies = asyncio.run(go())
+        assert replies[0] == 'ERR - invalid encoding\n'
+        assert replies[1].startswith('OK t ')
+
+    def test_play_over_socket(self, tmpdir):
+        path = str(tmpdir.join('skyjo.sock'))
+
+        async def go():
+            game_server = GameServer()
+            server = await game_server.serve_unix(path)
+            async with server:
+                reader, writer = await asyncio.open_unix_connection(path)
+                spectator_reader, spectator_writer = await asyncio.open_unix_connection(path)
+
+                writer.write(b'CREATE t 2 3\n')
+                legal = _legal((await reader.readline()).decode())
+                spectator_writer.write(b'JOIN t\n')
+                await spectator_reader.readline()
+
+                rng = np.random.default_rng(0)
+                actions = 0
+                while legal.any():
+                    ix = rng.choice(np.flatnonzero(legal))
+                    code = EncodedActionCreator.play_give() if ix == GIVE_INDEX else \
+                        EncodedActionCreator.play_take(ix - 1) if ix < REJECT_INDEX else \
+                        EncodedActionCreator.play_reject(ix - REJECT_INDEX)
+                    writer.write('ACTION t {}\n'.format(code).encode())
+                    legal = _legal((await reader.readline()).decode())
+                    actions += 1
+
+                updates = [(await spectator_reader.readline()).decode() for _ in range(actions + 1)]
+                writer.close()
+                spectator_writer.close()
+                return updates, game_server.tables['t'].scores
+
+        updates, scores = asyncio.run(go())
+        assert updates[0].startswith('UPDATE t 1 ')
+        assert updates[-1] == 'END t {}\n'.format(','.join(str(int(s)) for s in scores))
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+import numpy as np
+from skyjo.actions import ActionCreator, ActionType
+from skyjo.deck import DECK_COUNTS
+from skyjo.reducer import reducer
+from skyjo.solver import simple_solver, rollout_solver, _determinize
+
+
+class TestSimpleSolver(object):
+
+    def test_play_give(self, make_player):
+        players = [make_player(np.ones((3, 4)), hidden=[(0, 0)]), make_player(np.ones((3, 4)))]
+        action = simple_solver(players, 0, 10, False, rng=np.random.default_rng(0))
+        assert action['type'] == ActionType.PLAY_GIVE
+
+    def test_play_take_larger(self, make_player):
+        cards = np.zeros((3, 4))
+        cards[1, 2] = 9
+        players = [make_player(cards, hidden=[(0, 0)]), make_player(np.ones((3, 4)))]
+        action = simple_solver(players, 0, 3, True, rng=np.random.default_rng(0))
+        assert action['type'] == ActionType.PLAY_TAKE
+        assert tuple(action['pos']) == (1, 2)
+
+    def test_avoid_finishing(self, make_player):
+        cards = np.zeros((3, 4))
+        cards[2, 3] = 1
+        players = [make_player(cards, hidden=[(0, 0)]), make_player(np.zeros((3, 4)))]
+        action = simple_solver(players, 0, 2, True, rng=np.random.default_rng(0))
+        assert action['type'] == ActionType.PLAY_TAKE
+        assert tuple(action['pos']) == (2, 3)
+
+
+class TestRolloutSolver(object):
+
+    def test_determinize(self, make_player):
+        cards = np.arange(12).reshape((3, 4))
+        players = [make_player(cards, hidden=[(0, 0), (1, 1)]), make_player(cards[::-1], hidden=[(2, 2)])]
+        state = _determinize(players, 0, 5, False, 10, np.random.default_rng(0))
+
+        assert state['mask'].sum(axis=(1, 2, 3)).tolist() == [21] * 10
+        np.testing.assert_array_equal(state['cards'][:, 0, 2, 3], 11)
+        np.testing.assert_array_equal(state['play_card'], 5)
+        # every sample uses each of the 150 cards exactly once, except for the discard pile
+        dealt = np.array([np.bincount(c.ravel() + 2, minlength=15) for c in state['cards']])
+        np.testing.assert_array_equal(dealt + state['deck'] + np.eye(15, dtype=int)[7], [DECK_COUNTS] * 10)
+
+    def test_obvious_move(self, make_player):
+        cards = np.zeros((3, 4))
+        cards[1, 2] = 12
+        players = [make_player(cards, hidden=[(0, 0), (0, 1)]),
+                   make_player(np.ones((3, 4)), hidden=[(0, 0), (0, 1)])]
+        action = rollout_solver(players, 0, -2, True, rng=np.random.default_rng(0), rollouts=64)
+
+        assert action['type'] == ActionType.PLAY_TAKE
+        assert tuple(action['pos']) == (1, 2)
+
+    def test_time_limit(self):
+        state = reducer({}, ActionCreator.reset_game(0))
+        for ix in range(4):
+            state = reducer(state, ActionCreator.add_player('Player {}'.format(ix)))
+        state = reducer(state, ActionCreator.open_game())
+        # a single round of the default batch size takes more than a second in this opening
+        start = time.perf_counter()
+        action = rollout_solver(state['players'], state['current_player_ix'], state['play_card'],
+                                state['deck_locked'], rng=np.random.default_rng(0), time_limit=.2)
+
+        assert time.perf_counter() - start < .3
+        assert action['type'] in (ActionType.PLAY_GIVE, ActionType.PLAY_TAKE, ActionType.PLAY_REJECT)
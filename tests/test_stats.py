@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import numpy as np
+from skyjo.game import iter_results, result_dtype
+from skyjo.solver import simple_solver
+from skyjo.stats import (
+    WinRate, ScoreMoments, DoubledRate, PairedDifference, aggregate, score_histogram, turn_histogram
+)
+from skyjo.tournament import run_tournament
+
+
+def _records(scores, winners):
+    records = np.zeros(len(scores), dtype=result_dtype(2))
+    records['scores'] = scores
+    records['winner'] = winners
+    return records
+
+
+class TestStats(object):
+
+    def test_win_rate(self):
+        win_rate = WinRate(3, solvers=['simple', 'simple', 'other'])
+        win_rate.update(_records([[0, 0]] * 4, [0, 1, 1, 2])[0])
+        win_rate.update(_records([[0, 0]] * 3, [1, 1, 2]))
+
+        assert win_rate.summary() == {
+            'games': 4, 'seats': [.25, .5, .25], 'solvers': {'simple': .75, 'other': .25}
+        }
+
+    def test_score_moments(self):
+        scores = np.random.default_rng(0).integers(-20, 100, size=(1000, 2))
+        moments = ScoreMoments(2)
+        for chunk in np.array_split(_records(scores, 0), 7):
+            moments.update(chunk)
+        moments.update(_records(scores[:0], 0))
+
+        assert moments.count == 1000
+        np.testing.assert_allclose(moments.mean, scores.mean(axis=0))
+        np.testing.assert_allclose(moments.variance, scores.var(axis=0, ddof=1))
+
+    def test_paired_difference(self):
+        differences = np.random.default_rng(0).normal(1, 2, size=1000)
+        paired = PairedDifference(confidence=.9)
+        for chunk in np.array_split(differences, 3):
+            paired.update(chunk)
+
+        summary = paired.summary()
+        assert summary['count'] == 1000
+        assert np.isclose(summary['mean'], differences.mean())
+        assert np.isclose(summary['variance'], differences.var(ddof=1))
+        lo, hi = summary['interval']
+        assert np.isclose(hi - lo, 2 * 1.6448536 * differences.std(ddof=1) / 1000 ** .5)
+        json.dumps(summary)
+
+    def test_histogram(self):
+        histogram = score_histogram()
+        histogram.update(_records([[-48, 0], [300, 5]], 0))
+
+        assert histogram.counts.sum() == 4
+        assert histogram.counts[0] == 1
+        assert histogram.counts[-1] == 1
+        assert histogram.counts[48] == 1
+        assert histogram.counts[53] == 1
+
+    def test_aggregate(self, tmpdir):
+        path = str(tmpdir.join('snapshot.json'))
+        results = iter_results([simple_solver] * 2, 20, np.random.default_rng(0))
+        aggregators = aggregate(results, [WinRate(2), ScoreMoments(2), DoubledRate(), turn_histogram()],
+                                snapshot_path=path, snapshot_every=5)
+
+        with open(path) as f:
+            snapshot = json.load(f)
+        assert snapshot['win_rate']['games'] == 20
+        assert snapshot['scores']['count'] == 20
+        assert sum(snapshot['turns_histogram']['counts']) == 20
+        assert 0 <= snapshot['doubled']['rate'] <= 1
+        assert aggregators[0].wins.sum() == 20
+
+    def test_aggregate_tournament(self):
+        doubled = DoubledRate()
+        aggregate(run_tournament(10, workers=1, chunk_size=3), [doubled])
+        assert doubled.games == 10
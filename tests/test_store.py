@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+from skyjo.actions import ActionCreator
+from skyjo.reducer import reducer
+from skyjo.store import create_store, create_history_store, apply_middleware
+
+
+def _counter(state, action):
+    if action['type'] == 'INCREMENT':
+        return state + 1
+    return state
+
+
+class TestStore(object):
+
+    def test_dispatch(self):
+        store = create_store(_counter, 0)
+        action = store.dispatch({'type': 'INCREMENT'})
+
+        assert action == {'type': 'INCREMENT'}
+        assert store.state == 1
+
+    def test_subscribe(self):
+        store = create_store(_counter, 0)
+        calls = []
+        unsubscribe = store.subscribe(lambda: calls.append(store.state))
+
+        store.dispatch({'type': 'INCREMENT'})
+        store.dispatch({'type': 'NOOP'})
+        unsubscribe()
+        store.dispatch({'type': 'INCREMENT'})
+
+        assert calls == [1]
+
+    def test_reducer_may_not_dispatch(self):
+        store = None
+
+        def reducer(state, action):
+            if action['type'] == 'NESTED':
+                store.dispatch({'type': 'INCREMENT'})
+            return state
+
+        store = create_store(reducer, 0)
+        with pytest.raises(RuntimeError):
+            store.dispatch({'type': 'NESTED'})
+
+    def test_apply_middleware(self):
+        calls = []
+
+        def middleware(name):
+            def wrapper(dispatch, state_func):
+                def next_func(next_handler):
+                    def action_func(action):
+                        calls.append((name, action['type'], state_func()))
+                        return next_handler(action)
+                    return action_func
+                return next_func
+            return wrapper
+
+        store = apply_middleware(middleware('a'), middleware('b'))(create_store)(_counter, 0)
+        store.dispatch({'type': 'INCREMENT'})
+
+        assert store.state == 1
+        assert calls == [('a', 'INCREMENT', 0), ('b', 'INCREMENT', 0)]
+
+    def test_history_store(self):
+        store = create_history_store(_counter, 0)
+        store.dispatch({'type': 'INCREMENT'})
+        store.dispatch({'type': 'NOOP'})
+        store.dispatch({'type': 'INCREMENT'})
+        snapshot = store.snapshot()
+
+        store.undo()
+        assert store.state == 1
+        store.undo()
+        assert store.state == 0
+        with pytest.raises(IndexError):
+            store.undo()
+
+        store.redo()
+        store.redo()
+        assert store.state == snapshot
+        with pytest.raises(IndexError):
+            store.redo()
+
+    def test_history_store_limit(self):
+        store = create_history_store(_counter, 0, limit=2)
+        for _ in range(5):
+            store.dispatch({'type': 'INCREMENT'})
+        store.undo()
+        store.undo()
+
+        assert store.state == 3
+        with pytest.raises(IndexError):
+            store.undo()
+
+    def test_history_store_redo_cleared(self):
+        store = apply_middleware()(create_history_store)(_counter, 0)
+        store.dispatch({'type': 'INCREMENT'})
+        store.undo()
+        store.dispatch({'type': 'INCREMENT'})
+
+        with pytest.raises(IndexError):
+            store.redo()
+
+    def test_history_store_redraw(self):
+        store = create_history_store(reducer, {})
+        store.dispatch(ActionCreator.reset_game(0))
+        store.dispatch(ActionCreator.add_player('Foo'))
+        store.dispatch(ActionCreator.add_player('Bar'))
+        store.dispatch(ActionCreator.open_game())
+        store.dispatch(ActionCreator.play_give())
+        card = store.state['play_card']
+
+        store.undo()
+        store.dispatch(ActionCreator.play_give())
+        assert store.state['play_card'] == card
+
+        # undoing the deal redeals the same cards
+        cards = store.state['players'][1]['cards']
+        for _ in range(3):
+            store.undo()
+        store.dispatch(ActionCreator.add_player('Bar'))
+        assert (store.state['players'][1]['cards'] == cards).all()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from skyjo.actions import ActionCreator
+from skyjo.solver import simple_solver
+from skyjo.tournament import run_tournament, run_shared_tournament, compare_solvers
+
+
+def _collect(chunks):
+    results = np.concatenate(list(chunks))
+    return results[np.argsort(results['game'])]
+
+
+def _greedy_solver(players, current_player_ix, play_card, deck_locked, rng=None):
+    """
+    Draws a card unless the play card is below zero.
+    """
+    if play_card >= 0 and not deck_locked:
+        return ActionCreator.play_give()
+    return simple_solver(players, current_player_ix, play_card, deck_locked, rng=rng)
+
+
+class TestTournament(object):
+
+    def test_run_tournament(self):
+        results = _collect(run_tournament(10, workers=1, seed=0, chunk_size=4))
+
+        np.testing.assert_array_equal(results['game'], np.arange(10))
+        assert len(np.unique(results['seed'])) == 10
+        assert results['scores'].shape == (10, 2)
+
+    def test_reproducible(self):
+        a = _collect(run_tournament(6, workers=2, seed=3, chunk_size=2))
+        b = _collect(run_tournament(6, workers=2, seed=3, chunk_size=2))
+        c = _collect(run_tournament(6, workers=2, seed=4, chunk_size=2))
+
+        np.testing.assert_array_equal(a, b)
+        assert not np.array_equal(a['seed'], c['seed'])
+
+    def test_run_shared_tournament(self):
+        expected = _collect(run_tournament(7, workers=2, seed=1, chunk_size=3))
+        with run_shared_tournament(7, workers=2, seed=1, chunk_size=3) as shared:
+            np.testing.assert_array_equal(shared.records, expected)
+        with run_shared_tournament(7, workers=1, seed=1, chunk_size=3) as shared:
+            assert shared.records['game'].tolist() == list(range(7))
+
+    def test_compare_identical(self):
+        result = compare_solvers(simple_solver, simple_solver, 5, n_players=3, seed=0)
+        assert result['games'] == 5
+        assert result['score']['mean'] == 0
+        assert result['score']['interval'] == [0, 0]
+        assert result['win_rate']['mean'] == 0
+
+    def test_common_random_numbers(self):
+        paired = compare_solvers(_greedy_solver, simple_solver, 40, seed=0)
+        independent = compare_solvers(_greedy_solver, simple_solver, 40, seed=0, common_random_numbers=False)
+        assert paired['score']['stderr'] < independent['score']['stderr']
+        lo, hi = paired['score']['interval']
+        assert lo < paired['score']['mean'] < hi
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from skyjo.actions import ActionCreator, ActionType
+from skyjo.deck import CARD_VALUES, DECK_COUNTS
+from skyjo.game import play_game
+from skyjo.middleware import tracker_middleware
+from skyjo.reducer import reducer
+from skyjo.solver import simple_solver, _determinize
+from skyjo.store import create_store, apply_middleware
+from skyjo.tracker import CardTracker
+
+
+def _counts(cards):
+    return np.bincount(np.asarray(cards, dtype=int).ravel() + 2, minlength=15)
+
+
+def _checking_middleware(tracker, checks):
+    """
+    Compares the tracker with the full state after every action.
+    """
+    def middleware(dispatch, state_func):
+        def next_func(next_handler):
+            def action_func(action):
+                val = next_handler(action)
+                state = state_func()
+                if state['play_card'] is None:
+                    return val
+                hidden = sum(_counts(np.asarray(p['cards'])[np.isnan(p['mask'])]) for p in state['players'])
+                grids = sum(_counts(p['cards']) for p in state['players'])
+                if tracker.deck is None:
+                    np.testing.assert_array_equal(tracker.unseen, state['deck'].counts + hidden)
+                else:
+                    np.testing.assert_array_equal(tracker.unseen, hidden)
+                    np.testing.assert_array_equal(tracker.deck, state['deck'].counts)
+                np.testing.assert_array_equal(
+                    tracker.discards, DECK_COUNTS - grids - _counts(state['play_card']) - state['deck'].counts)
+                checks.append(tracker.deck is not None)
+                return val
+            return action_func
+        return next_func
+    return middleware
+
+
+class TestCardTracker(object):
+
+    def test_play_game(self):
+        rng = np.random.default_rng(0)
+        checks = []
+        for n_players in (2, 8, 8):
+            tracker = CardTracker()
+            play_game([simple_solver] * n_players, rng,
+                      middlewares=[_checking_middleware(tracker, checks), tracker_middleware(tracker)])
+        # 8 players play long enough to run out of cards
+        assert any(checks) and not all(checks)
+
+    def test_moments(self):
+        tracker = CardTracker()
+        cards = np.repeat(CARD_VALUES, DECK_COUNTS)
+        assert np.isclose(tracker.expected_hidden(), cards.mean())
+        assert np.isclose(tracker.hidden_variance(), cards.var())
+        np.testing.assert_allclose(tracker.draw_distribution(), DECK_COUNTS / DECK_COUNTS.sum())
+
+        tracker.deck = np.zeros(15, dtype=np.int64)
+        tracker.deck[[0, 14]] = 1
+        assert tracker.expected_draw() == 5
+        assert tracker.draw_variance() == 49
+
+        tracker.deck_size = 0
+        assert np.isnan(tracker.expected_draw())
+
+    def test_from_state(self):
+        tracker = CardTracker()
+        store = apply_middleware(tracker_middleware(tracker))(create_store)(reducer, {})
+        store.dispatch(ActionCreator.reset_game(0))
+        store.dispatch(ActionCreator.add_player('Foo'))
+        store.dispatch(ActionCreator.add_player('Bar'))
+        store.dispatch(ActionCreator.open_game())
+        store.dispatch(ActionCreator.play_give())
+        store.dispatch(ActionCreator.play_reject((0, 0)))
+        store.dispatch(ActionCreator.next_player())
+        store.dispatch(ActionCreator.play_give())
+
+        restored = CardTracker.from_state(store.state)
+        np.testing.assert_array_equal(restored.unseen, tracker.unseen)
+        np.testing.assert_array_equal(restored.discards, tracker.discards)
+        assert restored.discards.sum() == 2
+        assert restored.expected_draw() == tracker.expected_draw()
+
+    def test_determinize_after_reshuffle(self):
+        tracker = CardTracker()
+        store = apply_middleware(tracker_middleware(tracker))(create_store)(reducer, {})
+        store.dispatch(ActionCreator.reset_game(0))
+        for ix in range(8):
+            store.dispatch(ActionCreator.add_player('Player {}'.format(ix)))
+        store.dispatch(ActionCreator.open_game())
+        rng = np.random.default_rng(0)
+        while tracker.deck is None:
+            state = store.state
+            action = simple_solver(state['players'], state['current_player_ix'], state['play_card'],
+                                   state['deck_locked'], rng=rng)
+            store.dispatch(action)
+            if action['type'] in (ActionType.PLAY_TAKE, ActionType.PLAY_REJECT):
+                store.dispatch(ActionCreator.next_player())
+
+        state = store.state
+        batch = _determinize(state['players'], state['current_player_ix'], state['play_card'], state['deck_locked'],
+                             10, np.random.default_rng(0), tracker=tracker)
+        # after a reshuffle the unseen cards are exactly the hidden ones, and the deck is known
+        hidden = np.array([np.isnan(p['mask']) for p in state['players']])
+        for cards in batch['cards']:
+            np.testing.assert_array_equal(_counts(cards[hidden]), tracker.unseen)
+        np.testing.assert_array_equal(batch['deck'], [tracker.deck] * 10)
+        np.testing.assert_array_equal(tracker.deck, state['deck'].counts)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from skyjo.actions import ActionCreator
+from skyjo.game import play_game
+from skyjo.solver import simple_solver
+from skyjo.transposition import TranspositionTable, cached_solver, solver_key
+
+
+class TestTranspositionTable(object):
+
+    def test_lru_eviction(self):
+        table = TranspositionTable(maxsize=2)
+        table.put('a', 1)
+        table.put('b', 2)
+        assert table.get('a') == 1
+        table.put('c', 3)
+
+        assert 'a' in table
+        assert 'b' not in table
+        assert table.get('b') is None
+        assert table.stats() == {
+            'size': 2, 'maxsize': 2, 'hits': 1, 'misses': 1, 'evictions': 1, 'hit_rate': .5
+        }
+
+    def test_persistence(self, tmpdir):
+        table = TranspositionTable(maxsize=3)
+        for i in range(3):
+            table.put(i, i * 10)
+        table.get(0)
+        path = str(tmpdir.join('table.pkl'))
+        table.save(path)
+
+        loaded = TranspositionTable.load(path, maxsize=2)
+        assert len(loaded) == 2
+        assert loaded.get(0) == 0
+        assert loaded.get(1) is None
+
+    def test_solver_key_ignores_hidden_cards(self, make_player):
+        cards = np.arange(12).reshape((3, 4))
+        other = cards.copy()
+        other[0, 0] = 12
+        a = solver_key([make_player(cards, hidden=[(0, 0)])], 0, 3, False)
+
+        assert a == solver_key([make_player(other, hidden=[(0, 0)])], 0, 3, False)
+        assert a != solver_key([make_player(other)], 0, 3, False)
+        assert a != solver_key([make_player(cards, hidden=[(0, 0)])], 0, 3, True)
+
+    def test_cached_solver(self, make_player):
+        calls = []
+
+        def solver(players, current_player_ix, play_card, deck_locked, rng=None):
+            calls.append(play_card)
+            return ActionCreator.play_give()
+
+        cached = cached_solver(solver)
+        players = [make_player(np.ones((3, 4)), hidden=[(0, 0)])]
+        assert cached(players, 0, 5, False, rng=None) == ActionCreator.play_give()
+        cached([make_player(np.ones((3, 4)))], 0, 5, False)
+        # the same position in a later game
+        assert cached(players, 0, 5, False, rng=None) == ActionCreator.play_give()
+
+        assert calls == [5, 5]
+        assert cached.table.hits == 1
+        assert cached.table.misses == 2
+
+    def test_repeated_position(self, make_player):
+        calls = []
+
+        def solver(players, current_player_ix, play_card, deck_locked, rng=None):
+            calls.append(play_card)
+            return ActionCreator.play_give()
+
+        cached = cached_solver(solver)
+        players = [make_player(np.ones((3, 4)), hidden=[(0, 0)])]
+        cached(players, 0, 5, False)
+        cached(players, 0, 5, False)
+
+        assert calls == [5, 5]
+        assert cached.repeats == 1
+
+    def test_two_player_game(self):
+        actions = 0
+
+        def count_actions(dispatch, state_func):
+            def next_func(next_handler):
+                def action_func(action):
+                    nonlocal actions
+                    actions += 1
+                    assert actions < 10000, 'the game does not terminate'
+                    return next_handler(action)
+                return action_func
+            return next_func
+
+        rng = np.random.default_rng(0)
+        solver = cached_solver(simple_solver)
+        for _ in range(10):
+            actions = 0
+            state, _ = play_game([solver] * 2, rng, middlewares=[count_actions])
+            assert state['finish_player_ix'] is not None
+        assert solver.repeats > 0